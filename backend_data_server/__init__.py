@@ -0,0 +1,18 @@
+import os
+
+# Perfiles de configuración seleccionables con la variable de entorno DJANGO_PROFILE
+SETTINGS_PROFILES = {
+    "full": "backend_data_server.settings",
+    "api": "backend_data_server.settings_api",
+}
+
+
+def default_settings_module():
+    """Settings module for ``DJANGO_PROFILE`` (``full`` when unset)."""
+    profile = os.environ.get("DJANGO_PROFILE", "full")
+    try:
+        return SETTINGS_PROFILES[profile]
+    except KeyError:
+        raise RuntimeError(
+            f"Unknown DJANGO_PROFILE '{profile}'; expected one of {', '.join(SETTINGS_PROFILES)}"
+        ) from None
@@ -0,0 +1,40 @@
+"""
+Límite del tamaño del cuerpo de las peticiones por ruta.
+
+``BodyLimitMiddleware`` rechaza con 413 las peticiones cuyo ``Content-Length``
+supera el límite de su ruta (``REQUEST_BODY_LIMITS`` por nombre de URL, o
+``REQUEST_BODY_LIMIT_DEFAULT``) antes de que nadie lea el cuerpo: ni el
+parser de DRF ni ``IdempotencyMiddleware``, que va detrás. El límite queda en
+``request.body_limit`` para que ``streamjson.py`` lo vuelva a comprobar al
+leer, por si el ``Content-Length`` no era fiable.
+"""
+from django.conf import settings
+from django.http import JsonResponse
+
+
+class BodyLimitMiddleware:
+    """Reject bodies larger than the limit of their route before reading them."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limits = getattr(settings, 'REQUEST_BODY_LIMITS', {})
+        self.default = getattr(settings, 'REQUEST_BODY_LIMIT_DEFAULT', None)
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        limit = self.limits.get(match.url_name, self.default) if match else self.default
+        if limit is None:
+            return None
+        request.body_limit = limit
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return JsonResponse({'status': 'error', 'message': 'Invalid Content-Length'}, status=400)
+        if length > limit:
+            return JsonResponse(
+                {'status': 'error', 'message': f'Request body exceeds {limit} bytes'}, status=413
+            )
+        return None
@@ -0,0 +1,175 @@
+"""
+Compresión de respuestas para las APIs del proyecto.
+
+Comprime con brotli o zstd cuando los módulos están disponibles y con gzip en
+cualquier caso, sólo por encima de ``COMPRESSION_MIN_SIZE`` bytes. Los cuerpos
+comprimidos se guardan en una caché LRU indexada por el digest del cuerpo sin
+comprimir, de modo que un cliente que sondea el mismo listado recibe bytes ya
+comprimidos en lugar de volver a comprimirlos en cada petición.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+try:
+    from compression import zstd
+except ImportError:  # pragma: no cover - Python < 3.14
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+
+def _gzip(body):
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def _brotli(body):
+    return brotli.compress(body, quality=5)
+
+
+def _zstd(body):
+    if hasattr(zstd, "ZstdCompressor"):
+        return zstd.ZstdCompressor(level=3).compress(body)
+    return zstd.compress(body, 3)
+
+
+# Orden de preferencia cuando el cliente acepta varias codificaciones
+CODECS = OrderedDict()
+if brotli is not None:
+    CODECS["br"] = _brotli
+if zstd is not None:
+    CODECS["zstd"] = _zstd
+CODECS["gzip"] = _gzip
+
+DEFAULT_CONTENT_TYPES = (
+    "application/json",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def parse_accept_encoding(header):
+    """Return the set of codings the client accepts with a non-zero q-value."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    return accepted
+
+
+def choose_coding(header):
+    accepted = parse_accept_encoding(header)
+    for coding in CODECS:
+        if coding in accepted or "*" in accepted:
+            return coding
+    return None
+
+
+class CompressedBodyCache:
+    """Thread-safe LRU of ``(digest, coding) -> compressed body``."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compress(self, body, coding):
+        key = (hashlib.blake2b(body, digest_size=16).digest(), coding)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed
+            self.misses += 1
+
+        compressed = CODECS[coding](body)
+
+        if self.max_entries:
+            with self._lock:
+                self._entries[key] = compressed
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return compressed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+body_cache = CompressedBodyCache(getattr(settings, "COMPRESSION_CACHE_SIZE", 128))
+
+
+class CompressionMiddleware:
+    """Compress eligible responses with the best coding the client accepts."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+        self.content_types = tuple(
+            getattr(settings, "COMPRESSION_CONTENT_TYPES", DEFAULT_CONTENT_TYPES)
+        )
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if response.status_code != 200:
+            return response
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if not content_type.startswith(self.content_types):
+            return response
+
+        # Varía por Accept-Encoding aunque esta respuesta no se comprima
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        if len(response.content) < self.min_size:
+            return response
+        coding = choose_coding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if coding is None:
+            return response
+
+        compressed = body_cache.get_or_compress(response.content, coding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = coding
+
+        # Un ETag fuerte ya no identifica los bytes transmitidos
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
@@ -0,0 +1,236 @@
+"""
+Soporte de ``Idempotency-Key`` para los POST de las APIs.
+
+La primera petición con una clave se ejecuta normalmente y su respuesta se
+guarda; los reintentos con la misma clave reciben la respuesta guardada sin
+repetir la escritura ni la llamada a Firebase. Mientras la primera petición
+sigue en curso, un reintento recibe 409; reutilizar la clave con otro cuerpo
+devuelve 422. Las respuestas 5xx no se guardan, para que el cliente pueda
+reintentar, y tampoco los 429 del limitador de tasa ni los 409: la petición
+no llegó a hacer nada y el reintento debe ejecutarse. Las claves se guardan
+por ruta y por IP del cliente (la misma que usa el limitador de tasa), así
+que dos clientes que elijan la misma clave no comparten respuestas.
+
+La huella del cuerpo obliga a leerlo entero, así que las vistas que lo leen
+en streaming (parsers con ``streaming = True``, como el lote de landing y la
+importación de demo) quedan fuera aunque su ruta esté en
+``IDEMPOTENCY_ROUTES``: su cuerpo puede ser de megas y se lee por elementos.
+
+El almacén es un LRU con TTL en memoria del proceso o, si se define
+``IDEMPOTENCY_SQLITE_PATH``, un fichero SQLite local compartido por los
+workers del mismo host.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+
+from .ratelimit import client_ip
+
+NEW = 'new'
+IN_PROGRESS = 'in_progress'
+MISMATCH = 'mismatch'
+REPLAY = 'replay'
+
+# Respuestas que no resuelven la operación: se libera la clave en lugar de guardarlas
+RETRYABLE_STATUS = frozenset((409, 429))
+
+
+class MemoryStore:
+    """LRU of ``key -> (fingerprint, expires, response)`` with expiry."""
+
+    def __init__(self, max_keys=10000, ttl=86400):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self, key, fingerprint, now=None):
+        """Claim ``key``; returns ``(outcome, stored_response)``."""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._entries[key] = (fingerprint, now + self.ttl, None)
+                while len(self._entries) > self.max_keys:
+                    self._entries.popitem(last=False)
+                return NEW, None
+            self._entries.move_to_end(key)
+            if entry[0] != fingerprint:
+                return MISMATCH, None
+            if entry[2] is None:
+                return IN_PROGRESS, None
+            return REPLAY, entry[2]
+
+    def complete(self, key, fingerprint, stored, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._entries[key] = (fingerprint, now + self.ttl, stored)
+
+    def release(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteStore:
+    """Same contract as ``MemoryStore`` backed by a local SQLite file."""
+
+    def __init__(self, path, max_keys=10000, ttl=86400):
+        self.path = str(path)
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS idempotency ("
+            "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, expires REAL NOT NULL, "
+            "status INTEGER, content_type TEXT, body BLOB)"
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def begin(self, key, fingerprint, now=None):
+        now = time.time() if now is None else now
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT fingerprint, expires, status, content_type, body FROM idempotency WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                conn.execute(
+                    "INSERT OR REPLACE INTO idempotency (key, fingerprint, expires) VALUES (?, ?, ?)",
+                    (key, fingerprint, now + self.ttl),
+                )
+                outcome = (NEW, None)
+            elif row[0] != fingerprint:
+                outcome = (MISMATCH, None)
+            elif row[2] is None:
+                outcome = (IN_PROGRESS, None)
+            else:
+                outcome = (REPLAY, (row[2], row[3], bytes(row[4])))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return outcome
+
+    def complete(self, key, fingerprint, stored, now=None):
+        now = time.time() if now is None else now
+        conn = self._connection()
+        status, content_type, body = stored
+        conn.execute(
+            "INSERT OR REPLACE INTO idempotency (key, fingerprint, expires, status, content_type, body) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, fingerprint, now + self.ttl, status, content_type, body),
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM idempotency WHERE expires <= ?", (now,))
+        conn.execute(
+            "DELETE FROM idempotency WHERE key IN ("
+            "SELECT key FROM idempotency ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.max_keys,),
+        )
+
+    def release(self, key):
+        self._connection().execute("DELETE FROM idempotency WHERE key = ?", (key,))
+
+    def clear(self):
+        self._connection().execute("DELETE FROM idempotency")
+
+
+def build_store():
+    max_keys = getattr(settings, 'IDEMPOTENCY_MAX_KEYS', 10000)
+    ttl = getattr(settings, 'IDEMPOTENCY_TTL', 86400)
+    path = getattr(settings, 'IDEMPOTENCY_SQLITE_PATH', None)
+    if path:
+        return SQLiteStore(path, max_keys=max_keys, ttl=ttl)
+    return MemoryStore(max_keys=max_keys, ttl=ttl)
+
+
+class IdempotencyMiddleware:
+    """Replay stored responses for POSTs repeated with the same ``Idempotency-Key``."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.routes = frozenset(getattr(settings, 'IDEMPOTENCY_ROUTES', ()))
+        self.store = build_store()
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        claim = getattr(request, '_idempotency_claim', None)
+        if claim is not None:
+            key, fingerprint = claim
+            if response.status_code >= 500 or response.status_code in RETRYABLE_STATUS or response.streaming:
+                self.store.release(key)
+            else:
+                stored = (response.status_code, response.get('Content-Type'), response.content)
+                self.store.complete(key, fingerprint, stored)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method != 'POST':
+            return None
+        client_key = request.headers.get('Idempotency-Key')
+        match = request.resolver_match
+        if not client_key or match is None or match.url_name not in self.routes:
+            return None
+        parsers = getattr(getattr(view_func, 'cls', None), 'parser_classes', ())
+        if any(getattr(parser, 'streaming', False) for parser in parsers):
+            return None
+        if len(client_key) > 255:
+            return JsonResponse(
+                {'status': 'error', 'message': 'Idempotency-Key is too long'}, status=400
+            )
+
+        # La clave es del cliente: otro con la misma no recibe su respuesta ni sus 409/422
+        key = f'{match.url_name}:{client_ip(request)}:{client_key}'
+        fingerprint = hashlib.blake2b(request.body, digest_size=16).hexdigest()
+        outcome, stored = self.store.begin(key, fingerprint)
+
+        if outcome == NEW:
+            request._idempotency_claim = (key, fingerprint)
+            return None
+        if outcome == IN_PROGRESS:
+            return JsonResponse(
+                {'status': 'error', 'message': 'A request with this Idempotency-Key is in progress'},
+                status=409,
+            )
+        if outcome == MISMATCH:
+            return JsonResponse(
+                {'status': 'error', 'message': 'Idempotency-Key was already used with a different body'},
+                status=422,
+            )
+
+        status, content_type, body = stored
+        response = HttpResponse(body, status=status, content_type=content_type)
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+    def process_exception(self, request, exception):
+        claim = getattr(request, '_idempotency_claim', None)
+        if claim is not None:
+            self.store.release(claim[0])
+            request._idempotency_claim = None
+        return None
@@ -0,0 +1,50 @@
+"""
+Tareas periódicas en segundo plano dentro del worker.
+
+Un hilo daemon por tarea que la ejecuta cada ``interval`` segundos y guarda
+el último resultado en ``last_run`` (``/stats`` lo publica). Un fallo se
+registra y no detiene la tarea. Las arranca el ``warm_up()`` de cada app.
+"""
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Daemon thread that runs ``task()`` every ``interval`` seconds."""
+
+    def __init__(self, interval, task, name):
+        self.interval = interval
+        self.task = task
+        self.name = name
+        self.last_run = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.interval <= 0 or self.running:
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.last_run = self.task()
+            except Exception:
+                logger.exception('Background task %s failed', self.name)
+                continue
+            logger.debug('%s: %s', self.name, self.last_run)
@@ -0,0 +1,143 @@
+"""
+Endpoints de sondeo para el balanceador de carga y la monitorización.
+
+``ProbeMiddleware`` va el primero en ``MIDDLEWARE`` y responde estas rutas
+antes de sesiones, CSRF, compresión o el limitador de tasa:
+
+- ``/healthz``: el proceso responde. Cuerpo constante, sin E/S ni locks.
+- ``/readyz``: 503 hasta que el worker termina el calentamiento y tiene sus
+  índices; con el circuito de Firebase abierto responde 200 ``degraded``
+  (landing_api sigue sirviendo la copia en caché y encolando envíos), para
+  no sacar del balanceador workers que pueden atender el resto de rutas.
+- ``/stats``: tamaño del almacén e índices, aciertos de caché y contadores
+  de peticiones del proceso.
+
+Cada app aporta su parte con los métodos ``readiness()`` y ``stats()`` de
+su ``AppConfig``, igual que ``warm_up()``.
+"""
+import threading
+import time
+
+from django.apps import apps
+from django.http import HttpResponse, JsonResponse
+
+from . import warmup
+
+HEALTHY_BODY = b'{"status":"ok"}'
+
+
+def ratio(hits, total):
+    return round(hits / total, 4) if total else None
+
+
+class RequestCounters:
+    """Per-process request totals by status class and URL name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.total = 0
+        self.by_status = {}
+        self.by_route = {}
+
+    def record(self, route, status_code):
+        status_class = f'{status_code // 100}xx'
+        with self._lock:
+            self.total += 1
+            self.by_status[status_class] = self.by_status.get(status_class, 0) + 1
+            self.by_route[route] = self.by_route.get(route, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'total': self.total,
+                'uptime': round(time.time() - self.started, 1),
+                'by_status': dict(self.by_status),
+                'by_route': dict(self.by_route),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.total = 0
+            self.by_status.clear()
+            self.by_route.clear()
+
+
+counters = RequestCounters()
+
+
+def app_reports(method):
+    reports = {}
+    for config in apps.get_app_configs():
+        report = getattr(config, method, None)
+        if callable(report):
+            reports[config.label] = report()
+    return reports
+
+
+def healthz(request):
+    return HttpResponse(HEALTHY_BODY, content_type='application/json')
+
+
+def readyz(request):
+    checks = app_reports('readiness')
+    warmed = warmup.is_ready()
+    ready = warmed and all(check['ok'] for check in checks.values())
+    if not warmed:
+        label = warmup.state
+    elif not ready:
+        label = 'not_ready'
+    elif any(check.get('degraded') for check in checks.values()):
+        label = 'degraded'
+    else:
+        label = 'ready'
+    return JsonResponse(
+        {'status': label, 'warmup': dict(warmup.steps), 'checks': checks},
+        status=200 if ready else 503,
+    )
+
+
+def stats(request):
+    from .compression import body_cache
+
+    return JsonResponse({
+        'status': 'success',
+        'requests': counters.snapshot(),
+        'warmup': warmup.state,
+        'compression_cache': {
+            'entries': len(body_cache),
+            'hits': body_cache.hits,
+            'misses': body_cache.misses,
+            'hit_rate': ratio(body_cache.hits, body_cache.hits + body_cache.misses),
+        },
+        'apps': app_reports('stats'),
+    })
+
+
+class ProbeMiddleware:
+    """Answer probe routes first and count every other request."""
+
+    routes = {
+        '/healthz': healthz,
+        '/readyz': readyz,
+        '/stats': stats,
+    }
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        probe = self.routes.get(request.path_info)
+        if probe is not None:
+            if request.method not in ('GET', 'HEAD'):
+                response = HttpResponse(status=405)
+                response['Allow'] = 'GET, HEAD'
+                return response
+            response = probe(request)
+            response['Cache-Control'] = 'no-store'
+            return response
+
+        response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        counters.record(match.url_name or match.view_name if match else 'unresolved', response.status_code)
+        return response
@@ -0,0 +1,167 @@
+"""
+Limitación de tasa y control de admisión.
+
+``RateLimitMiddleware`` aplica un token bucket por IP y por ruta (nombre de la
+URL) según ``RATE_LIMITS``. Cada petición cuesta O(1): se lee el estado del
+cubo, se rellena según el tiempo transcurrido y se descuenta un token. El
+estado vive en memoria del proceso o, si se define ``RATE_LIMIT_SHARED_PATH``,
+en un fichero SQLite local compartido por los workers del mismo host.
+
+``LoadSheddingMiddleware`` limita las peticiones en curso por proceso y
+responde 503 inmediatamente cuando se supera ``MAX_CONCURRENT_REQUESTS``, en
+lugar de dejar que la cola crezca y la latencia se dispare.
+"""
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import JsonResponse
+
+
+class MemoryBackend:
+    """Per-process bucket table bounded by LRU eviction."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, burst, now):
+        """Take one token; return 0 on success or the seconds until one is available."""
+        with self._lock:
+            state = self._buckets.get(key)
+            if state is None:
+                tokens = burst
+            else:
+                tokens = min(burst, state[0] + (now - state[1]) * rate)
+                self._buckets.move_to_end(key)
+
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / rate
+
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class SQLiteBackend:
+    """Bucket table in a local SQLite file shared by all workers on a host."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def consume(self, key, rate, burst, now):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+def client_ip(request):
+    if getattr(settings, "RATE_LIMIT_TRUST_FORWARDED", False):
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def error_response(message, status, retry_after):
+    response = JsonResponse({"status": "error", "message": message}, status=status)
+    response["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+class RateLimitMiddleware:
+    """Token bucket per client IP and URL name, configured by ``RATE_LIMITS``."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.rules = {
+            name: (float(rule["rate"]), float(rule["burst"]), frozenset(rule.get("methods", ("POST",))))
+            for name, rule in getattr(settings, "RATE_LIMITS", {}).items()
+        }
+        shared_path = getattr(settings, "RATE_LIMIT_SHARED_PATH", None)
+        self.backend = SQLiteBackend(shared_path) if shared_path else MemoryBackend()
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        rule = self.rules.get(match.url_name) if match else None
+        if rule is None:
+            return None
+        rate, burst, methods = rule
+        if request.method not in methods:
+            return None
+
+        key = f"{match.url_name}:{client_ip(request)}"
+        wait = self.backend.consume(key, rate, burst, time.time())
+        if wait:
+            return error_response("Too many requests", 429, wait)
+        return None
+
+
+class LoadSheddingMiddleware:
+    """Reject with 503 once ``MAX_CONCURRENT_REQUESTS`` are already in flight."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limit = getattr(settings, "MAX_CONCURRENT_REQUESTS", 0)
+        self.in_flight = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        if not self.limit:
+            return self.get_response(request)
+
+        with self._lock:
+            if self.in_flight >= self.limit:
+                self.shed += 1
+                return error_response("Server overloaded, retry shortly", 503, 1)
+            self.in_flight += 1
+        try:
+            # Los streams SSE dejan de contar al devolver la respuesta
+            return self.get_response(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
@@ -13,9 +13,6 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 
-import firebase_admin
-from firebase_admin import credentials
-
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -46,7 +43,6 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "firebase_admin",
     "rest_framework",
     "demo_rest_api",
     'landing_api',
@@ -54,23 +50,103 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "backend_data_server.probes.ProbeMiddleware",
+    "backend_data_server.ratelimit.LoadSheddingMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "backend_data_server.staticserve.StaticFilesMiddleware",
+    "backend_data_server.compression.CompressionMiddleware",
+    "django.middleware.http.ConditionalGetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "backend_data_server.bodylimit.BodyLimitMiddleware",
+    "backend_data_server.idempotency.IdempotencyMiddleware",
+    "backend_data_server.ratelimit.RateLimitMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Compresión de respuestas (ver backend_data_server/compression.py)
+COMPRESSION_MIN_SIZE = 1024  # bytes; por debajo no compensa comprimir
+COMPRESSION_CACHE_SIZE = 128  # cuerpos comprimidos reutilizables entre sondeos
+
+# Feed de cambios de demo_rest_api (ver demo_rest_api/feed.py)
+DEMO_FEED_SIZE = 1000  # eventos retenidos en el buffer circular
+DEMO_FEED_MAX_WAIT = 30  # segundos máximos de espera en long-poll
+DEMO_FEED_HEARTBEAT = 15  # segundos entre keep-alives del stream SSE
+DEMO_FEED_STREAM_SECONDS = 300  # duración máxima de un stream SSE
+
+# Almacén de demo_rest_api (ver demo_rest_api/store.py y demo_rest_api/shards.py)
+DEMO_STORE = os.environ.get("DEMO_STORE", "local")  # 'local', 'sharded' o 'tiered'
+DEMO_SHARDS = int(os.environ.get("DEMO_SHARDS", os.cpu_count() or 2))  # procesos con DEMO_STORE=sharded
+DEMO_PAGE_MAX_LIMIT = 1000  # tamaño máximo de página con ?limit=
+DEMO_IMPORT_MAX = 10000  # usuarios por petición en /demo/rest/api/import/
+
+# Nivel frío en disco con DEMO_STORE=tiered (ver demo_rest_api/tiers.py)
+DEMO_COLD_PATH = os.environ.get("DEMO_COLD_PATH") or None  # SQLite, un fichero por proceso (se añade el pid); sin él, base de datos temporal
+DEMO_COLD_AFTER = 300  # segundos desactivado antes de pasar a disco
+DEMO_COLD_CACHE = 1024  # registros fríos leídos por id que se mantienen en memoria
+DEMO_SPILL_INTERVAL = 60  # segundos entre pasadas de desbordamiento; 0 las desactiva
+
+# Retención de usuarios desactivados (ver demo_rest_api/compaction.py)
+DEMO_RETENTION = 30 * 86400  # segundos que se conserva un usuario desactivado
+DEMO_COMPACTION_INTERVAL = 3600  # segundos entre pasadas en segundo plano; 0 las desactiva
+DEMO_COMPACTION_BATCH = 1000  # posiciones de la lista revisadas por cada toma del lock
+DEMO_ARCHIVE_PATH = os.environ.get("DEMO_ARCHIVE_PATH") or None  # JSON Lines; sin él se descartan
+
+# Stream SSE de envíos de landing_api (ver landing_api/broker.py)
+LANDING_STREAM_BUFFER = 500  # envíos recientes disponibles para reanudar
+LANDING_STREAM_HEARTBEAT = 15  # segundos entre keep-alives
+LANDING_STREAM_SECONDS = 300  # duración máxima de un stream SSE
+
+# Limitación de tasa y control de admisión (ver backend_data_server/ratelimit.py)
+# rate: tokens por segundo; burst: tamaño del cubo. Clave: nombre de la URL.
+RATE_LIMITS = {
+    "landing-api-index": {"rate": 1, "burst": 10, "methods": ("POST",)},
+    "landing-api-batch": {"rate": 1, "burst": 5, "methods": ("POST",)},
+    "demo_rest_api_resources": {"rate": 5, "burst": 20, "methods": ("POST",)},
+    "demo_rest_api_import": {"rate": 1, "burst": 2, "methods": ("POST",)},
+}
+RATE_LIMIT_SHARED_PATH = os.environ.get("RATE_LIMIT_SHARED_PATH")  # SQLite local compartido entre workers
+RATE_LIMIT_TRUST_FORWARDED = False  # usar X-Forwarded-For sólo detrás de un proxy de confianza
+MAX_CONCURRENT_REQUESTS = 64  # peticiones en curso por proceso antes de responder 503; 0 desactiva
+
+# Tamaño máximo del cuerpo por ruta, comprobado antes de leerlo (ver backend_data_server/bodylimit.py)
+REQUEST_BODY_LIMITS = {
+    "landing-api-index": 16 * 1024,
+    "landing-api-batch": 1024 * 1024,
+    "demo_rest_api_resources": 16 * 1024,
+    "demo_rest_api_item": 16 * 1024,
+    "demo_rest_api_import": 4 * 1024 * 1024,
+}
+REQUEST_BODY_LIMIT_DEFAULT = 64 * 1024  # resto de rutas
+REQUEST_ARRAY_ITEM_LIMIT = 16 * 1024  # caracteres por elemento en lotes e importaciones
+
+# Idempotency-Key en los POST (ver backend_data_server/idempotency.py)
+# Sin el lote ni la importación: se leen en streaming y la huella obligaría a cargar el cuerpo entero
+IDEMPOTENCY_ROUTES = ("landing-api-index", "demo_rest_api_resources")
+IDEMPOTENCY_TTL = 86400  # segundos que se recuerda cada clave
+IDEMPOTENCY_MAX_KEYS = 10000
+IDEMPOTENCY_SQLITE_PATH = os.environ.get("IDEMPOTENCY_SQLITE_PATH")  # SQLite local compartido entre workers
+
 ROOT_URLCONF = "backend_data_server.urls"
 
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [os.path.join(BASE_DIR, 'templates')],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # Plantillas compiladas una vez por proceso
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
             "context_processors": [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
@@ -134,16 +210,71 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, STATIC_URL),
 ]
 
-STATIC_ROOT = "assets/"
+STATIC_ROOT = BASE_DIR / "assets"
+
+# collectstatic guarda los ficheros con el hash del contenido en el nombre
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "backend_data_server.storage.FingerprintedStaticFilesStorage",
+    },
+}
+
+# Servicio de estáticos desde STATIC_ROOT (ver backend_data_server/staticserve.py)
+STATIC_IMMUTABLE_MAX_AGE = 31536000  # ficheros con hash en el nombre
+STATIC_MAX_AGE = 3600  # ficheros sin hash
+
+# Página de inicio pre-renderizada (ver homepage/views.py)
+HOMEPAGE_MAX_AGE = 300  # segundos de caché en el navegador para el HTML
+HOMEPAGE_PRERENDER = os.environ.get("HOMEPAGE_PRERENDER", "1") != "0"  # 0: renderizar en cada petición al editar la plantilla
+TAILWIND_CLI = os.environ.get("TAILWIND_CLI", "tailwindcss")  # usado por manage.py build_css
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
-# Coloque la ruta relativa al archivo con la clave privada
-FIREBASE_CREDENTIALS_PATH = credentials.Certificate("secrets/landing-key.json")
-
-# Inicialice la conexión con el Realtime Database con la clave privada y la URL de referencia
-firebase_admin.initialize_app(FIREBASE_CREDENTIALS_PATH, {
-   'databaseURL': 'https://landing-page-9c277-default-rtdb.firebaseio.com/'
-})
\ No newline at end of file
+# Coloque la ruta relativa al archivo con la clave privada (secrets/ no se versiona)
+FIREBASE_CREDENTIALS_PATH = BASE_DIR / "secrets/landing-key.json"
+
+FIREBASE_DATABASE_URL = 'https://landing-page-9c277-default-rtdb.firebaseio.com/'
+
+# firebase_admin (y con él google-auth y requests) no se importa al arrancar:
+# landing_api/gateway.py inicializa la app con esta clave en la primera llamada
+
+# Pasarela HTTP a Firebase (ver landing_api/gateway.py)
+FIREBASE_POOL_SIZE = 10  # conexiones keep-alive por proceso
+FIREBASE_TIMEOUT = 5.0  # segundos por llamada
+FIREBASE_CONNECT_TIMEOUT = 2.0  # segundos para conectar o esperar una conexión del pool
+FIREBASE_RETRIES = 2  # reintentos con backoff exponencial y jitter
+FIREBASE_BACKOFF = 0.1  # segundos base del backoff
+FIREBASE_HTTP2 = True
+
+# Circuit breaker y caché de landing_api (ver landing_api/resilience.py)
+LANDING_BREAKER_FAILURES = 5  # fallos consecutivos que abren el circuito
+LANDING_BREAKER_LATENCY = 2.0  # segundos; una llamada más lenta cuenta como fallo
+LANDING_BREAKER_RESET = 30.0  # segundos abierto antes de probar de nuevo
+LANDING_CACHE_TTL = 5.0  # segundos que la copia de landing_data se considera fresca
+LANDING_OUTBOX_SIZE = 1000  # envíos encolados como máximo con Firebase caído
+LANDING_BATCH_MAX = 500  # envíos por petición en /landing/api/index/batch/
+# Campos admitidos en los envíos; el resto se rechaza. None admite cualquier nombre válido
+LANDING_ALLOWED_FIELDS = ("name", "email", "phone", "company", "message", "source")
+LANDING_MAX_FIELDS = 30  # campos por envío
+LANDING_MAX_VALUE_LENGTH = 2000  # caracteres por valor de texto
+
+# Réplica local de landing_data (ver landing_api/mirror.py)
+# Guarda datos de los envíos (PII): desactivada salvo que se indique un fichero fuera del repositorio
+LANDING_MIRROR_PATH = os.environ.get("LANDING_MIRROR_PATH", "")  # vacío: sin réplica
+LANDING_SYNC_INTERVAL = 30  # segundos entre sincronizaciones en segundo plano (sólo con réplica); 0 las desactiva
+LANDING_SYNC_PAGE = 1000  # registros por petición a Firebase
+LANDING_SYNC_LOOKBACK = 300.0  # segundos que se retrocede desde la última clave vista
+LANDING_FULL_SYNC_INTERVAL = 86400.0  # segundos entre copias completas
+
+# Agregados de landing_data (ver landing_api/analytics.py)
+LANDING_AGGREGATE_MAX_FIELDS = 50  # campos distintos con conteo por valor
+LANDING_AGGREGATE_MAX_VALUES = 1000  # valores distintos por campo; el resto cuenta como 'other'
+
+# Calentamiento del worker antes de aceptar tráfico (ver backend_data_server/warmup.py)
+WARMUP_ON_START = os.environ.get("DJANGO_WARMUP", "1") != "0"
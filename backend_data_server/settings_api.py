@@ -0,0 +1,39 @@
+"""
+Perfil de configuración para workers que sólo sirven las APIs.
+
+Se activa con ``DJANGO_PROFILE=api``. Parte de ``settings`` y elimina lo que
+las APIs no usan: admin, auth, sesiones, mensajes, CSRF, clickjacking y el
+servicio de estáticos, además del renderer navegable de DRF. La página de
+inicio y el admin no se publican en este perfil.
+"""
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    "rest_framework",
+    "demo_rest_api",
+    "landing_api",
+]
+
+MIDDLEWARE = [
+    "backend_data_server.probes.ProbeMiddleware",
+    "backend_data_server.ratelimit.LoadSheddingMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "backend_data_server.compression.CompressionMiddleware",
+    "django.middleware.http.ConditionalGetMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "backend_data_server.bodylimit.BodyLimitMiddleware",
+    "backend_data_server.idempotency.IdempotencyMiddleware",
+    "backend_data_server.ratelimit.RateLimitMiddleware",
+]
+
+ROOT_URLCONF = "backend_data_server.urls_api"
+
+TEMPLATES = []
+
+# Sin django.contrib.auth: peticiones anónimas y sólo JSON/SSE
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": [],
+    "DEFAULT_PERMISSION_CLASSES": [],
+    "UNAUTHENTICATED_USER": None,
+    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+}
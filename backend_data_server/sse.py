@@ -0,0 +1,39 @@
+"""
+Utilidades compartidas para respuestas Server-Sent Events.
+"""
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets content negotiation accept ``text/event-stream`` requests."""
+
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_sse(data, event='message')
+
+
+def format_sse(data, event=None, event_id=None):
+    """Serialize one Server-Sent Events frame."""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.append('data: ' + json.dumps(data, separators=(',', ':')))
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+RETRY_FRAME = b'retry: 3000\n\n'
+KEEP_ALIVE_FRAME = b': keep-alive\n\n'
+
+
+def stream_headers(response):
+    """Disable caching and proxy buffering on a streaming SSE response."""
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
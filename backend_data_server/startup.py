@@ -0,0 +1,140 @@
+"""
+Medición del arranque en frío de los puntos de entrada.
+
+Cada medición lanza un intérprete nuevo con ``python -X importtime`` que
+importa el punto de entrada (``manage.py check``, ``wsgi``, ``asgi`` o la
+carga de las URLs que hace la primera petición) y devuelve el tiempo total,
+los módulos cargados y el coste de importación de cada módulo.
+
+El presupuesto guardado en ``startup_budget.json`` fija, por perfil y punto
+de entrada, el máximo de milisegundos y de módulos, y la lista de paquetes
+pesados que no deben importarse al arrancar (se cargan de forma diferida en
+la primera llamada que los necesita). Se consulta con
+``python manage.py startup_budget``.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+BUDGET_PATH = Path(__file__).resolve().parent / "startup_budget.json"
+
+ENTRY_POINTS = {
+    "manage": (
+        "import runpy, sys; sys.argv = ['manage.py', 'check']; "
+        "runpy.run_path('manage.py', run_name='__main__')"
+    ),
+    "wsgi": "import backend_data_server.wsgi",
+    "asgi": "import backend_data_server.asgi",
+    # Lo que paga la primera petición: cargar el URLconf y con él las vistas
+    "urlconf": (
+        "import backend_data_server.wsgi; "
+        "from django.urls import get_resolver; get_resolver().url_patterns"
+    ),
+}
+
+CHILD = """\
+import json, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print()
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def parse_importtime(output):
+    """
+    Parse ``-X importtime`` stderr into ``{module: (self_us, cumulative_us)}``.
+
+    Only the first import of each module is reported by the interpreter, so
+    the cumulative time of a top-level module includes its dependencies.
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(entry, profile="full"):
+    """Run ``entry`` in a fresh interpreter and return its startup report."""
+    # Sólo el coste de importar: el calentamiento (warmup.py) se mide aparte en /readyz
+    env = dict(os.environ, DJANGO_PROFILE=profile, DJANGO_WARMUP="0")
+    env.pop("DJANGO_SETTINGS_MODULE", None)
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD.format(statement=ENTRY_POINTS[entry])],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"{entry} ({profile}) failed:\n" + "\n".join(errors[-20:]))
+
+    child = json.loads(result.stdout.strip().splitlines()[-1])
+    return {
+        "entry": entry,
+        "profile": profile,
+        "wall_ms": wall * 1000,
+        "import_ms": child["seconds"] * 1000,
+        "modules": child["modules"],
+        "imports": parse_importtime(result.stderr),
+    }
+
+
+def top_imports(report, limit=15, key="cumulative"):
+    """Heaviest modules of ``report`` by ``self`` or ``cumulative`` time."""
+    index = 0 if key == "self" else 1
+    ranked = sorted(report["imports"].items(), key=lambda item: item[1][index], reverse=True)
+    return ranked[:limit]
+
+
+def load_budget(path=BUDGET_PATH):
+    with open(path) as budget_file:
+        return json.load(budget_file)
+
+
+def forbidden_modules(report, budget):
+    """Modules of ``report`` that belong to a package the budget forbids at startup."""
+    forbidden = tuple(budget.get("forbidden", ()))
+    return sorted(
+        name for name in report["modules"]
+        if name.split(".", 1)[0] in forbidden
+    )
+
+
+def check_budget(report, budget, timing=True):
+    """Return the list of budget violations for ``report`` (empty when within budget)."""
+    problems = []
+    heavy = forbidden_modules(report, budget)
+    if heavy:
+        problems.append(f"imports deferred packages: {', '.join(heavy[:5])}")
+
+    limits = budget.get("profiles", {}).get(report["profile"], {}).get(report["entry"])
+    if limits is None:
+        return problems
+    if len(report["modules"]) > limits["max_modules"]:
+        problems.append(f"{len(report['modules'])} modules loaded, budget is {limits['max_modules']}")
+    if timing and report["import_ms"] > limits["max_ms"]:
+        problems.append(f"{report['import_ms']:.0f} ms to import, budget is {limits['max_ms']} ms")
+    return problems
+
+
+def budget_for(reports, time_headroom=1.5, module_headroom=1.1, forbidden=()):
+    """Build a budget from ``reports`` leaving some headroom over the measured values."""
+    profiles = {}
+    for report in reports:
+        profiles.setdefault(report["profile"], {})[report["entry"]] = {
+            "max_ms": int(report["import_ms"] * time_headroom) + 1,
+            "max_modules": int(len(report["modules"]) * module_headroom) + 1,
+        }
+    return {"forbidden": list(forbidden), "profiles": profiles}
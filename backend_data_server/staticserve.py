@@ -0,0 +1,221 @@
+"""
+Servicio de ficheros estáticos desde ``STATIC_ROOT``.
+
+Al arrancar se recorre ``STATIC_ROOT`` una sola vez y se construye un índice
+``URL -> StaticAsset`` con tamaño, fecha, ETag y variantes precomprimidas
+(``.br``/``.gz``, generadas por ``collectstatic``). Los nombres que aparecen
+en el manifiesto ``staticfiles.json`` llevan el hash del contenido y se sirven
+como ``immutable`` con caché de un año.
+
+Las respuestas son ``FileResponse`` sobre el descriptor del fichero, así que
+los servidores que exponen ``wsgi.file_wrapper`` (gunicorn, uWSGI) las envían
+con ``sendfile`` sin copiarlas a Python. Se soportan peticiones condicionales
+(``If-None-Match``/``If-Modified-Since``) y rangos simples (``Range``).
+"""
+import json
+import mimetypes
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+from .compression import parse_accept_encoding
+
+# Extensiones de las variantes precomprimidas, por orden de preferencia
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class StaticAsset:
+    __slots__ = ("path", "size", "mtime", "etag", "content_type", "immutable", "variants")
+
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        self.path = path
+        self.size = stat.st_size
+        self.mtime = int(stat.st_mtime)
+        self.etag = '"%x-%x"' % (self.mtime, self.size)
+        self.content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.immutable = immutable
+        self.variants = {}
+        for coding, suffix in ENCODINGS:
+            variant = path + suffix
+            if os.path.exists(variant):
+                self.variants[coding] = (variant, os.path.getsize(variant))
+
+    def etag_for(self, coding):
+        # Cada codificación es una representación distinta con su propio ETag
+        return self.etag if coding is None else self.etag[:-1] + '-' + coding + '"'
+
+
+def build_index(root, prefix):
+    """Map every URL under ``prefix`` to its ``StaticAsset``."""
+    root = Path(root)
+    if not root.is_dir():
+        return {}
+
+    hashed = set()
+    manifest = root / "staticfiles.json"
+    if manifest.exists():
+        hashed = set(json.loads(manifest.read_text()).get("paths", {}).values())
+
+    compressed_suffixes = tuple(suffix for _, suffix in ENCODINGS)
+    index = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith(compressed_suffixes) or filename == "staticfiles.json":
+                continue
+            path = os.path.join(dirpath, filename)
+            name = os.path.relpath(path, root).replace(os.sep, "/")
+            index[prefix + name] = StaticAsset(path, name in hashed)
+    return index
+
+
+class RangeFile:
+    """Read-limited view over an open file, keeping ``fileno`` for sendfile."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Parse a single ``bytes=`` range.
+
+    Returns ``(start, end)`` inclusive, ``None`` for an unsupported header
+    (served in full) or ``False`` when the range is unsatisfiable.
+    """
+    if not header.startswith("bytes=") or "," in header:
+        return None
+    start, sep, end = header[6:].strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not start:
+            length = int(end)
+            if length <= 0:
+                return False
+            return max(0, size - length), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+class StaticFilesMiddleware:
+    """Serve ``STATIC_URL`` from the prebuilt index before the rest of the stack."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = "/" + settings.STATIC_URL.lstrip("/")
+        self.index = build_index(settings.STATIC_ROOT, self.prefix) if settings.STATIC_ROOT else {}
+        self.immutable_max_age = getattr(settings, "STATIC_IMMUTABLE_MAX_AGE", 31536000)
+        self.max_age = getattr(settings, "STATIC_MAX_AGE", 3600)
+
+    def __call__(self, request):
+        asset = self.index.get(request.path_info) if request.path_info.startswith(self.prefix) else None
+        if asset is None:
+            return self.get_response(request)
+        return self.serve(request, asset)
+
+    def serve(self, request, asset):
+        if request.method not in ("GET", "HEAD"):
+            response = HttpResponse(status=405)
+            response["Allow"] = "GET, HEAD"
+            return response
+
+        byte_range = None
+        range_header = request.META.get("HTTP_RANGE")
+        if range_header and request.META.get("HTTP_IF_RANGE", asset.etag) == asset.etag:
+            byte_range = parse_range(range_header, asset.size)
+
+        # El 304 describe la misma representación que tendría el 200: mismo ETag y Vary
+        path, size, coding = asset.path, asset.size, None
+        if byte_range is None and asset.variants:
+            accepted = parse_accept_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+            for candidate, _ in ENCODINGS:
+                if candidate in asset.variants and candidate in accepted:
+                    coding = candidate
+                    path, size = asset.variants[candidate]
+                    break
+
+        if self.not_modified(request, asset):
+            response = HttpResponseNotModified()
+            if asset.variants:
+                patch_vary_headers(response, ("Accept-Encoding",))
+            self.set_cache_headers(response, asset, coding)
+            return response
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = "bytes */%d" % asset.size
+            return response
+
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            status = 206
+        else:
+            start, length, status = 0, size, 200
+
+        if request.method == "HEAD":
+            response = HttpResponse(content_type=asset.content_type, status=status)
+        else:
+            # Tipo y nombre del recurso original, no de la variante .br/.gz que se envía
+            file = RangeFile(open(path, "rb"), start, length) if byte_range else open(path, "rb")
+            response = FileResponse(
+                file, content_type=asset.content_type, status=status,
+                as_attachment=False, filename=os.path.basename(asset.path),
+            )
+
+        if byte_range:
+            response["Content-Range"] = "bytes %d-%d/%d" % (start, end, asset.size)
+        response["Content-Length"] = str(length)
+        response["Accept-Ranges"] = "bytes"
+        if coding:
+            response["Content-Encoding"] = coding
+        if asset.variants:
+            patch_vary_headers(response, ("Accept-Encoding",))
+        self.set_cache_headers(response, asset, coding)
+        return response
+
+    def not_modified(self, request, asset):
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or any(asset.etag_for(coding) in tags for coding in (None, *asset.variants))
+        since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+        return since is not None and asset.mtime <= since
+
+    def set_cache_headers(self, response, asset, coding):
+        response["ETag"] = asset.etag_for(coding)
+        response["Last-Modified"] = http_date(asset.mtime)
+        if asset.immutable:
+            response["Cache-Control"] = "public, max-age=%d, immutable" % self.immutable_max_age
+        else:
+            response["Cache-Control"] = "public, max-age=%d" % self.max_age
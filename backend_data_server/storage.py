@@ -0,0 +1,53 @@
+"""
+Almacenamiento de estáticos con nombres con hash.
+
+``collectstatic`` copia cada fichero a ``STATIC_ROOT`` con el hash de su
+contenido en el nombre y escribe ``staticfiles.json``; como la URL cambia con
+el contenido, los ficheros pueden servirse con caché de un año. Los ficheros
+de texto se guardan además precomprimidos (``.gz`` y, si está instalado
+``brotli``, ``.br``) para que ``StaticFilesMiddleware`` no comprima en cada
+petición.
+"""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, StaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".mjs", ".map", ".svg", ".json", ".html", ".txt", ".xml")
+
+
+class FingerprintedStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that falls back to the plain URL for unknown files."""
+
+    manifest_strict = False
+
+    def url(self, name, force=False):
+        try:
+            return super().url(name, force)
+        except ValueError:
+            # Fichero ausente (p. ej. aún sin collectstatic): URL sin hash
+            return StaticFilesStorage.url(self, name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in self.hashed_files.values():
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.precompress(name)
+
+    def precompress(self, name):
+        path = self.path(name)
+        with open(path, "rb") as source:
+            content = source.read()
+        variants = [(".gz", gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append((".br", brotli.compress(content, quality=11)))
+        for suffix, compressed in variants:
+            if len(compressed) < len(content):
+                with open(path + suffix, "wb") as target:
+                    target.write(compressed)
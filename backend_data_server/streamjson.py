@@ -0,0 +1,108 @@
+"""
+Lectura incremental de arrays JSON para las rutas que reciben listas.
+
+``JSONArrayStreamParser`` (lotes, importaciones) no lee el cuerpo entero ni
+lo convierte de una vez: ``request.data`` es un iterador que lee por bloques
+y decodifica un elemento cada vez. La vista puede cortar en cuanto hay
+demasiados elementos, y en memoria sólo está el elemento en curso y el
+bloque leído. El cuerpo se limita a ``request.body_limit`` (ver
+``bodylimit.py``) y cada elemento a ``REQUEST_ARRAY_ITEM_LIMIT``.
+"""
+import codecs
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+WHITESPACE = ' \t\r\n'
+
+
+def iter_json_array(stream, chunk_size=65536, max_bytes=None, max_item_bytes=None):
+    """
+    Yield the elements of the JSON array read from ``stream`` one at a time.
+
+    Raises ``ParseError`` for malformed input, for a body over ``max_bytes``
+    and for a single element over ``max_item_bytes`` characters.
+    """
+    decoder = json.JSONDecoder()
+    decode = codecs.getincrementaldecoder('utf-8')().decode
+    state = {'buf': '', 'pos': 0, 'read': 0, 'eof': False}
+
+    def fill():
+        # Descarta lo ya consumido y añade el siguiente bloque; False al final del cuerpo
+        chunk = stream.read(chunk_size) if not state['eof'] else b''
+        if not chunk:
+            state['eof'] = True
+            tail = decode(b'', final=True)
+        else:
+            state['read'] += len(chunk)
+            if max_bytes is not None and state['read'] > max_bytes:
+                raise ParseError(f'Request body exceeds {max_bytes} bytes')
+            tail = decode(chunk)
+        state['buf'] = state['buf'][state['pos']:] + tail
+        state['pos'] = 0
+        return bool(chunk)
+
+    def peek():
+        # Siguiente carácter significativo, o '' al final del cuerpo
+        while True:
+            buf, pos = state['buf'], state['pos']
+            while pos < len(buf) and buf[pos] in WHITESPACE:
+                pos += 1
+            state['pos'] = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ''
+
+    try:
+        if peek() != '[':
+            raise ParseError('Expected a JSON array.')
+        state['pos'] += 1
+        if peek() == ']':
+            state['pos'] += 1
+        else:
+            while True:
+                if peek() == '':
+                    raise ParseError('Unexpected end of JSON array.')
+                while True:
+                    try:
+                        item, end = decoder.raw_decode(state['buf'], state['pos'])
+                    except ValueError:
+                        end = None
+                    # Un número al final del bloque puede continuar en el siguiente
+                    if end is not None and (end < len(state['buf']) or state['eof']):
+                        break
+                    if max_item_bytes is not None and len(state['buf']) - state['pos'] > max_item_bytes:
+                        raise ParseError(f'Array element exceeds {max_item_bytes} bytes')
+                    if not fill() and end is None:
+                        raise ParseError('Malformed JSON array element.')
+                state['pos'] = end
+                yield item
+                separator = peek()
+                state['pos'] += 1
+                if separator == ']':
+                    break
+                if separator != ',':
+                    raise ParseError('Expected "," or "]" in JSON array.')
+        if peek() != '':
+            raise ParseError('Unexpected data after JSON array.')
+    except UnicodeDecodeError as exc:
+        raise ParseError(f'Invalid UTF-8 in request body: {exc}')
+
+
+class JSONArrayStreamParser(BaseParser):
+    """Parse a JSON array lazily; ``request.data`` is an iterator of its elements."""
+
+    media_type = 'application/json'
+    # IdempotencyMiddleware no calcula huellas en las vistas que leen el cuerpo así
+    streaming = True
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = (parser_context or {}).get('request')
+        return iter_json_array(
+            stream,
+            max_bytes=getattr(request, 'body_limit', None),
+            max_item_bytes=getattr(settings, 'REQUEST_ARRAY_ITEM_LIMIT', None),
+        )
@@ -0,0 +1,680 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+import gzip
+import uuid
+
+
+def setUpModule():
+    # Las pruebas de calentamiento sincronizan la copia de landing: nunca sobre el fichero configurado
+    from landing_api.tests import isolate_mirror, stub_credentials
+    global restore_mirror, restore_credentials
+    restore_credentials = stub_credentials()
+    restore_mirror = isolate_mirror()
+
+
+def tearDownModule():
+    restore_mirror()
+    restore_credentials()
+
+
+class CompressionMiddlewareTestCase(APITestCase):
+
+    def setUp(self):
+        # Fill data_list so the list payload is above the size threshold
+        from demo_rest_api.views import data_list
+        from backend_data_server.compression import body_cache
+        data_list.clear()
+        body_cache.clear()
+        for i in range(50):
+            data_list.append({
+                'id': str(uuid.uuid4()),
+                'name': f'User {i}',
+                'email': f'user{i}@example.com',
+                'is_active': True
+            })
+
+    def test_large_list_is_gzipped(self):
+        """Test GET on a large list returns a gzip body when accepted"""
+        response = self.client.get('/demo/rest/api/index/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn(b'user49@example.com', gzip.decompress(response.content))
+
+    def test_no_compression_without_accept_encoding(self):
+        """Test responses stay identity-encoded when the client does not ask"""
+        response = self.client.get('/demo/rest/api/index/')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_small_payload_below_threshold_is_not_compressed(self):
+        """Test payloads under COMPRESSION_MIN_SIZE are sent as is"""
+        from demo_rest_api.views import data_list
+        del data_list[1:]
+
+        response = self.client.get('/demo/rest/api/index/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_unchanged_body_reuses_compressed_bytes(self):
+        """Test polling the same list is served from the compressed body cache"""
+        from backend_data_server.compression import body_cache
+
+        self.client.get('/demo/rest/api/index/', HTTP_ACCEPT_ENCODING='gzip')
+        self.client.get('/demo/rest/api/index/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(body_cache.misses, 1)
+        self.assertEqual(body_cache.hits, 1)
+
+
+class AcceptEncodingTestCase(TestCase):
+
+    def test_zero_quality_is_rejected(self):
+        """Test codings with q=0 are never chosen"""
+        from backend_data_server.compression import choose_coding
+
+        self.assertIsNone(choose_coding('gzip;q=0'))
+        self.assertEqual(choose_coding('deflate, gzip;q=0.5'), 'gzip')
+
+
+class RateLimitTestCase(APITestCase):
+
+    @override_settings(RATE_LIMITS={'demo_rest_api_resources': {'rate': 0.001, 'burst': 2}})
+    def test_post_over_burst_returns_429(self):
+        """Test the token bucket rejects POSTs beyond the configured burst"""
+        data = {'name': 'Test User', 'email': 'test@example.com'}
+
+        responses = [self.client.post('/demo/rest/api/index/', data, format='json') for _ in range(3)]
+
+        self.assertEqual([r.status_code for r in responses], [201, 201, 429])
+        self.assertEqual(responses[2].json()['status'], 'error')
+        self.assertTrue(int(responses[2]['Retry-After']) >= 1)
+
+    @override_settings(RATE_LIMITS={'demo_rest_api_resources': {'rate': 0.001, 'burst': 1}})
+    def test_get_is_not_limited(self):
+        """Test only the configured methods consume tokens"""
+        for _ in range(3):
+            self.assertEqual(self.client.get('/demo/rest/api/index/').status_code, status.HTTP_200_OK)
+
+    @override_settings(RATE_LIMITS={'demo_rest_api_resources': {'rate': 0.001, 'burst': 1}})
+    def test_buckets_are_per_client_ip(self):
+        """Test one client exhausting its bucket does not affect another"""
+        data = {'name': 'Test User', 'email': 'test@example.com'}
+
+        self.client.post('/demo/rest/api/index/', data, format='json', REMOTE_ADDR='10.0.0.1')
+        blocked = self.client.post('/demo/rest/api/index/', data, format='json', REMOTE_ADDR='10.0.0.1')
+        other = self.client.post('/demo/rest/api/index/', data, format='json', REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(blocked.status_code, 429)
+        self.assertEqual(other.status_code, status.HTTP_201_CREATED)
+
+
+class BodyLimitTestCase(APITestCase):
+
+    @override_settings(REQUEST_BODY_LIMITS={'demo_rest_api_resources': 64})
+    def test_oversized_body_is_rejected_before_parsing(self):
+        """Test a Content-Length over the route limit answers 413 without reaching the view"""
+        from unittest import mock
+        data = {'name': 'x' * 100, 'email': 'test@example.com'}
+
+        with mock.patch('demo_rest_api.views.USER_SCHEMA') as schema:
+            response = self.client.post('/demo/rest/api/index/', data, format='json')
+
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.json()['status'], 'error')
+        schema.validate.assert_not_called()
+        small = self.client.post('/demo/rest/api/index/', {'name': 'A', 'email': 'a@example.com'}, format='json')
+        self.assertEqual(small.status_code, status.HTTP_201_CREATED)
+
+
+class StreamingJSONTestCase(TestCase):
+
+    def parse(self, text, **kwargs):
+        import io
+        from backend_data_server.streamjson import iter_json_array
+        return list(iter_json_array(io.BytesIO(text.encode()), chunk_size=4, **kwargs))
+
+    def test_elements_are_decoded_across_chunk_boundaries(self):
+        """Test values split between reads, including numbers, are decoded intact"""
+        self.assertEqual(
+            self.parse(' [1, 2345, {"a": [1, "x,]"]}, "ñ", true, null] '),
+            [1, 2345, {'a': [1, 'x,]']}, 'ñ', True, None]
+        )
+        self.assertEqual(self.parse('[]'), [])
+
+    def test_malformed_and_oversized_input_raise_parse_error(self):
+        from rest_framework.exceptions import ParseError
+        for text in ('{}', '[1,]', '[1 2]', '[1', '[1] x'):
+            with self.assertRaises(ParseError, msg=text):
+                self.parse(text)
+        with self.assertRaises(ParseError):
+            self.parse('[1, 2, 3, 4, 5]', max_bytes=8)
+        with self.assertRaises(ParseError):
+            self.parse('["a long string element"]', max_item_bytes=8)
+
+    def test_elements_are_yielded_before_the_body_is_read(self):
+        """Test the parser is lazy, so a view can stop reading early"""
+        import io
+        from backend_data_server.streamjson import iter_json_array
+        stream = io.BytesIO(b'[{"n": 1}, {"n": 2}, ' + b' ' * 100000 + b'{"n": 3}]')
+
+        first = next(iter_json_array(stream, chunk_size=16))
+
+        self.assertEqual(first, {'n': 1})
+        self.assertLess(stream.tell(), 100)
+
+
+class TokenBucketBackendTestCase(TestCase):
+
+    def _exercise(self, backend):
+        self.assertEqual(backend.consume('k', 1.0, 2, now=100.0), 0)
+        self.assertEqual(backend.consume('k', 1.0, 2, now=100.0), 0)
+        self.assertAlmostEqual(backend.consume('k', 1.0, 2, now=100.0), 1.0)
+        # One second later a token has been refilled
+        self.assertEqual(backend.consume('k', 1.0, 2, now=101.0), 0)
+
+    def test_memory_backend_refills_over_time(self):
+        from backend_data_server.ratelimit import MemoryBackend
+        self._exercise(MemoryBackend())
+
+    def test_sqlite_backend_refills_over_time(self):
+        import os
+        import tempfile
+        from backend_data_server.ratelimit import SQLiteBackend
+        with tempfile.TemporaryDirectory() as tmp:
+            self._exercise(SQLiteBackend(os.path.join(tmp, 'buckets.sqlite3')))
+
+
+class LoadSheddingTestCase(TestCase):
+
+    def test_requests_over_limit_get_503(self):
+        """Test requests beyond MAX_CONCURRENT_REQUESTS are shed immediately"""
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from backend_data_server.ratelimit import LoadSheddingMiddleware
+
+        request = RequestFactory().get('/')
+        nested = {}
+
+        def view(req):
+            # A second request arrives while the first is still in flight
+            nested['response'] = middleware(request)
+            return HttpResponse('ok')
+
+        with override_settings(MAX_CONCURRENT_REQUESTS=1):
+            middleware = LoadSheddingMiddleware(view)
+            response = middleware(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(nested['response'].status_code, 503)
+        self.assertEqual(middleware.shed, 1)
+        self.assertEqual(middleware.in_flight, 0)
+
+
+class StaticFilesMiddlewareTestCase(TestCase):
+
+    def setUp(self):
+        import json
+        import os
+        import tempfile
+        from django.http import HttpResponse
+        from backend_data_server.staticserve import StaticFilesMiddleware
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = self.tmp.name
+        os.makedirs(os.path.join(root, 'css'))
+        self.body = b'body { color: red; }' * 10
+        with open(os.path.join(root, 'css', 'app.abc123.css'), 'wb') as f:
+            f.write(self.body)
+        with open(os.path.join(root, 'css', 'app.abc123.css.gz'), 'wb') as f:
+            f.write(gzip.compress(self.body))
+        with open(os.path.join(root, 'robots.txt'), 'wb') as f:
+            f.write(b'User-agent: *')
+        with open(os.path.join(root, 'staticfiles.json'), 'w') as f:
+            json.dump({'paths': {'css/app.css': 'css/app.abc123.css'}}, f)
+
+        with override_settings(STATIC_ROOT=root, STATIC_URL='static/'):
+            self.middleware = StaticFilesMiddleware(lambda request: HttpResponse('app'))
+
+    def get(self, path, **headers):
+        from django.test import RequestFactory
+        response = self.middleware(RequestFactory().get(path, **headers))
+        self.addCleanup(response.close)
+        return response
+
+    def test_hashed_file_is_immutable(self):
+        """Test manifest entries get far-future immutable caching"""
+        response = self.get('/static/css/app.abc123.css')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.body)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Content-Type'], 'text/css')
+
+    def test_unhashed_file_gets_short_cache(self):
+        response = self.get('/static/robots.txt')
+
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_precompressed_variant_is_served(self):
+        """Test the .gz sibling is sent when the client accepts gzip"""
+        response = self.get('/static/css/app.abc123.css', HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.body)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Content-Disposition'], 'inline; filename="app.abc123.css"')
+
+    def test_precompressed_304_matches_the_200(self):
+        """Test a revalidated gzip response carries the same ETag and Vary as the full one"""
+        full = self.get('/static/css/app.abc123.css', HTTP_ACCEPT_ENCODING='gzip')
+
+        response = self.get('/static/css/app.abc123.css', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=full['ETag'])
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], full['ETag'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_range_request(self):
+        """Test a byte range returns 206 with only the requested bytes"""
+        response = self.get('/static/css/app.abc123.css', HTTP_RANGE='bytes=5-9')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 5-9/{len(self.body)}')
+        self.assertEqual(b''.join(response.streaming_content), self.body[5:10])
+
+    def test_unsatisfiable_range(self):
+        response = self.get('/static/css/app.abc123.css', HTTP_RANGE='bytes=9999-')
+
+        self.assertEqual(response.status_code, 416)
+
+    def test_conditional_request_returns_304(self):
+        etag = self.get('/static/css/app.abc123.css')['ETag']
+
+        response = self.get('/static/css/app.abc123.css', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_unknown_paths_fall_through(self):
+        response = self.get('/static/missing.css')
+
+        self.assertEqual(response.content, b'app')
+
+
+class IdempotencyTestCase(APITestCase):
+
+    def setUp(self):
+        from demo_rest_api.views import data_list
+        data_list.clear()
+
+    def post(self, data, key='retry-1'):
+        return self.client.post('/demo/rest/api/index/', data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_stored_response(self):
+        """Test a retried POST returns the first response without creating a duplicate"""
+        from demo_rest_api.views import data_list
+        data = {'name': 'Test User', 'email': 'test@example.com'}
+
+        first = self.post(data)
+        retry = self.post(data)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json()['data']['id'], first.data['data']['id'])
+        self.assertEqual(len(data_list), 1)
+
+    def test_different_keys_are_independent(self):
+        from demo_rest_api.views import data_list
+        data = {'name': 'Test User', 'email': 'test@example.com'}
+
+        self.post(data, key='a')
+        self.post(data, key='b')
+
+        self.assertEqual(len(data_list), 2)
+
+    def test_same_key_from_another_client_is_not_replayed(self):
+        """Test two clients that pick the same Idempotency-Key do not see each other's responses"""
+        from demo_rest_api.views import data_list
+
+        first = self.client.post(
+            '/demo/rest/api/index/', {'name': 'First', 'email': 'first@example.com'},
+            format='json', HTTP_IDEMPOTENCY_KEY='shared', REMOTE_ADDR='10.0.0.1'
+        )
+        other = self.client.post(
+            '/demo/rest/api/index/', {'name': 'Other', 'email': 'other@example.com'},
+            format='json', HTTP_IDEMPOTENCY_KEY='shared', REMOTE_ADDR='10.0.0.2'
+        )
+
+        self.assertEqual(other.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(other.has_header('Idempotent-Replayed'))
+        self.assertNotEqual(other.data['data']['id'], first.data['data']['id'])
+        self.assertEqual(len(data_list), 2)
+
+    @override_settings(RATE_LIMITS={'demo_rest_api_resources': {'rate': 0.001, 'burst': 1}})
+    def test_rate_limited_response_is_not_replayed(self):
+        """Test a 429 releases the key so a later retry runs the request"""
+        import time
+        from unittest import mock
+        from demo_rest_api.views import data_list
+        data = {'name': 'Test User', 'email': 'test@example.com'}
+
+        self.client.post('/demo/rest/api/index/', data, format='json', REMOTE_ADDR='10.0.0.1')
+        limited = self.client.post(
+            '/demo/rest/api/index/', data, format='json', HTTP_IDEMPOTENCY_KEY='k1', REMOTE_ADDR='10.0.0.1'
+        )
+        # Más tarde, con el cubo del limitador lleno otra vez
+        with mock.patch('backend_data_server.ratelimit.time.time', return_value=time.time() + 10000):
+            retry = self.client.post(
+                '/demo/rest/api/index/', data, format='json', HTTP_IDEMPOTENCY_KEY='k1', REMOTE_ADDR='10.0.0.1'
+            )
+
+        self.assertEqual(limited.status_code, 429)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(retry.has_header('Idempotent-Replayed'))
+        self.assertEqual(len(data_list), 2)
+
+    @override_settings(IDEMPOTENCY_ROUTES=('landing-api-batch',))
+    def test_streamed_routes_are_not_fingerprinted(self):
+        """Test a streamed batch is parsed item by item even when its route is listed"""
+        from unittest import mock
+        from landing_api.resilience import snapshot
+        self.addCleanup(snapshot.clear)
+        body = [{'email': 'a@example.com'}]
+
+        with mock.patch('landing_api.views.firebase'):
+            first = self.client.post('/landing/api/index/batch/', body, format='json', HTTP_IDEMPOTENCY_KEY='b1')
+            second = self.client.post('/landing/api/index/batch/', body, format='json', HTTP_IDEMPOTENCY_KEY='b1')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(second.has_header('Idempotent-Replayed'))
+        self.assertNotEqual(first.json(), second.json())
+
+    def test_key_reused_with_other_body_returns_422(self):
+        self.post({'name': 'Test User', 'email': 'test@example.com'})
+
+        response = self.post({'name': 'Other', 'email': 'other@example.com'})
+
+        self.assertEqual(response.status_code, 422)
+
+
+class IdempotencyStoreTestCase(TestCase):
+
+    def _exercise(self, store):
+        from backend_data_server.idempotency import NEW, IN_PROGRESS, MISMATCH, REPLAY
+
+        self.assertEqual(store.begin('k', 'f1', now=0), (NEW, None))
+        self.assertEqual(store.begin('k', 'f1', now=1), (IN_PROGRESS, None))
+        self.assertEqual(store.begin('k', 'f2', now=1), (MISMATCH, None))
+        store.complete('k', 'f1', (201, 'application/json', b'{}'), now=1)
+        self.assertEqual(store.begin('k', 'f1', now=2), (REPLAY, (201, 'application/json', b'{}')))
+        # Expired keys can be claimed again
+        self.assertEqual(store.begin('k', 'f1', now=1 + store.ttl), (NEW, None))
+        store.release('k')
+        self.assertEqual(store.begin('k', 'f2', now=3)[0], NEW)
+
+    def test_memory_store(self):
+        from backend_data_server.idempotency import MemoryStore
+        self._exercise(MemoryStore(ttl=60))
+
+    def test_sqlite_store(self):
+        import os
+        import tempfile
+        from backend_data_server.idempotency import SQLiteStore
+        with tempfile.TemporaryDirectory() as tmp:
+            self._exercise(SQLiteStore(os.path.join(tmp, 'keys.sqlite3'), ttl=60))
+
+    def test_memory_store_evicts_least_recently_used(self):
+        from backend_data_server.idempotency import MemoryStore, NEW
+        store = MemoryStore(max_keys=2)
+        for key in ('a', 'b', 'c'):
+            store.begin(key, 'f', now=0)
+
+        self.assertEqual(store.begin('a', 'f', now=0)[0], NEW)
+
+
+class ApiProfileTestCase(TestCase):
+
+    def test_api_profile_serves_api_without_full_stack(self):
+        """Test DJANGO_PROFILE=api boots with the trimmed stack and still serves the API"""
+        import json
+        import os
+        import subprocess
+        import sys
+        from django.conf import settings
+
+        script = (
+            "import django, json, os\n"
+            "from backend_data_server import default_settings_module\n"
+            "os.environ['DJANGO_SETTINGS_MODULE'] = default_settings_module()\n"
+            "django.setup()\n"
+            "from django.conf import settings\n"
+            "from django.test import Client\n"
+            "c = Client()\n"
+            "print(json.dumps({\n"
+            "  'apps': settings.INSTALLED_APPS,\n"
+            "  'api': c.get('/demo/rest/api/index/').status_code,\n"
+            "  'homepage': c.get('/homepage/').status_code,\n"
+            "}))\n"
+        )
+        env = dict(os.environ, DJANGO_PROFILE='api')
+        env.pop('DJANGO_SETTINGS_MODULE', None)
+        output = subprocess.run(
+            [sys.executable, '-c', script], cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True, check=True,
+        ).stdout
+
+        result = json.loads(output.strip().splitlines()[-1])
+        self.assertNotIn('django.contrib.admin', result['apps'])
+        self.assertEqual(result['api'], 200)
+        self.assertEqual(result['homepage'], 404)
+
+
+class StartupBudgetTestCase(TestCase):
+
+    def test_parse_importtime_reads_self_and_cumulative_times(self):
+        """Test -X importtime output is parsed into per-module microseconds"""
+        from backend_data_server.startup import parse_importtime
+
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   json.decoder\n"
+            "import time:       300 |        420 | json\n"
+        )
+        self.assertEqual(parse_importtime(output), {'json.decoder': (120, 120), 'json': (300, 420)})
+
+    def test_entry_points_stay_within_startup_budget(self):
+        """Test worker startup loads no deferred package and stays under the module budget"""
+        from backend_data_server.startup import check_budget, load_budget, measure
+
+        budget = load_budget()
+        for profile in ('full', 'api'):
+            report = measure('urlconf', profile)
+            # El tiempo depende de la máquina: aquí sólo se comprueba lo determinista
+            self.assertEqual(check_budget(report, budget, timing=False), [], profile)
+            self.assertNotIn('firebase_admin', report['modules'])
+
+
+class WarmupTestCase(TestCase):
+
+    def setUp(self):
+        from backend_data_server import warmup
+        from demo_rest_api.compaction import compactor
+        from landing_api.resilience import syncer
+        warmup.reset()
+        self.addCleanup(warmup.reset)
+        self.addCleanup(compactor.stop)
+        self.addCleanup(syncer.stop)
+
+    def test_readyz_reports_starting_until_warm_up_runs(self):
+        """Test /readyz answers 503 before warm-up and 200 with every step afterwards"""
+        from unittest import mock
+        from backend_data_server import warmup
+        from demo_rest_api.views import data_list
+
+        self.assertEqual(self.client.get('/readyz').status_code, 503)
+
+        with mock.patch('landing_api.gateway.firebase') as firebase, \
+                mock.patch('landing_api.resilience.snapshot') as snapshot:
+            snapshot.refresh.return_value = {'-A': {}}
+            warmup.warm_up()
+        firebase.open.assert_called_once_with()
+
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 200)
+        steps = response.json()['warmup']
+        self.assertEqual(set(steps), {'urls', 'demo_rest_api', 'landing_api', 'homepage'})
+        self.assertTrue(all(step['ok'] for step in steps.values()))
+        self.assertEqual(steps['landing_api']['result'], {'records': 1, 'syncer': True})
+        self.assertTrue(data_list.indexed)
+
+    def test_syncer_waits_for_a_mirror(self):
+        """Test warm-up does not poll the whole collection in the background without a local mirror"""
+        from unittest import mock
+        from backend_data_server import warmup
+        from landing_api.resilience import syncer
+
+        with mock.patch('landing_api.gateway.firebase'), \
+                mock.patch('landing_api.resilience.snapshot') as snapshot:
+            snapshot.mirror = None
+            snapshot.refresh.return_value = {}
+            steps = warmup.warm_up()
+
+        self.assertEqual(steps['landing_api']['result'], {'records': 0, 'syncer': False})
+        self.assertFalse(syncer.running)
+
+    def test_failed_step_does_not_block_readiness(self):
+        """Test an unreachable Firebase is reported but the worker still becomes ready"""
+        from unittest import mock
+        from backend_data_server import warmup
+        from landing_api.gateway import GatewayError
+
+        with mock.patch('landing_api.gateway.firebase') as firebase:
+            firebase.open.side_effect = GatewayError('Firebase unreachable')
+            steps = warmup.warm_up()
+
+        self.assertTrue(warmup.is_ready())
+        self.assertFalse(steps['landing_api']['ok'])
+        self.assertTrue(steps['homepage']['ok'])
+
+
+class ProbeEndpointsTestCase(TestCase):
+
+    def setUp(self):
+        from backend_data_server import warmup
+        from backend_data_server.probes import counters
+        from landing_api.resilience import breaker
+        warmup.reset()
+        counters.reset()
+        breaker.reset()
+        self.addCleanup(warmup.reset)
+        self.addCleanup(breaker.reset)
+
+    def test_healthz_is_constant_and_skips_the_middleware_stack(self):
+        """Test /healthz answers without sessions, cookies or compression"""
+        response = self.client.get('/healthz', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'{"status":"ok"}')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('X-Frame-Options'))
+        self.assertEqual(self.client.post('/healthz').status_code, 405)
+
+    def test_readyz_is_degraded_while_the_firebase_circuit_is_open(self):
+        """Test an open circuit keeps the worker in rotation but flags it"""
+        from backend_data_server import warmup
+        from demo_rest_api.views import data_list
+        from landing_api.resilience import breaker
+
+        warmup.skip()
+        data_list.build_index()
+        self.assertEqual(self.client.get('/readyz').json()['status'], 'ready')
+
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'degraded')
+        self.assertEqual(response.json()['checks']['landing_api']['circuit'], 'open')
+
+    def test_stats_reports_store_and_request_counters(self):
+        """Test /stats includes store sizes and counts the requests served"""
+        from demo_rest_api.views import data_list
+
+        data_list.clear()
+        data_list.append({'id': 'a', 'name': 'A', 'email': 'a@example.com', 'is_active': True})
+        data_list.append({'id': 'b', 'name': 'B', 'email': 'b@example.com', 'is_active': False})
+        self.client.get('/demo/rest/api/index/')
+        self.client.get('/demo/rest/api/index/missing/')
+
+        body = self.client.get('/stats').json()
+        self.assertEqual(body['requests']['total'], 2)
+        self.assertEqual(body['requests']['by_route']['demo_rest_api_item'], 1)
+        self.assertEqual(body['requests']['by_status'], {'2xx': 1, '4xx': 1})
+        self.assertEqual(body['apps']['demo_rest_api']['users'], 2)
+        self.assertEqual(body['apps']['demo_rest_api']['active_users'], 1)
+        self.assertIn('hit_rate', body['apps']['landing_api']['snapshot'])
+
+
+class LoadTestTestCase(TestCase):
+
+    def test_firebase_standin_speaks_the_gateway_protocol(self):
+        """Test the stand-in answers writes and key-ordered queries like the REST API"""
+        from benchmarks.firebase_standin import FirebaseStandIn
+        from landing_api.gateway import FirebaseGateway
+
+        with FirebaseStandIn() as standin:
+            gateway = FirebaseGateway(standin.url, retries=0, http2=False, token_provider=None)
+            self.addCleanup(gateway.close)
+            gateway.set('landing_data/a', {'n': 1})
+            gateway.update('landing_data', {'b': {'n': 2}, 'c/n': 3})
+            pushed = gateway.push('landing_data', {'n': 4})
+
+            self.assertEqual(set(gateway.get('landing_data')), {'a', 'b', 'c', pushed})
+            page = gateway.get('landing_data', params={'orderBy': '"$key"', 'startAt': '"b"', 'limitToFirst': 2})
+            self.assertEqual(page, {'b': {'n': 2}, 'c': {'n': 3}})
+            self.assertEqual(standin.stats()['requests'], {'PUT': 1, 'PATCH': 1, 'POST': 1, 'GET': 2})
+
+    @override_settings(RATE_LIMITS={})
+    def test_scenario_runs_against_wsgi_and_asgi_apps(self):
+        """Test a short mix runs in-process and reports every step per route"""
+        import asyncio
+        from django.core.handlers.asgi import ASGIHandler
+        from django.core.handlers.wsgi import WSGIHandler
+        from benchmarks.loadtest import SCENARIO_DEFAULTS, ASGITarget, WSGITarget, run_scenario
+        from demo_rest_api.views import data_list
+
+        data_list.clear()
+        self.addCleanup(data_list.clear)
+        steps = [
+            {'name': 'demo-create', 'method': 'POST', 'path': '/demo/rest/api/index/', 'weight': 1,
+             'body': {'name': 'Load {n}', 'email': 'load{n}@example.com'}, 'capture': 'data.id'},
+            {'name': 'demo-get', 'method': 'GET', 'path': '/demo/rest/api/index/{user_id}/', 'weight': 3},
+            {'name': 'demo-missing', 'method': 'GET', 'path': '/demo/rest/api/index/missing/', 'weight': 1},
+        ]
+        scenario = dict(SCENARIO_DEFAULTS, name='crud', users=3, duration=0.3, steps=steps)
+
+        for target in (WSGITarget(WSGIHandler(), 3), ASGITarget(ASGIHandler())):
+            report = asyncio.run(run_scenario(scenario, target, seed=1))
+            target.close()
+            routes = report['routes']
+            self.assertEqual(list(routes), ['demo-create', 'demo-get', 'demo-missing'])
+            self.assertGreater(routes['demo-get']['requests'], 0)
+            self.assertEqual(set(routes['demo-get']['statuses']), {'200'})
+            self.assertEqual(routes['demo-missing']['error_rate'], 1.0)
+            self.assertEqual(report['errors'], routes['demo-missing']['errors'])
+            self.assertEqual(sum(routes['demo-create']['histogram'].values()), routes['demo-create']['requests'])
+
+    def test_bundled_scenarios_are_valid(self):
+        from pathlib import Path
+        from benchmarks.loadtest import load_scenario
+
+        paths = sorted(Path(__file__).resolve().parent.parent.joinpath('benchmarks', 'scenarios').glob('*.json'))
+        self.assertGreaterEqual(len(paths), 3)
+        for path in paths:
+            scenario = load_scenario(path)
+            self.assertTrue(all(step['weight'] > 0 for step in scenario['steps']), path.name)
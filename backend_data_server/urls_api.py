@@ -0,0 +1,10 @@
+"""
+URLconf del perfil API (``DJANGO_PROFILE=api``): sólo las rutas de las APIs.
+"""
+
+from django.urls import path, include
+
+urlpatterns = [
+    path('demo/rest/api/', include('demo_rest_api.urls')),
+    path('landing/api/', include('landing_api.urls')),
+]
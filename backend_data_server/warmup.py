@@ -0,0 +1,105 @@
+"""
+Calentamiento del worker antes de aceptar tráfico.
+
+``wsgi.py`` y ``asgi.py`` llaman a ``warm_up()`` justo después de crear la
+aplicación (si ``WARMUP_ON_START`` está activo), de modo que el servidor no
+entrega peticiones al worker hasta que termina. Se compila el URLconf y
+después se llama al método ``warm_up()`` de cada ``AppConfig`` que lo defina
+(plantillas, índices, cachés, pool de Firebase).
+
+Un paso que falla se registra y no impide al resto: el worker queda listo
+igualmente y la primera petición paga lo que no se pudo preparar.
+``/readyz`` informa del estado y del tiempo de cada paso.
+"""
+import logging
+import threading
+import time
+
+from django.apps import apps
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+READY = 'ready'
+SKIPPED = 'skipped'
+
+_lock = threading.Lock()
+state = PENDING
+steps = {}
+
+
+def warm_urls():
+    """Import every view module and compile the URL patterns."""
+    from django.urls import get_resolver
+
+    resolver = get_resolver()
+    # reverse_dict recorre todos los patrones y compila sus expresiones regulares
+    return len(resolver.reverse_dict)
+
+
+def tasks():
+    yield 'urls', warm_urls
+    for config in apps.get_app_configs():
+        warm = getattr(config, 'warm_up', None)
+        if callable(warm):
+            yield config.label, warm
+
+
+def run_step(name, func):
+    started = time.perf_counter()
+    try:
+        result = func()
+    except Exception as exc:
+        logger.warning('Warm-up step %s failed: %s', name, exc)
+        step = {'ok': False, 'error': str(exc)}
+    else:
+        step = {'ok': True}
+        if result is not None:
+            step['result'] = result
+    step['ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return step
+
+
+def warm_up():
+    """Run every warm-up step once; later calls return the stored results."""
+    global state
+    with _lock:
+        if state in (READY, SKIPPED):
+            return steps
+        state = RUNNING
+        started = time.perf_counter()
+        for name, func in tasks():
+            steps[name] = run_step(name, func)
+        state = READY
+        logger.info('Worker warmed up in %.0f ms', (time.perf_counter() - started) * 1000)
+    return steps
+
+
+def skip():
+    """Mark the worker ready without warming up (``WARMUP_ON_START = False``)."""
+    global state
+    with _lock:
+        if state == PENDING:
+            state = SKIPPED
+
+
+def is_ready():
+    return state in (READY, SKIPPED)
+
+
+def reset():
+    global state
+    with _lock:
+        state = PENDING
+        steps.clear()
+
+
+def start():
+    """Entry point used by ``wsgi.py`` and ``asgi.py``."""
+    from django.conf import settings
+
+    if getattr(settings, 'WARMUP_ON_START', True):
+        warm_up()
+    else:
+        skip()
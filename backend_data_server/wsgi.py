@@ -11,6 +11,11 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend_data_server.settings")
+from backend_data_server import default_settings_module, warmup
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", default_settings_module())
 
 application = get_wsgi_application()
+
+# Prepara cachés e índices antes de que el servidor entregue peticiones
+warmup.start()
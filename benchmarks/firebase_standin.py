@@ -0,0 +1,189 @@
+"""
+Sustituto local de Firebase Realtime Database para pruebas de carga.
+
+Atiende en un puerto local el subconjunto de la API REST que usa
+``landing_api/gateway.py``: ``GET``, ``PUT``, ``PATCH`` (actualización
+multi-ruta), ``POST`` (clave push) y ``DELETE`` sobre ``/<ruta>.json``, y las
+consultas por clave de ``mirror.py`` (``orderBy="$key"`` con ``startAt``,
+``endAt``, ``limitToFirst`` y ``limitToLast``). Los datos viven en memoria y
+no se pide autenticación.
+
+``latency`` añade un retardo fijo por petición y ``error_rate`` responde 503
+a esa fracción de peticiones, para ver cómo se comportan el circuit breaker,
+la caché y la cola local cuando Firebase va lento o falla.
+
+    standin = FirebaseStandIn(latency=0.02).start()
+    ...  # FIREBASE_DATABASE_URL = standin.url
+    standin.stop()
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from landing_api.pushid import new_push_key
+
+
+def split_path(path):
+    path = urlsplit(path).path
+    if path.endswith('.json'):
+        path = path[:-len('.json')]
+    return [part for part in path.split('/') if part]
+
+
+class FirebaseStandIn:
+    """In-memory Realtime Database REST server on ``127.0.0.1``."""
+
+    def __init__(self, data=None, latency=0.0, error_rate=0.0, port=0, seed=None):
+        self.root = data if data is not None else {}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.failed = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name='firebase-standin', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # Operaciones sobre el árbol, con el lock tomado
+
+    def _node(self, parts):
+        node = self.root
+        for part in parts:
+            if not isinstance(node, dict) or part not in node:
+                return None
+            node = node[part]
+        return node
+
+    def _set(self, parts, value):
+        if not parts:
+            self.root = value if isinstance(value, dict) else {}
+            return
+        node = self.root
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                if value is None:
+                    return
+                child = node[part] = {}
+            node = child
+        if value is None:
+            node.pop(parts[-1], None)
+        else:
+            node[parts[-1]] = value
+
+    def query(self, parts, params):
+        """Value at ``parts`` filtered by the key-ordered query in ``params``."""
+        with self._lock:
+            node = self._node(parts)
+            if not isinstance(node, dict) or 'orderBy' not in params:
+                return json.loads(json.dumps(node))
+            keys = sorted(node)
+            items = {}
+            start = json.loads(params['startAt']) if 'startAt' in params else None
+            end = json.loads(params['endAt']) if 'endAt' in params else None
+            keys = [key for key in keys if (start is None or key >= start) and (end is None or key <= end)]
+            if 'limitToFirst' in params:
+                keys = keys[:int(params['limitToFirst'])]
+            if 'limitToLast' in params:
+                keys = keys[-int(params['limitToLast']):]
+            for key in keys:
+                items[key] = node[key]
+            return json.loads(json.dumps(items)) if items else None
+
+    def write(self, method, parts, value):
+        with self._lock:
+            if method == 'PUT':
+                self._set(parts, value)
+                return value
+            if method == 'PATCH':
+                for path, child in value.items():
+                    self._set(parts + [part for part in path.split('/') if part], child)
+                return value
+            if method == 'POST':
+                key = new_push_key()
+                self._set(parts + [key], value)
+                return {'name': key}
+            self._set(parts, None)
+            return None
+
+    def count(self, method):
+        with self._lock:
+            self.requests[method] = self.requests.get(method, 0) + 1
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.failed += 1
+                return False
+            return True
+
+    def stats(self):
+        with self._lock:
+            return {'requests': dict(self.requests), 'failed': self.failed}
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def reply(self, code, value):
+                body = json.dumps(value).encode()
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def handle_method(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                if standin.latency:
+                    time.sleep(standin.latency)
+                if not standin.count(self.command):
+                    self.reply(503, {'error': 'Service unavailable (stand-in)'})
+                    return
+                parts = split_path(self.path)
+                if self.command == 'GET':
+                    params = {key: values[-1] for key, values in parse_qs(urlsplit(self.path).query).items()}
+                    self.reply(200, standin.query(parts, params))
+                    return
+                try:
+                    value = json.loads(raw) if raw else None
+                except ValueError:
+                    self.reply(400, {'error': 'Invalid data; couldn\'t parse JSON object.'})
+                    return
+                if self.command == 'PATCH' and not isinstance(value, dict):
+                    self.reply(400, {'error': 'Invalid data; couldn\'t parse JSON object.'})
+                    return
+                self.reply(200, standin.write(self.command, parts, value))
+
+            do_GET = do_PUT = do_PATCH = do_POST = do_DELETE = handle_method
+
+        return Handler
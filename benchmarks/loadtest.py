@@ -0,0 +1,617 @@
+#!/usr/bin/env python
+"""
+Pruebas de carga con mezclas de tráfico descritas en ficheros de escenario.
+
+Un escenario (JSON, ver ``benchmarks/scenarios/``) define los usuarios
+virtuales, la duración, el tiempo de espera entre peticiones y una lista de
+pasos con peso: cada usuario elige un paso al azar según los pesos, lo lanza,
+espera y repite hasta que se acaba el tiempo. Todo corre en un bucle asyncio,
+sin servicios externos.
+
+Destinos (``--target``):
+
+- ``wsgi``: la aplicación WSGI en este proceso, llamada desde un pool de hilos
+  (uno por usuario virtual), como haría un servidor con hilos.
+- ``asgi``: la aplicación ASGI en este proceso, en el mismo bucle.
+- ``socket``: la aplicación WSGI servida en un puerto local por el servidor con
+  hilos de ``runserver``; las peticiones viajan por TCP con keep-alive.
+- ``http://host:puerto``: un servidor ya arrancado (gunicorn, uvicorn...).
+
+En los tres primeros Firebase se sustituye por ``firebase_standin.py`` en un
+puerto local (con ``--firebase-latency`` y ``--firebase-error-rate`` para
+simular un Firebase lento o inestable), el almacén de demo_rest_api y
+landing_data se llenan con ``seed_users`` y ``seed_landing`` registros, y
+la réplica de landing va a un fichero temporal. Dentro del proceso cada
+usuario virtual llega desde una IP distinta, así que el limitador de tasa
+actúa por usuario; por socket todas las peticiones llegan desde 127.0.0.1.
+
+Se informa por paso de peticiones por segundo, latencias (p50/p90/p99/máx.
+e histograma) y tasa de errores; cuenta como error una respuesta fuera de
+``expect`` (por defecto, cualquier código >= 400) o una excepción.
+
+    python benchmarks/loadtest.py benchmarks/scenarios/mixed.json
+    python benchmarks/loadtest.py benchmarks/scenarios/mixed.json --target asgi --users 50 --duration 60
+    python benchmarks/loadtest.py benchmarks/scenarios/landing_campaign.json --target socket --firebase-latency 0.05
+"""
+import argparse
+import asyncio
+import bisect
+import io
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# Límites superiores de los tramos del histograma, en milisegundos
+HISTOGRAM_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+
+SCENARIO_DEFAULTS = {
+    "description": "",
+    "users": 10,
+    "duration": 30.0,
+    "ramp_up": 0.0,
+    "think_time": [0.0, 0.0],
+    "timeout": 10.0,
+    "seed_users": 1000,
+    "seed_landing": 500,
+}
+
+
+class MissingValue(Exception):
+    """A step needs a value (e.g. a demo user id) that is not available yet."""
+
+
+def load_scenario(path):
+    with open(path, encoding="utf-8") as handle:
+        scenario = dict(SCENARIO_DEFAULTS, **json.load(handle))
+    scenario.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    if not scenario.get("steps"):
+        raise ValueError(f"{path}: a scenario needs at least one step")
+    names = set()
+    for step in scenario["steps"]:
+        for key in ("name", "method", "path"):
+            if key not in step:
+                raise ValueError(f"{path}: every step needs '{key}'")
+        if step["name"] in names:
+            raise ValueError(f"{path}: duplicate step name '{step['name']}'")
+        names.add(step["name"])
+        step["method"] = step["method"].upper()
+        step.setdefault("weight", 1)
+    return scenario
+
+
+def render(value, context):
+    """Fill ``{placeholders}`` in strings, recursively through lists and dicts."""
+    if isinstance(value, str):
+        return value.format_map(context)
+    if isinstance(value, list):
+        return [render(item, context) for item in value]
+    if isinstance(value, dict):
+        return {key: render(item, context) for key, item in value.items()}
+    return value
+
+
+def extract(document, path):
+    """Value at a dotted ``path`` (``data.id``) of a decoded JSON body, or ``None``."""
+    for part in path.split("."):
+        if isinstance(document, dict):
+            document = document.get(part)
+        elif isinstance(document, list) and part.isdigit() and int(part) < len(document):
+            document = document[int(part)]
+        else:
+            return None
+    return document
+
+
+class Context(dict):
+    """Placeholder values for one request; ``user_id`` is drawn from the known ids on use."""
+
+    def __init__(self, rng, ids, **values):
+        super().__init__(values)
+        self.rng = rng
+        self.ids = ids
+
+    def __missing__(self, key):
+        if key == "user_id":
+            if not self.ids:
+                raise MissingValue("no demo user ids known yet")
+            return self.rng.choice(self.ids)
+        if key == "uid":
+            return "%016x" % self.rng.getrandbits(64)
+        raise KeyError(key)
+
+
+class RouteStats:
+    """Latencies and outcomes of one scenario step."""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = 0
+        self.skipped = 0
+
+    def record(self, latency, status, error):
+        self.latencies.append(latency)
+        self.statuses[status] += 1
+        if error:
+            self.errors += 1
+
+    def histogram(self):
+        counts = [0] * len(HISTOGRAM_MS)
+        for latency in self.latencies:
+            counts[bisect.bisect_left(HISTOGRAM_MS, latency * 1000)] += 1
+        return counts
+
+    def summary(self, elapsed):
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+
+        def percentile(p):
+            return ordered[min(count - 1, int(p * count))] * 1000 if count else None
+
+        return {
+            "requests": count,
+            "rps": count / elapsed if elapsed else 0.0,
+            "errors": self.errors,
+            "error_rate": self.errors / count if count else 0.0,
+            "skipped": self.skipped,
+            "statuses": {str(status): n for status, n in sorted(self.statuses.items(), key=str)},
+            "p50_ms": percentile(0.50),
+            "p90_ms": percentile(0.90),
+            "p99_ms": percentile(0.99),
+            "max_ms": ordered[-1] * 1000 if count else None,
+            "histogram": {
+                ("<=%g ms" % bound if bound != float("inf") else ">%g ms" % HISTOGRAM_MS[-2]): n
+                for bound, n in zip(HISTOGRAM_MS, self.histogram())
+            },
+        }
+
+
+# Destinos: request(method, path, headers, body, client) -> (status, body)
+
+def client_address(client):
+    return "10.%d.%d.%d" % (client >> 16 & 255, client >> 8 & 255, client & 255)
+
+
+class WSGITarget:
+    """Calls a WSGI application from a thread pool."""
+
+    def __init__(self, application, workers):
+        self.application = application
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loadtest-wsgi")
+
+    def call(self, method, path, headers, body, client):
+        from wsgiref.util import setup_testing_defaults
+
+        path, _, query = path.partition("?")
+        environ = {
+            "REMOTE_ADDR": client_address(client),
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": io.BytesIO(body),
+        }
+        for name, value in headers.items():
+            environ["HTTP_" + name.upper().replace("-", "_")] = value
+        setup_testing_defaults(environ)
+        status = []
+        chunks = self.application(environ, lambda s, h, exc_info=None: status.append(s))
+        try:
+            content = b"".join(chunks)
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+        return int(status[0].split()[0]), content
+
+    async def request(self, method, path, headers, body, client):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.call, method, path, headers, body, client)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+class ASGITarget:
+    """Calls an ASGI application in the running event loop."""
+
+    def __init__(self, application):
+        self.application = application
+
+    async def request(self, method, path, headers, body, client):
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"testserver"), (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode())]
+                       + [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+            "client": (client_address(client), 50000),
+            "server": ("testserver", 80),
+        }
+        sent = asyncio.Event()
+        delivered = False
+        status = None
+        content = []
+
+        async def receive():
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Django escucha la desconexión mientras atiende: llega cuando acaba la respuesta
+            await sent.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                content.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    sent.set()
+
+        await self.application(scope, receive, send)
+        sent.set()
+        return status, b"".join(content)
+
+    def close(self):
+        pass
+
+
+async def read_response(reader):
+    """Read one HTTP/1.x response; returns ``(status, body, keep_alive)``."""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionResetError("connection closed by server")
+    version, code = line.split(None, 2)[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    keep_alive = version == b"HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    if "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            chunks.append((await reader.readexactly(size + 2))[:-2])
+        body = b"".join(chunks)
+    else:
+        body = await reader.read()
+        keep_alive = False
+    return int(code), body, keep_alive
+
+
+class SocketTarget:
+    """HTTP/1.1 over TCP with one keep-alive connection per virtual user."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.connections = {}
+
+    async def request(self, method, path, headers, body, client):
+        head = [f"{method} {self.prefix}{path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                "Content-Type: application/json", f"Content-Length: {len(body)}"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        payload = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+        reused = client in self.connections
+        for attempt in range(2):
+            connection = self.connections.pop(client, None)
+            if connection is None:
+                connection = await asyncio.open_connection(self.host, self.port)
+            reader, writer = connection
+            try:
+                writer.write(payload)
+                await writer.drain()
+                status, content, keep_alive = await read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                # El servidor pudo cerrar una conexión keep-alive ociosa: se reintenta una vez
+                if reused and attempt == 0:
+                    continue
+                raise
+            if keep_alive:
+                self.connections[client] = connection
+            else:
+                writer.close()
+            return status, content
+
+    def close(self):
+        for _, writer in self.connections.values():
+            writer.close()
+        self.connections.clear()
+
+
+class LocalServer:
+    """The WSGI app behind the threaded server used by ``runserver``, on a free local port."""
+
+    def __init__(self, application):
+        from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+
+        # Sin una línea de log por petición
+        logging.getLogger("django.server").setLevel(logging.CRITICAL)
+        self.server = ThreadedWSGIServer(("127.0.0.1", 0), WSGIRequestHandler, allow_reuse_address=True)
+        self.server.set_app(application)
+        self.thread = threading.Thread(target=self.server.serve_forever, name="loadtest-server", daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# Ejecución
+
+async def virtual_user(client, scenario, target, stats, ids, counter, deadline, rng):
+    loop = asyncio.get_running_loop()
+    steps = scenario["steps"]
+    weights = [step["weight"] for step in steps]
+    low, high = scenario["think_time"]
+    if scenario["ramp_up"]:
+        await asyncio.sleep(scenario["ramp_up"] * client / max(1, scenario["users"]))
+
+    while loop.time() < deadline:
+        step = rng.choices(steps, weights)[0]
+        route = stats[step["name"]]
+        context = Context(rng, ids, n=next(counter), user=client)
+        try:
+            path = render(step["path"], context)
+            headers = render(step.get("headers", {}), context)
+            body = json.dumps(render(step["body"], context)).encode() if "body" in step else b""
+        except MissingValue:
+            route.skipped += 1
+            await asyncio.sleep(0)
+            continue
+
+        started = time.perf_counter()
+        try:
+            status, content = await asyncio.wait_for(
+                target.request(step["method"], path, headers, body, client), scenario["timeout"]
+            )
+        except Exception as exc:
+            route.record(time.perf_counter() - started, type(exc).__name__, True)
+        else:
+            expect = step.get("expect")
+            error = status >= 400 if expect is None else status not in expect
+            route.record(time.perf_counter() - started, status, error)
+            if "capture" in step and not error:
+                try:
+                    captured = extract(json.loads(content), step["capture"])
+                except ValueError:
+                    captured = None
+                if captured is not None:
+                    ids.append(captured)
+
+        if high:
+            await asyncio.sleep(rng.uniform(low, high))
+        else:
+            # Cede el bucle aunque no haya espera entre peticiones
+            await asyncio.sleep(0)
+
+
+async def collect_ids(target, limit=1000):
+    """Ids of existing demo users, read through the target itself."""
+    status, content = await target.request("GET", f"/demo/rest/api/index/?limit={limit}", {}, b"", 0)
+    if status != 200:
+        return []
+    return [item["id"] for item in json.loads(content).get("data", []) if "id" in item]
+
+
+async def run_scenario(scenario, target, seed=None):
+    """Run ``scenario`` against ``target``; returns the report as a dict."""
+    rng = random.Random(seed)
+    stats = {step["name"]: RouteStats() for step in scenario["steps"]}
+    ids = await collect_ids(target)
+    counter = itertools.count()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + scenario["duration"]
+    await asyncio.gather(*(
+        virtual_user(client, scenario, target, stats, ids, counter, deadline, random.Random(rng.random()))
+        for client in range(scenario["users"])
+    ))
+    elapsed = loop.time() - started
+
+    routes = {name: route.summary(elapsed) for name, route in stats.items()}
+    requests = sum(route["requests"] for route in routes.values())
+    errors = sum(route["errors"] for route in routes.values())
+    return {
+        "scenario": scenario["name"],
+        "users": scenario["users"],
+        "elapsed": elapsed,
+        "requests": requests,
+        "rps": requests / elapsed if elapsed else 0.0,
+        "errors": errors,
+        "error_rate": errors / requests if requests else 0.0,
+        "routes": routes,
+    }
+
+
+# Preparación dentro del proceso
+
+def seed_data(standin, store, users, landing):
+    from demo_rest_api.ids import new_id
+    from landing_api.pushid import new_push_key
+
+    for i in range(users):
+        store.create({
+            "id": new_id(),
+            "name": f"Seed User {i}",
+            "email": f"seed{i}@example.com",
+            "is_active": i % 5 != 0,
+        })
+    # Envíos repartidos en los últimos 30 días, con claves push de su momento
+    now_ms = int(time.time() * 1000)
+    standin.root["landing_data"] = {
+        new_push_key(now_ms - (landing - i) * 30 * 86400 * 1000 // max(1, landing)): {
+            "name": f"Visitor {i}",
+            "email": f"visitor{i}@example.com",
+            "source": ("ads", "organic", "newsletter")[i % 3],
+        }
+        for i in range(landing)
+    }
+
+
+def prepare_inprocess(kind, scenario, args):
+    """Load the app with Firebase pointed at a local stand-in; returns ``(application, standin)``."""
+    from benchmarks.firebase_standin import FirebaseStandIn
+
+    if args.profile:
+        os.environ["DJANGO_PROFILE"] = args.profile
+    # El calentamiento se lanza después, con Firebase apuntando al sustituto
+    os.environ["DJANGO_WARMUP"] = "0"
+    os.environ["LANDING_MIRROR_PATH"] = os.path.join(tempfile.mkdtemp(prefix="loadtest-"), "mirror.sqlite3")
+
+    if kind == "asgi":
+        from backend_data_server.asgi import application
+    else:
+        from backend_data_server.wsgi import application
+
+    from backend_data_server import warmup
+    from demo_rest_api.store import get_store
+    from landing_api.gateway import firebase
+
+    # Los 4xx (429, 404) son parte de la carga y salen en el informe, no en el log
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+
+    standin = FirebaseStandIn(latency=args.firebase_latency, error_rate=args.firebase_error_rate, seed=args.seed)
+    standin.start()
+    firebase.close()
+    firebase.database_url = standin.url
+    firebase.token_provider = None
+    firebase.http2 = False
+
+    seed_data(standin, get_store(), scenario["seed_users"], scenario["seed_landing"])
+    warmup.reset()
+    warmup.warm_up()
+    return application, standin
+
+
+def print_report(report, target):
+    print(f"\n{report['scenario']} on {target}: {report['users']} users, {report['elapsed']:.1f} s, "
+          f"{report['requests']} requests, {report['rps']:.1f} req/s, {report['error_rate']:.1%} errors")
+    print(f"{'step':24}{'reqs':>8}{'req/s':>9}{'errors':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}  statuses")
+
+    def ms(value):
+        return f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+
+    for name, route in report["routes"].items():
+        statuses = " ".join(f"{status}:{n}" for status, n in route["statuses"].items())
+        if route["skipped"]:
+            statuses += f" skipped:{route['skipped']}"
+        print(f"{name:24}{route['requests']:>8}{route['rps']:>9.1f}{route['error_rate']:>9.1%}"
+              + ms(route["p50_ms"]) + ms(route["p90_ms"]) + ms(route["p99_ms"]) + ms(route["max_ms"])
+              + f"  {statuses}")
+
+    print("\nlatency histogram (requests per bucket)")
+    labels = list(next(iter(report["routes"].values()))["histogram"])
+    print(f"{'step':24}" + "".join(f"{label.replace(' ms', ''):>7}" for label in labels))
+    for name, route in report["routes"].items():
+        print(f"{name:24}" + "".join(f"{n:>7}" for n in route["histogram"].values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenario", help="Fichero JSON del escenario.")
+    parser.add_argument("--target", default="wsgi", help="wsgi, asgi, socket o la URL de un servidor en marcha.")
+    parser.add_argument("--users", type=int, help="Usuarios virtuales (por defecto, los del escenario).")
+    parser.add_argument("--duration", type=float, help="Segundos de prueba (por defecto, los del escenario).")
+    parser.add_argument("--profile", choices=("full", "api"), help="DJANGO_PROFILE de la aplicación en proceso.")
+    parser.add_argument("--firebase-latency", type=float, default=0.0, help="Segundos de retardo del sustituto.")
+    parser.add_argument("--firebase-error-rate", type=float, default=0.0, help="Fracción de respuestas 503.")
+    parser.add_argument("--seed", type=int, help="Semilla para repetir la misma secuencia de pasos.")
+    parser.add_argument("--json", dest="json_path", help="Guarda el informe completo en este fichero.")
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario)
+    if args.users is not None:
+        scenario["users"] = args.users
+    if args.duration is not None:
+        scenario["duration"] = args.duration
+
+    standin = server = None
+    if args.target in ("wsgi", "asgi", "socket"):
+        application, standin = prepare_inprocess("asgi" if args.target == "asgi" else "wsgi", scenario, args)
+        if args.target == "wsgi":
+            target = WSGITarget(application, scenario["users"])
+        elif args.target == "asgi":
+            target = ASGITarget(application)
+        else:
+            server = LocalServer(application).start()
+            target = SocketTarget(server.url)
+    elif args.target.startswith("http://"):
+        target = SocketTarget(args.target)
+    else:
+        parser.error("--target must be wsgi, asgi, socket or an http:// URL")
+
+    async def execute():
+        try:
+            return await run_scenario(scenario, target, seed=args.seed)
+        finally:
+            # Dentro del bucle: las conexiones por socket se cierran con él
+            target.close()
+
+    try:
+        report = asyncio.run(execute())
+    finally:
+        if server is not None:
+            server.stop()
+        if standin is not None:
+            report_firebase = standin.stats()
+            standin.stop()
+
+    report["target"] = args.target
+    if standin is not None:
+        report["firebase"] = report_firebase
+    print_report(report, args.target)
+    if standin is not None:
+        calls = ", ".join(f"{method} {n}" for method, n in sorted(report_firebase["requests"].items()))
+        print(f"\nfirebase stand-in: {calls or 'no requests'}; {report_firebase['failed']} answered 503 on purpose")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
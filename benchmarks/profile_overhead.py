@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Compara el perfil completo con el perfil API (``DJANGO_PROFILE=api``).
+
+Para cada perfil lanza un proceso nuevo que mide el arranque del worker
+(importar la aplicación WSGI) y el coste por petición de pasar por toda la
+pila de middleware con una petición GET y otra POST a demo_rest_api,
+llamando a la aplicación WSGI directamente, sin servidor ni red.
+
+    python benchmarks/profile_overhead.py --requests 5000
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child(requests):
+    started = time.perf_counter()
+    sys.path.insert(0, BASE_DIR)
+    from backend_data_server.wsgi import application
+    startup = time.perf_counter() - started
+
+    from wsgiref.util import setup_testing_defaults
+    from django.conf import settings
+    from demo_rest_api.views import data_list
+
+    body = json.dumps({"name": "Bench User", "email": "bench@example.com"}).encode()
+
+    def call(method, payload=b"", client=0):
+        environ = {
+            # Una IP distinta por petición: se mide el limitador sin recibir 429
+            "REMOTE_ADDR": "10.%d.%d.%d" % (client >> 16 & 255, client >> 8 & 255, client & 255),
+            "REQUEST_METHOD": method,
+            "PATH_INFO": "/demo/rest/api/index/",
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(payload)),
+            "wsgi.input": io.BytesIO(payload),
+        }
+        setup_testing_defaults(environ)
+        status = []
+        chunks = application(environ, lambda s, h, exc_info=None: status.append(s))
+        b"".join(chunks)
+        return status[0]
+
+    def timed(method, payload=b""):
+        call(method, payload)  # calentamiento
+        begin = time.perf_counter()
+        for i in range(requests):
+            call(method, payload, i)
+        return (time.perf_counter() - begin) / requests
+
+    del data_list[3:]
+    get_time = timed("GET")
+    post_time = timed("POST", body)
+
+    print(json.dumps({
+        "startup": startup,
+        "get": get_time,
+        "post": post_time,
+        "middleware": len(settings.MIDDLEWARE),
+        "apps": len(settings.INSTALLED_APPS),
+    }))
+
+
+def run_profile(profile, requests):
+    # Sin calentamiento: sólo se mide la pila de middleware, sin llamar a Firebase
+    env = dict(os.environ, DJANGO_PROFILE=profile, DJANGO_WARMUP="0")
+    env.pop("DJANGO_SETTINGS_MODULE", None)
+    begin = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", "--requests", str(requests)],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - begin
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.requests)
+        return
+
+    results = {profile: run_profile(profile, args.requests) for profile in ("full", "api")}
+    full, api = results["full"], results["api"]
+
+    print(f"{'':24}{'full':>12}{'api':>12}{'delta':>10}")
+    rows = (
+        ("installed apps", "apps", 1, "{:>12d}"),
+        ("middleware", "middleware", 1, "{:>12d}"),
+        ("app import (ms)", "startup", 1e3, "{:>12.1f}"),
+        ("process total (ms)", "process", 1e3, "{:>12.1f}"),
+        ("GET per request (us)", "get", 1e6, "{:>12.1f}"),
+        ("POST per request (us)", "post", 1e6, "{:>12.1f}"),
+    )
+    for label, key, scale, fmt in rows:
+        a, b = full[key] * scale, api[key] * scale
+        delta = f"{(b - a) / a * 100:>+9.0f}%" if a else ""
+        print(f"{label:24}" + fmt.format(a) + fmt.format(b) + delta)
+
+
+if __name__ == "__main__":
+    main()
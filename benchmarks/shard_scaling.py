@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Escalado del almacén de demo_rest_api con el número de shards.
+
+Carga ``--records`` usuarios en el almacén local (``data_list``) y en el
+particionado con 1..N procesos, y mide con ``--clients`` hilos concurrentes:
+
+- lecturas por id y altas por segundo (operaciones puntuales, un shard);
+- latencia de listar los activos y de buscar (fan-out a todos los shards
+  y mezcla de k vías).
+
+    python benchmarks/shard_scaling.py --records 200000 --max-shards 8
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from demo_rest_api.ids import new_id  # noqa: E402
+from demo_rest_api.shards import ShardedStore  # noqa: E402
+from demo_rest_api.store import LocalStore, UserTable  # noqa: E402
+
+
+def make_users(count):
+    return [
+        {
+            "id": new_id(),
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "is_active": i % 5 != 0,
+        }
+        for i in range(count)
+    ]
+
+
+def throughput(operation, clients, seconds):
+    """Run ``operation`` from ``clients`` threads for ``seconds``; returns ops/s."""
+    done = [0] * clients
+    deadline = time.perf_counter() + seconds
+
+    def worker(slot):
+        rng = random.Random(slot)
+        while time.perf_counter() < deadline:
+            operation(rng)
+            done[slot] += 1
+
+    threads = [threading.Thread(target=worker, args=(slot,)) for slot in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(done) / seconds
+
+
+def latency(operation, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure(store, ids, clients, seconds, repeat):
+    def read(rng):
+        store.get(rng.choice(ids))
+
+    def create(rng):
+        store.create({"id": new_id(), "name": "New", "email": "new@example.com", "is_active": True})
+
+    return {
+        "reads": throughput(read, clients, seconds),
+        "creates": throughput(create, clients, seconds),
+        "list": latency(store.active, repeat),
+        "search": latency(lambda: store.search("user12345"), repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--max-shards", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--clients", type=int, default=8, help="Hilos que lanzan operaciones puntuales.")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Duración de cada prueba de throughput.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones de listado y búsqueda (se toma la mejor).")
+    args = parser.parse_args()
+
+    users = make_users(args.records)
+    ids = [user["id"] for user in users]
+
+    print(f"{args.records} users, {args.clients} client threads, {os.cpu_count()} CPUs")
+    print(f"{'store':>10}{'reads/s':>12}{'creates/s':>12}{'list (ms)':>12}{'search (ms)':>13}")
+
+    def report(label, result):
+        print(
+            f"{label:>10}{result['reads']:>12.0f}{result['creates']:>12.0f}"
+            f"{result['list'] * 1e3:>12.1f}{result['search'] * 1e3:>13.1f}"
+        )
+
+    table = UserTable(dict(user) for user in users)
+    table.build_index()
+    report("local", measure(LocalStore(table), ids, args.clients, args.seconds, args.repeat))
+    del table
+
+    shards = 1
+    while shards <= args.max_shards:
+        store = ShardedStore(shards=shards)
+        try:
+            store.load(users)
+            report(f"{shards} shards", measure(store, ids, args.clients, args.seconds, args.repeat))
+        finally:
+            store.close()
+        shards *= 2
+
+
+if __name__ == "__main__":
+    main()
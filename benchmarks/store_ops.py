@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks de las operaciones del almacén de demo_rest_api.
+
+Para cada backend (``local``, ``tiered``, ``sharded``) y cada tamaño de
+colección carga ``N`` usuarios (uno de cada cinco inactivo) y mide:
+
+- operaciones puntuales, en microsegundos por operación (media y p99):
+  ``insert`` (alta), ``lookup`` (lectura por id), ``update`` (``PATCH``
+  parcial) y ``soft_delete`` (baja lógica);
+- operaciones sobre la colección, en milisegundos (la mejor de ``--repeat``):
+  ``page`` (primera página de 50 activos, lo que pide ``?limit=50``),
+  ``active`` (todos los activos), ``search`` (filtro por texto) y ``export``
+  (los activos serializados a JSON, lo que devuelve el listado sin paginar).
+
+Con ``tracemalloc`` se mide además, en una segunda pasada, la memoria que
+ocupa la colección cargada, los bytes retenidos por alta y el pico de
+memoria de cada operación sobre la colección. La pasada de tiempos se hace
+sin trazar, porque ``tracemalloc`` ralentiza cada asignación. Del backend
+``sharded`` sólo se ve el proceso principal: la memoria de los shards vive
+en sus procesos.
+
+En el backend ``tiered`` los inactivos pasan al nivel frío al calentar el
+almacén, antes de medir, así que las lecturas por id de usuarios inactivos
+van a SQLite (o a su caché LRU); la memoria de SQLite tampoco la ve
+``tracemalloc``.
+
+    python benchmarks/store_ops.py --sizes 1000,100000 --backends local,tiered
+    python benchmarks/store_ops.py --json after.json --compare before.json
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+POINT_OPS = ("insert", "lookup", "update", "soft_delete")
+BULK_OPS = ("page", "active", "search", "export")
+BACKENDS = ("local", "tiered", "sharded")
+
+
+def setup_django():
+    # tiers.py lee sus valores por defecto de los settings al importarse
+    import django
+    from backend_data_server import default_settings_module
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", default_settings_module())
+    django.setup()
+
+
+def make_users(count, start=0):
+    from demo_rest_api.ids import new_id
+
+    return [
+        {
+            "id": new_id(),
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "is_active": i % 5 != 0,
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def build(backend, users, shards):
+    """A store of kind ``backend`` holding copies of ``users``."""
+    from demo_rest_api.store import LocalStore, UserTable
+
+    if backend == "sharded":
+        from demo_rest_api.shards import ShardedStore
+
+        store = ShardedStore(shards=shards)
+        store.load(users)
+        return store
+    table = UserTable(dict(user) for user in users)
+    if backend == "local":
+        store = LocalStore(table)
+    else:
+        from demo_rest_api.tiers import TieredStore
+
+        store = TieredStore(table, cold_after=0)
+    store.warm_up()
+    return store
+
+
+def close(store):
+    if hasattr(store, "close"):
+        store.close()
+
+
+def point_ops(store, ids, active_ids, ops, rng):
+    """Callables for each point operation, each run ``ops`` times with fresh arguments."""
+    inserts = iter(make_users(ops, start=10 ** 9))
+    lookups = [rng.choice(ids) for _ in range(ops)]
+    updates = [rng.choice(ids) for _ in range(ops)]
+    deletes = rng.sample(active_ids, min(ops, len(active_ids)))
+    return {
+        "insert": (ops, lambda i: store.create(next(inserts))),
+        "lookup": (ops, lambda i: store.get(lookups[i])),
+        "update": (ops, lambda i: store.update(updates[i], {"name": f"Renamed {i}"})),
+        "soft_delete": (len(deletes), lambda i: store.deactivate(deletes[i])),
+    }
+
+
+def bulk_ops(store):
+    return {
+        "page": lambda: store.query(limit=50),
+        "active": store.active,
+        # Coincide con una pequeña parte de la colección, como una búsqueda real
+        "search": lambda: store.search("user12"),
+        "export": lambda: json.dumps(store.active()),
+    }
+
+
+def time_point(count, operation):
+    samples = []
+    for i in range(count):
+        started = time.perf_counter()
+        operation(i)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "mean_us": sum(samples) / len(samples) * 1e6 if samples else None,
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6 if samples else None,
+    }
+
+
+def time_bulk(operation, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        best = min(best, time.perf_counter() - started)
+    return {"ms": best * 1e3}
+
+
+def traced_peak(operation):
+    """Bytes allocated at the peak of ``operation`` above what was live before it."""
+    gc.collect()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = operation()
+    peak = tracemalloc.get_traced_memory()[1] - before
+    del result
+    return peak
+
+
+def run(backend, size, shards, ops, repeat, memory, seed):
+    rng = random.Random(seed)
+    users = make_users(size)
+    ids = [user["id"] for user in users]
+    active_ids = [user["id"] for user in users if user["is_active"]]
+    result = {"backend": backend, "size": size, "ops": {}}
+
+    if memory:
+        # Construcción aparte y trazada: sólo para medir lo que ocupa la colección
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        store = build(backend, users, shards)
+        gc.collect()
+        result["store_bytes"] = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        close(store)
+        del store
+
+    started = time.perf_counter()
+    store = build(backend, users, shards)
+    result["load_ms"] = (time.perf_counter() - started) * 1e3
+    try:
+        # Tiempos sin trazar: primero las lecturas y la colección, después lo que la cambia
+        for name, operation in bulk_ops(store).items():
+            result["ops"][name] = time_bulk(operation, repeat)
+        for name, (count, operation) in point_ops(store, ids, active_ids, ops, rng).items():
+            result["ops"][name] = time_point(count, operation)
+
+        if memory:
+            tracemalloc.start()
+            for name, operation in bulk_ops(store).items():
+                result["ops"][name]["peak_bytes"] = traced_peak(operation)
+            # Desde antes de crear los usuarios: cuenta lo que el almacén conserva de cada alta
+            gc.collect()
+            before = tracemalloc.get_traced_memory()[0]
+            count, insert = point_ops(store, ids, active_ids, ops, rng)["insert"]
+            for i in range(count):
+                insert(i)
+            del insert
+            gc.collect()
+            result["ops"]["insert"]["retained_bytes"] = (tracemalloc.get_traced_memory()[0] - before) / count
+            tracemalloc.stop()
+    finally:
+        close(store)
+    return result
+
+
+def key(result):
+    return result["backend"], result["size"]
+
+
+def headline(data):
+    """Main number of an operation, in its own unit."""
+    return data.get("mean_us", data.get("ms"))
+
+
+def print_results(results, baseline=None):
+    previous = {key(result): result for result in baseline or ()}
+
+    def mb(value):
+        return f"{value / 2 ** 20:>9.1f}" if value is not None else f"{'-':>9}"
+
+    print(f"{'backend':>8}{'size':>10}{'load ms':>10}{'store MB':>10}")
+    for result in results:
+        print(f"{result['backend']:>8}{result['size']:>10}{result['load_ms']:>10.0f} " + mb(result.get("store_bytes")))
+
+    print("\npoint operations (us per op, mean / p99)")
+    print(f"{'backend':>8}{'size':>10}" + "".join(f"{op:>20}" for op in POINT_OPS) + f"{'bytes/insert':>14}")
+    for result in results:
+        cells = "".join(
+            f"{result['ops'][op]['mean_us']:>11.1f} /{result['ops'][op]['p99_us']:>7.1f}"
+            if result["ops"][op]["mean_us"] is not None else f"{'-':>20}"
+            for op in POINT_OPS
+        )
+        retained = result["ops"]["insert"].get("retained_bytes")
+        print(f"{result['backend']:>8}{result['size']:>10}{cells}"
+              + (f"{retained:>14.0f}" if retained is not None else f"{'-':>14}"))
+
+    print("\ncollection operations (ms, best of runs / peak MB)")
+    print(f"{'backend':>8}{'size':>10}" + "".join(f"{op:>20}" for op in BULK_OPS))
+    for result in results:
+        cells = ""
+        for op in BULK_OPS:
+            peak = result["ops"][op].get("peak_bytes")
+            cells += f"{result['ops'][op]['ms']:>11.2f} /" + (f"{peak / 2 ** 20:>7.1f}" if peak is not None else f"{'-':>7}")
+        print(f"{result['backend']:>8}{result['size']:>10}{cells}")
+
+    if previous:
+        print("\nchange against baseline (time, new / old; < 1.00 is faster)")
+        print(f"{'backend':>8}{'size':>10}" + "".join(f"{op:>12}" for op in POINT_OPS + BULK_OPS))
+        for result in results:
+            old = previous.get(key(result))
+            if old is None:
+                continue
+            cells = ""
+            for op in POINT_OPS + BULK_OPS:
+                new_value = headline(result["ops"][op])
+                old_value = headline(old["ops"].get(op, {}))
+                cells += f"{new_value / old_value:>12.2f}" if new_value and old_value else f"{'-':>12}"
+            print(f"{result['backend']:>8}{result['size']:>10}{cells}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Tamaños de la colección, separados por comas.")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="Backends a medir, separados por comas.")
+    parser.add_argument("--shards", type=int, default=2, help="Procesos del backend sharded.")
+    parser.add_argument("--ops", type=int, default=2000, help="Repeticiones de cada operación puntual.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones de las operaciones sobre la colección.")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Sin la pasada de tracemalloc.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="Guarda los resultados en este fichero.")
+    parser.add_argument("--compare", help="Resultados anteriores (--json) con los que comparar.")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    backends = args.backends.split(",")
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"unknown backend(s): {', '.join(sorted(unknown))}")
+
+    setup_django()
+    results = []
+    for size in sizes:
+        for backend in backends:
+            print(f"{backend} with {size} users...", file=sys.stderr)
+            results.append(run(backend, size, args.shards, args.ops, args.repeat, args.memory, args.seed))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)["results"]
+    print_results(results, baseline)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump({"python": sys.version.split()[0], "cpus": os.cpu_count(), "results": results}, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,3 +4,43 @@ from django.apps import AppConfig
 class DemoRestApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "demo_rest_api"
+
+    def warm_up(self):
+        from .compaction import compactor
+        from .store import get_store
+
+        store = get_store()
+        result = store.warm_up()
+        result['compactor'] = compactor.start() or compactor.running
+        if hasattr(store, 'spill'):
+            from .tiers import spiller
+
+            result['spiller'] = spiller.start() or spiller.running
+        return result
+
+    def readiness(self):
+        from backend_data_server import warmup
+        from .store import get_store
+
+        check = get_store().readiness()
+        # Sin calentamiento el índice local se construye en la primera búsqueda
+        if warmup.state == warmup.SKIPPED and 'indexed' in check:
+            check['ok'] = True
+        return check
+
+    def stats(self):
+        from .compaction import compactor
+        from .feed import change_feed
+        from .store import get_store
+
+        store = get_store()
+        result = dict(
+            store.stats(),
+            feed_last_seq=change_feed.last_seq,
+            last_compaction=compactor.last_run,
+        )
+        if hasattr(store, 'spill'):
+            from .tiers import spiller
+
+            result['last_spill'] = spiller.last_run
+        return result
@@ -0,0 +1,73 @@
+"""
+Retención de los usuarios desactivados de demo_rest_api.
+
+``DELETE`` sólo desactiva al usuario; pasado ``DEMO_RETENTION`` (segundos
+desde la desactivación) la compactación lo saca del almacén. Si se define
+``DEMO_ARCHIVE_PATH`` los registros se añaden antes a ese fichero JSON Lines;
+si no, se descartan. Cada eliminación se publica en el feed de cambios como
+``purge``.
+
+La compactación corre en un hilo de fondo cada ``DEMO_COMPACTION_INTERVAL``
+segundos (se arranca al calentar el worker) y recorre el almacén por lotes,
+actualizando el índice sólo con los ids eliminados, así que las peticiones se
+siguen atendiendo mientras tanto. ``manage.py compact_users`` lanza una
+pasada a demanda en su propio proceso; no hay ruta HTTP para ello.
+"""
+import json
+import threading
+import time
+
+from django.conf import settings
+
+from backend_data_server.periodic import PeriodicTask
+
+from .feed import change_feed
+from .store import get_store
+
+
+class ArchiveWriter:
+    """Append removed users to a JSON Lines file."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+
+    def __call__(self, items):
+        archived_at = time.time()
+        lines = ''.join(json.dumps(dict(item, archived_at=archived_at)) + '\n' for item in items)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as archive:
+            archive.write(lines)
+
+
+def compact(store=None, retention=None, archive_path=None, dry_run=False, now=None):
+    """Run one compaction pass and return a summary of what was removed."""
+    store = get_store() if store is None else store
+    retention = getattr(settings, 'DEMO_RETENTION', 30 * 86400) if retention is None else retention
+    archive_path = getattr(settings, 'DEMO_ARCHIVE_PATH', None) if archive_path is None else archive_path
+    archive = ArchiveWriter(archive_path) if archive_path and not dry_run else None
+    now = time.time() if now is None else now
+
+    def sink(items):
+        if archive is not None:
+            archive(items)
+        for item in items:
+            change_feed.publish('purge', item)
+
+    started = time.perf_counter()
+    removed = store.compact(
+        now - retention,
+        sink=None if dry_run else sink,
+        now=now,
+        batch=getattr(settings, 'DEMO_COMPACTION_BATCH', 1000),
+        dry_run=dry_run,
+    )
+    return {
+        'purged': removed,
+        'archived': bool(archive) and removed > 0,
+        'retention': retention,
+        'dry_run': dry_run,
+        'ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+compactor = PeriodicTask(getattr(settings, 'DEMO_COMPACTION_INTERVAL', 3600), compact, 'demo-compactor')
@@ -0,0 +1,153 @@
+"""
+Feed de cambios de demo_rest_api.
+
+Cada mutación (create, update, deactivate) se registra en un buffer circular
+acotado con un número de secuencia monótonamente creciente. Los clientes
+sincronizan de forma incremental pidiendo los eventos posteriores a la última
+secuencia vista en lugar de volver a descargar la colección completa.
+
+Como en ``landing_api/broker.py``, los lectores síncronos (WSGI) esperan en
+una ``threading.Condition`` y los asíncronos (ASGI) en un ``asyncio.Event``
+que se activa desde el hilo que publica, así que un stream SSE servido por
+ASGI no ocupa ningún hilo mientras espera.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+from backend_data_server.sse import KEEP_ALIVE_FRAME, RETRY_FRAME, format_sse
+
+
+class ChangeFeed:
+    """Bounded ring buffer of mutation events with blocking reads."""
+
+    def __init__(self, max_events=1000):
+        self._events = deque(maxlen=max_events)
+        self._cond = threading.Condition()
+        self._async_waiters = set()
+        self._seq = 0
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+    def publish(self, op, item):
+        """Record a mutation of ``item`` and wake up any waiting readers."""
+        with self._cond:
+            self._seq += 1
+            event = {
+                'seq': self._seq,
+                'op': op,
+                'id': item['id'],
+                'data': dict(item),
+                'timestamp': time.time(),
+            }
+            self._events.append(event)
+            self._cond.notify_all()
+            waiters = list(self._async_waiters)
+        for loop, flag in waiters:
+            loop.call_soon_threadsafe(flag.set)
+        return event
+
+    def since(self, seq):
+        """
+        Return ``(events, reset)`` for every event with a sequence above ``seq``.
+
+        ``reset`` is True when events after ``seq`` were already evicted from
+        the buffer, or when ``seq`` is ahead of the feed (the process
+        restarted since the client last read); the client must then reload
+        the full collection.
+        """
+        with self._cond:
+            return self._since(seq)
+
+    def _since(self, seq):
+        events = []
+        for event in reversed(self._events):
+            if event['seq'] <= seq:
+                break
+            events.append(event)
+        events.reverse()
+        oldest = events[0]['seq'] if events else self._seq + 1
+        if seq > self._seq:
+            return [], True
+        return events, seq + 1 < oldest and seq < self._seq
+
+    def wait(self, seq, timeout):
+        """Block up to ``timeout`` seconds until there are events after ``seq``."""
+        with self._cond:
+            # Un seq por delante del feed no se alcanzará esperando: se contesta con reset
+            self._cond.wait_for(lambda: self._seq != seq, timeout=timeout)
+            return self._since(seq)
+
+    async def wait_async(self, seq, timeout):
+        """``wait()`` for the event loop: waits on an ``asyncio.Event`` instead of a thread."""
+        flag = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), flag)
+        with self._cond:
+            if self._seq != seq:
+                return self._since(seq)
+            self._async_waiters.add(waiter)
+        try:
+            await asyncio.wait_for(flag.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._async_waiters.discard(waiter)
+        return self.since(seq)
+
+    def clear(self):
+        with self._cond:
+            self._events.clear()
+
+
+change_feed = ChangeFeed(getattr(settings, 'DEMO_FEED_SIZE', 1000))
+
+
+def _frames(feed, seq, events, reset):
+    """SSE frames for one wait result and the sequence to resume from."""
+    frames = []
+    if reset:
+        frames.append(format_sse({'last_seq': feed.last_seq}, event='reset'))
+        if not events:
+            seq = feed.last_seq
+    if not events:
+        frames.append(KEEP_ALIVE_FRAME)
+        return frames, seq
+    for event in events:
+        frames.append(format_sse(event, event=event['op'], event_id=event['seq']))
+    return frames, events[-1]['seq']
+
+
+def stream_events(feed, seq, heartbeat=15, duration=300):
+    """
+    Yield SSE frames for every event after ``seq`` (synchronous, for WSGI).
+
+    The stream ends after ``duration`` seconds; EventSource clients reconnect
+    and resume from the ``Last-Event-ID`` they received.
+    """
+    deadline = time.monotonic() + duration
+    yield RETRY_FRAME
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        frames, seq = _frames(feed, seq, *feed.wait(seq, min(heartbeat, remaining)))
+        yield from frames
+
+
+async def astream_events(feed, seq, heartbeat=15, duration=300):
+    """Asynchronous ``stream_events`` for ASGI servers."""
+    deadline = time.monotonic() + duration
+    yield RETRY_FRAME
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        frames, seq = _frames(feed, seq, *await feed.wait_async(seq, min(heartbeat, remaining)))
+        for frame in frames:
+            yield frame
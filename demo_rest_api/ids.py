@@ -0,0 +1,86 @@
+"""
+Identificadores ordenados por tiempo para demo_rest_api (UUIDv7, RFC 9562).
+
+Los 48 bits altos son milisegundos Unix, seguidos de un contador de 12 bits
+que garantiza el orden dentro del mismo milisegundo y 62 bits aleatorios.
+Los ids generados por un proceso son estrictamente crecientes, tanto como
+entero como en su forma de texto, así que ordenar por id es ordenar por
+creación y la paginación por cursor no necesita un índice aparte.
+
+Se generan con ``random.getrandbits`` en lugar de ``os.urandom`` (los ids no
+son secretos) y se formatean a mano en vez de construir un ``uuid.UUID``.
+``pack``/``unpack`` convierten a la forma compacta de 16 bytes, para guardar
+ids fuera de la memoria del proceso.
+
+En memoria los ids siguen siendo texto: llegan como texto en la URL y la
+clave del índice comparte el objeto ``str`` del propio registro, así que una
+clave entera añadiría un objeto más y un ``int(..., 16)`` por búsqueda.
+"""
+import random
+import threading
+import time
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+VERSION_BITS = 0x7 << 76
+VARIANT_BITS = 0x2 << 62
+COUNTER_MAX = 0xFFF
+
+
+def new_id_int():
+    """Next UUIDv7 as a 128-bit integer, monotonic within the process."""
+    global _last_ms, _counter
+    now_ms = time.time_ns() // 1_000_000
+    with _lock:
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Contador inicial aleatorio en la mitad baja: deja margen para muchos ids por ms
+            _counter = random.getrandbits(11)
+        else:
+            _counter += 1
+            if _counter > COUNTER_MAX:
+                # Contador agotado (o reloj hacia atrás): se toma prestado el siguiente milisegundo
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+    return (ms << 80) | VERSION_BITS | (counter << 64) | VARIANT_BITS | random.getrandbits(62)
+
+
+def format_id(value):
+    """Canonical 36-character form of an id integer."""
+    h = '%032x' % value
+    return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+
+
+def new_id():
+    return format_id(new_id_int())
+
+
+def parse_id(text):
+    """Integer value of a canonical id, or ``None`` when ``text`` is not one."""
+    if len(text) != 36 or text[8] != '-' or text[13] != '-' or text[18] != '-' or text[23] != '-':
+        return None
+    try:
+        value = int(text.replace('-', ''), 16)
+    except ValueError:
+        return None
+    # int() admite signos, '_' y mayúsculas: sólo vale la forma canónica exacta
+    return value if format_id(value) == text else None
+
+
+def pack(text):
+    """16-byte key for a canonical id; any other id is returned unchanged."""
+    value = parse_id(text)
+    return text if value is None else value.to_bytes(16, 'big')
+
+
+def unpack(key):
+    return format_id(int.from_bytes(key, 'big')) if isinstance(key, bytes) else key
+
+
+def timestamp_ms(text):
+    """Creation time in Unix milliseconds encoded in a UUIDv7 id."""
+    value = parse_id(text)
+    return None if value is None else value >> 80
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from demo_rest_api.compaction import compact
+
+
+class Command(BaseCommand):
+    help = (
+        "Lanza una pasada de compactación de usuarios desactivados en este proceso, "
+        "sobre el almacén que carga (DEMO_STORE). No hay ruta HTTP para ello: purga "
+        "datos y la API no tiene autenticación. Los workers en marcha compactan su "
+        "propio almacén en segundo plano cada DEMO_COMPACTION_INTERVAL segundos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days",
+            type=float,
+            help="Días que se conserva un usuario desactivado (por defecto DEMO_RETENTION).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Sólo cuenta lo que se eliminaría.")
+
+    def handle(self, *args, **options):
+        retention = None
+        if options["retention_days"] is not None:
+            if options["retention_days"] < 0:
+                raise CommandError("--retention-days no puede ser negativo.")
+            retention = options["retention_days"] * 86400
+
+        summary = compact(retention=retention, dry_run=options["dry_run"])
+
+        verb = "Se eliminarían" if summary["dry_run"] else "Eliminados"
+        archived = " (archivados)" if summary["archived"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {summary['purged']} usuarios desactivados hace más de "
+            f"{summary['retention'] / 86400:g} días{archived} en {summary['ms']} ms."
+        ))
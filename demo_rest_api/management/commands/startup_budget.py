@@ -0,0 +1,93 @@
+"""
+Presupuesto de arranque del proyecto entero, no sólo de demo_rest_api.
+
+Vive aquí porque Django sólo descubre comandos de gestión en apps instaladas y
+``backend_data_server`` es el paquete del proyecto, no una app; la medición y
+el presupuesto están en ``backend_data_server/startup.py`` y
+``backend_data_server/startup_budget.json``. Es un comando y no un script de
+``benchmarks/`` para que ``manage.py startup_budget --check`` corra con los
+mismos settings y perfiles que el resto de los gates.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend_data_server import SETTINGS_PROFILES
+from backend_data_server.startup import (
+    BUDGET_PATH,
+    ENTRY_POINTS,
+    budget_for,
+    check_budget,
+    load_budget,
+    measure,
+    top_imports,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el arranque en frío de manage.py, wsgi, asgi y la carga de URLs "
+        "con -X importtime, muestra los módulos más caros y lo compara con el "
+        "presupuesto guardado en backend_data_server/startup_budget.json."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile",
+            action="append",
+            choices=sorted(SETTINGS_PROFILES),
+            help="Perfil a medir (se puede repetir; por defecto todos).",
+        )
+        parser.add_argument(
+            "--entry",
+            action="append",
+            choices=sorted(ENTRY_POINTS),
+            help="Punto de entrada a medir (se puede repetir; por defecto todos).",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Arranques por medición; se toma el más rápido.")
+        parser.add_argument("--top", type=int, default=10, help="Módulos más caros a mostrar (0 para ninguno).")
+        parser.add_argument("--sort", choices=("cumulative", "self"), default="cumulative")
+        parser.add_argument("--check", action="store_true", help="Termina con error si se supera el presupuesto.")
+        parser.add_argument(
+            "--write-budget",
+            action="store_true",
+            help="Guarda las mediciones actuales, con margen, como nuevo presupuesto.",
+        )
+
+    def handle(self, *args, **options):
+        profiles = options["profile"] or list(SETTINGS_PROFILES)
+        entries = options["entry"] or list(ENTRY_POINTS)
+        budget = load_budget() if BUDGET_PATH.exists() else {"forbidden": [], "profiles": {}}
+
+        reports = []
+        violations = 0
+        for profile in profiles:
+            for entry in entries:
+                try:
+                    runs = [measure(entry, profile) for _ in range(max(1, options["repeat"]))]
+                except RuntimeError as exc:
+                    raise CommandError(str(exc))
+                report = min(runs, key=lambda run: run["import_ms"])
+                reports.append(report)
+
+                self.stdout.write(
+                    f"{profile:<5} {entry:<8} {report['import_ms']:8.1f} ms import "
+                    f"{report['wall_ms']:8.1f} ms process {len(report['modules']):5d} modules"
+                )
+                for name, (self_us, cumulative_us) in top_imports(report, options["top"], options["sort"]):
+                    self.stdout.write(f"    {cumulative_us / 1000:8.1f} ms  {self_us / 1000:8.1f} ms self  {name}")
+
+                problems = check_budget(report, budget)
+                for problem in problems:
+                    self.stdout.write(self.style.ERROR(f"    over budget: {problem}"))
+                violations += len(problems)
+
+        if options["write_budget"]:
+            new_budget = budget_for(reports, forbidden=budget.get("forbidden", ()))
+            for profile, limits in budget.get("profiles", {}).items():
+                for entry, limit in limits.items():
+                    new_budget["profiles"].setdefault(profile, {}).setdefault(entry, limit)
+            BUDGET_PATH.write_text(json.dumps(new_budget, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Presupuesto guardado en {BUDGET_PATH}"))
+        elif options["check"] and violations:
+            raise CommandError(f"{violations} violaciones del presupuesto de arranque.")
@@ -0,0 +1,132 @@
+"""
+Esquemas de validación para las escrituras de demo_rest_api.
+
+Cada ``Schema`` se compila una sola vez al importar el módulo: los campos se
+convierten en un diccionario ``clave -> validador`` y la validación de una
+petición es una única pasada sobre sus claves.
+"""
+import re
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+REQUIRED = "This field is required."
+NULL = "This field may not be null."
+BLANK = "This field may not be blank."
+UNKNOWN = "Unknown field."
+NOT_OBJECT = "Expected a JSON object."
+
+
+class Field:
+    """Declarative description of a single schema field."""
+
+    def __init__(self, kind, required=True, default=None, trim=True, blank=False, email=False):
+        self.kind = kind
+        self.required = required
+        self.default = default
+        self.trim = trim
+        self.blank = blank
+        self.email = email
+
+    def compile(self):
+        """Return a ``value -> (clean, error)`` closure specialised for this field."""
+        kind, trim, blank, email = self.kind, self.trim, self.blank, self.email
+
+        if kind is bool:
+            def check(value):
+                if value is None:
+                    return None, NULL
+                if isinstance(value, bool):
+                    return value, None
+                if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+                    return value.strip().lower() == "true", None
+                return None, "Must be a boolean."
+            return check
+
+        def check(value):
+            if value is None:
+                return None, NULL
+            if not isinstance(value, str):
+                return None, "Must be a string."
+            if trim:
+                value = value.strip()
+            if not value and not blank:
+                return None, BLANK
+            if email and value and not EMAIL_RE.match(value):
+                return None, "Enter a valid email address."
+            return value, None
+        return check
+
+
+class Schema:
+    """A set of fields compiled once into per-key validators."""
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self._checks = {name: field.compile() for name, field in fields.items()}
+        self._required = tuple(name for name, field in fields.items() if field.required)
+        self._defaults = tuple(
+            (name, field.default) for name, field in fields.items()
+            if not field.required and field.default is not None
+        )
+
+    def validate(self, data, partial=False):
+        """
+        Validate ``data`` in a single pass.
+
+        Returns ``(cleaned, errors)``; ``errors`` is an empty dict on success.
+        With ``partial=True`` (PATCH) missing fields are neither required nor
+        defaulted.
+        """
+        if not hasattr(data, "items"):
+            return None, {"non_field_errors": [NOT_OBJECT]}
+
+        checks = self._checks
+        cleaned = {}
+        errors = {}
+        for key, value in data.items():
+            check = checks.get(key)
+            if check is None:
+                errors[key] = [UNKNOWN]
+                continue
+            value, error = check(value)
+            if error:
+                errors[key] = [error]
+            else:
+                cleaned[key] = value
+
+        if not partial:
+            for name in self._required:
+                if name not in data:
+                    errors[name] = [REQUIRED]
+            for name, default in self._defaults:
+                cleaned.setdefault(name, default)
+
+        return cleaned, errors
+
+    def validate_many(self, items, partial=False):
+        """
+        Validate every item of a batch.
+
+        Returns ``(cleaned_items, errors)`` where ``errors`` maps the index of
+        each invalid item to its error dict.
+        """
+        if not isinstance(items, (list, tuple)):
+            return None, {"non_field_errors": ["Expected a JSON array."]}
+
+        validate = self.validate
+        cleaned_items = []
+        errors = {}
+        for index, item in enumerate(items):
+            cleaned, item_errors = validate(item, partial)
+            if item_errors:
+                errors[index] = item_errors
+            else:
+                cleaned_items.append(cleaned)
+        return cleaned_items, errors
+
+
+USER_SCHEMA = Schema(
+    name=Field(str),
+    email=Field(str, email=True),
+    is_active=Field(bool, required=False, default=True),
+)
@@ -0,0 +1,275 @@
+"""
+Almacén particionado de demo_rest_api entre varios procesos.
+
+Con ``DEMO_STORE = 'sharded'`` los usuarios no viven en el proceso web: se
+reparten por ``crc32(id) % DEMO_SHARDS`` entre procesos hijos, cada uno con
+su diccionario y su propio GIL, comunicados por ``multiprocessing.Pipe``.
+
+- Las operaciones por id (leer, crear, reemplazar, actualizar, desactivar)
+  van sólo al shard propietario.
+- Listados y búsquedas se envían a todos los shards a la vez, cada uno
+  filtra su parte en paralelo y el proceso web une los resultados con una
+  mezcla de k vías (``heapq.merge``) por número de secuencia, así que el
+  orden es el de creación, igual que con la lista local. Al paginar
+  (``after`` o ``limit``) cada shard filtra y ordena por id y la mezcla es
+  por id, como el cursor: la secuencia se asigna al crear y dos altas
+  concurrentes pueden recibirla en distinto orden que sus ids.
+
+Los hijos se lanzan con ``spawn`` y no cargan Django.
+"""
+import atexit
+import heapq
+import itertools
+import multiprocessing
+import threading
+import time
+import zlib
+from operator import itemgetter
+
+from .store import VersionConflict, matches
+
+
+class ShardError(RuntimeError):
+    """A shard process failed or is no longer reachable."""
+
+
+def serve(conn):
+    """Shard process main loop: ``(op, args)`` in, ``(ok, result)`` out."""
+    records = {}  # id -> [seq, item, version, deactivated_at], en orden de creación
+
+    def scan(term, after=None, limit=None):
+        found = (
+            (seq, item) for seq, item, _, _ in records.values()
+            if (item.get('is_active', False) and (after is None or item['id'] > after)
+                and (term is None or matches(item, term)))
+        )
+        if after is None and limit is None:
+            return list(found)
+        # Al paginar se ordena por id: dos altas cruzadas pueden tener secuencia e id en distinto orden
+        items = (item for _, item in found)
+        if limit is None:
+            items = sorted(items, key=itemgetter('id'))
+        else:
+            items = heapq.nsmallest(limit, items, key=itemgetter('id'))
+        return [(item['id'], item) for item in items]
+
+    def get_versioned(item_id):
+        record = records.get(item_id)
+        return (None, None) if record is None else (record[1], record[2])
+
+    def swap(item_id, data, replace=False, expected=None):
+        # Un shard atiende sus mensajes de uno en uno: comprobar y escribir es atómico
+        record = records.get(item_id)
+        if record is None:
+            return None, None
+        if expected is not None and record[2] != expected:
+            return 'conflict', record[2]
+        item = record[1]
+        if replace:
+            item.clear()
+            item['id'] = item_id
+        item.update(data)
+        record[2] += 1
+        if item.get('is_active', False):
+            record[3] = None
+        elif record[3] is None:
+            record[3] = time.time()
+        return item, record[2]
+
+    def compact(cutoff, now, dry_run=False):
+        expired = []
+        for item_id, record in records.items():
+            if record[1].get('is_active', False):
+                continue
+            if record[3] is None:
+                record[3] = now
+            if record[3] <= cutoff:
+                expired.append(item_id)
+        if dry_run:
+            return [records[item_id][1] for item_id in expired]
+        return [records.pop(item_id)[1] for item_id in expired]
+
+    handlers = {
+        'get': lambda item_id: get_versioned(item_id)[0],
+        'get_versioned': get_versioned,
+        'create': lambda seq, item: records.setdefault(item['id'], [seq, item, 1, None])[1],
+        'load': lambda rows: records.update((item['id'], [seq, item, 1, None]) for seq, item in rows),
+        'swap': swap,
+        'scan': scan,
+        'compact': compact,
+        'count': lambda: (len(records), sum(1 for _, item, _, _ in records.values() if item.get('is_active', False))),
+        'clear': records.clear,
+    }
+
+    while True:
+        try:
+            op, args = conn.recv()
+        except EOFError:
+            return
+        if op == 'stop':
+            return
+        try:
+            conn.send((True, handlers[op](*args)))
+        except Exception as exc:  # el proceso web recibe el error y el shard sigue vivo
+            conn.send((False, f'{type(exc).__name__}: {exc}'))
+
+
+class Shard:
+
+    def __init__(self, context, index):
+        self.index = index
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=serve, args=(child_conn,), name=f'demo-shard-{index}', daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.lock = threading.Lock()
+
+    def send(self, op, *args):
+        try:
+            self.conn.send((op, args))
+        except (OSError, EOFError) as exc:
+            raise ShardError(f'Shard {self.index} is not reachable: {exc}') from exc
+
+    def receive(self):
+        try:
+            ok, result = self.conn.recv()
+        except (OSError, EOFError) as exc:
+            raise ShardError(f'Shard {self.index} is not reachable: {exc}') from exc
+        if not ok:
+            raise ShardError(f'Shard {self.index} failed: {result}')
+        return result
+
+    def call(self, op, *args):
+        with self.lock:
+            self.send(op, *args)
+            return self.receive()
+
+    def stop(self):
+        with self.lock:
+            try:
+                self.conn.send(('stop', ()))
+            except (OSError, EOFError):
+                pass
+            self.conn.close()
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+class ShardedStore:
+    """Users hash-partitioned by id across ``shards`` child processes."""
+
+    def __init__(self, shards=2, start_method='spawn'):
+        context = multiprocessing.get_context(start_method)
+        self.shards = [Shard(context, index) for index in range(shards)]
+        self._seq = itertools.count(1)
+        atexit.register(self.close)
+
+    def shard_for(self, item_id):
+        return self.shards[zlib.crc32(item_id.encode()) % len(self.shards)]
+
+    def _fan_out(self, op, *args):
+        # Se envía a todos antes de leer ninguna respuesta: los shards trabajan en paralelo
+        for shard in self.shards:
+            shard.lock.acquire()
+        try:
+            for shard in self.shards:
+                shard.send(op, *args)
+            return [shard.receive() for shard in self.shards]
+        finally:
+            for shard in self.shards:
+                shard.lock.release()
+
+    def _merge(self, op, *args, limit=None):
+        parts = self._fan_out(op, *args)
+        merged = heapq.merge(*parts, key=itemgetter(0))
+        return [item for _, item in itertools.islice(merged, limit)]
+
+    def load(self, items):
+        """Bulk-load ``items`` keeping their order."""
+        rows = {shard.index: [] for shard in self.shards}
+        for item in items:
+            rows[self.shard_for(item['id']).index].append((next(self._seq), item))
+        for shard in self.shards:
+            shard.call('load', rows[shard.index])
+
+    def get(self, item_id):
+        return self.shard_for(item_id).call('get', item_id)
+
+    def create(self, item):
+        shard = self.shard_for(item['id'])
+        with shard.lock:
+            # La secuencia se toma con el shard bloqueado para que cada shard la reciba en orden
+            shard.send('create', next(self._seq), item)
+            return shard.receive()
+
+    def get_versioned(self, item_id):
+        return self.shard_for(item_id).call('get_versioned', item_id)
+
+    def swap(self, item_id, data, replace=False, expected=None):
+        item, version = self.shard_for(item_id).call('swap', item_id, data, replace, expected)
+        if item == 'conflict':
+            raise VersionConflict(version)
+        return item, version
+
+    def replace(self, item_id, data):
+        return self.swap(item_id, data, replace=True)[0]
+
+    def update(self, item_id, data):
+        return self.swap(item_id, data)[0]
+
+    def deactivate(self, item_id):
+        return self.update(item_id, {'is_active': False})
+
+    def query(self, term=None, after=None, limit=None):
+        # Cada shard devuelve como mucho ``limit`` filas: la página está entre ellas
+        return self._merge('scan', term.lower() if term else None, after, limit, limit=limit)
+
+    def active(self):
+        return self.query()
+
+    def compact(self, cutoff, sink=None, now=None, batch=None, dry_run=False):
+        """Purge expired users shard by shard; the other shards keep serving meanwhile."""
+        now = time.time() if now is None else now
+        total = 0
+        for shard in list(self.shards):
+            removed = shard.call('compact', cutoff, now, dry_run)
+            total += len(removed)
+            if removed and sink is not None:
+                sink(removed)
+        return total
+
+    def search(self, term):
+        return self.query(term)
+
+    def clear(self):
+        self._fan_out('clear')
+
+    def counts(self):
+        return self._fan_out('count')
+
+    def __len__(self):
+        return sum(total for total, _ in self.counts())
+
+    def warm_up(self):
+        return {'shards': len(self.shards), 'users': len(self)}
+
+    def readiness(self):
+        alive = sum(1 for shard in self.shards if shard.process.is_alive())
+        return {'ok': alive == len(self.shards), 'shards': len(self.shards), 'alive': alive}
+
+    def stats(self):
+        counts = self.counts()
+        return {
+            'backend': 'sharded',
+            'users': sum(total for total, _ in counts),
+            'active_users': sum(active for _, active in counts),
+            'shards': [{'users': total, 'active_users': active} for total, active in counts],
+        }
+
+    def close(self):
+        shards, self.shards = self.shards, []
+        for shard in shards:
+            shard.stop()
@@ -0,0 +1,364 @@
+"""
+Almacén en memoria de demo_rest_api.
+
+``data_list`` sigue siendo una lista de diccionarios (los tests y scripts la
+manipulan directamente), pero mantiene un índice ``id -> usuario`` para que
+buscar por id no recorra la lista. El índice se construye en la primera
+búsqueda o durante el calentamiento del worker y después se actualiza con
+cada alta; las operaciones que reordenan o eliminan elementos lo reconstruyen.
+
+Las vistas no usan la lista directamente sino ``get_store()``, que devuelve
+``LocalStore`` sobre ``data_list`` o, con ``DEMO_STORE = 'sharded'``, el
+almacén repartido entre procesos de ``shards.py``; con ``'tiered'``,
+``TieredStore`` de ``tiers.py``, que lleva los usuarios desactivados a disco.
+Todos ofrecen las mismas operaciones.
+
+Cada usuario tiene una versión (empieza en 1 y sube con cada cambio) que se
+publica como ``ETag``. ``swap()`` es un compare-and-swap: aplica el cambio
+sólo si la versión sigue siendo la esperada, comprobándolo y escribiendo de
+forma atómica, sin mantener ningún lock mientras se procesa la petición.
+
+Los ids son UUIDv7 (``ids.py``): crecen con el tiempo, así que la lista está
+ordenada por id y la paginación por cursor (``after``) es una búsqueda
+binaria sobre ella.
+"""
+import bisect
+import threading
+import time
+from operator import itemgetter
+
+from .ids import new_id
+
+
+def matches(item, term):
+    """True when the lowercase ``term`` appears in the user's name or email."""
+    return term in item.get('name', '').lower() or term in item.get('email', '').lower()
+
+
+class VersionConflict(Exception):
+    """The record changed since the version the client based its write on."""
+
+    def __init__(self, current):
+        super().__init__(f'Current version is {current}')
+        self.current = current
+
+
+class UserTable(list):
+    """List of user dicts with a lazily built index by ``id``."""
+
+    def __init__(self, items=()):
+        super().__init__(items)
+        self._by_id = None
+        self._lock = threading.Lock()
+        # Versiones distintas de 1; los usuarios añadidos a la lista empiezan en 1
+        self._versions = {}
+        # id -> momento de la desactivación, para la retención (ver compaction.py)
+        self._deactivated = {}
+
+    def version(self, item_id):
+        return self._versions.get(item_id, 1)
+
+    def bump(self, item_id):
+        version = self._versions[item_id] = self.version(item_id) + 1
+        return version
+
+    def mark_active(self, item_id, active, now=None):
+        if active:
+            self._deactivated.pop(item_id, None)
+        elif item_id not in self._deactivated:
+            self._deactivated[item_id] = time.time() if now is None else now
+
+    def deactivated_at(self, item_id):
+        return self._deactivated.get(item_id)
+
+    def purge_range(self, start, end, predicate):
+        """
+        Drop the users in ``self[start:end]`` matching ``predicate``.
+
+        The slice is rewritten in place and only the removed ids leave the
+        index, so lookups keep working without a full rebuild.
+        """
+        kept, removed = [], []
+        for item in list.__getitem__(self, slice(start, end)):
+            (removed if predicate(item) else kept).append(item)
+        if removed:
+            list.__setitem__(self, slice(start, end), kept)
+            by_id = self._by_id
+            for item in removed:
+                if by_id is not None:
+                    by_id.pop(item['id'], None)
+                self._versions.pop(item['id'], None)
+                self._deactivated.pop(item['id'], None)
+        return removed
+
+    @property
+    def indexed(self):
+        return self._by_id is not None
+
+    def build_index(self):
+        with self._lock:
+            self._by_id = {item['id']: item for item in self}
+        return len(self._by_id)
+
+    def _invalidate(self):
+        self._by_id = None
+
+    def get(self, item_id):
+        """Return the user with ``item_id`` or ``None``."""
+        by_id = self._by_id
+        if by_id is None:
+            self.build_index()
+            by_id = self._by_id
+        return by_id.get(item_id)
+
+    def index_size(self):
+        by_id = self._by_id
+        return 0 if by_id is None else len(by_id)
+
+    def insort(self, item, version=1):
+        """Insert ``item`` at its id position, keeping the index instead of rebuilding it."""
+        position = bisect.bisect_right(self, item['id'], key=itemgetter('id'))
+        super().insert(position, item)
+        if version != 1:
+            self._versions[item['id']] = version
+        by_id = self._by_id
+        if by_id is not None:
+            by_id[item['id']] = item
+
+    def append(self, item):
+        super().append(item)
+        by_id = self._by_id
+        if by_id is not None:
+            by_id[item['id']] = item
+
+    def extend(self, items):
+        super().extend(items)
+        self._invalidate()
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._invalidate()
+
+    def remove(self, item):
+        super().remove(item)
+        self._invalidate()
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._invalidate()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._versions.clear()
+        self._deactivated.clear()
+        self._invalidate()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._invalidate()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._invalidate()
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+
+# Simulación de base de datos local
+data_list = UserTable([
+    {'id': new_id(), 'name': 'User01', 'email': 'user01@example.com', 'is_active': True},
+    {'id': new_id(), 'name': 'User02', 'email': 'user02@example.com', 'is_active': True},
+    {'id': new_id(), 'name': 'User03', 'email': 'user03@example.com', 'is_active': False},
+])
+
+
+class LocalStore:
+    """Store operations over an in-process ``UserTable``."""
+
+    def __init__(self, table):
+        self.table = table
+        self._lock = threading.Lock()
+
+    def get(self, item_id):
+        return self.table.get(item_id)
+
+    def get_versioned(self, item_id):
+        """Return ``(item, version)`` or ``(None, None)``."""
+        item = self.table.get(item_id)
+        return (None, None) if item is None else (item, self.table.version(item_id))
+
+    def create(self, item):
+        """
+        Add ``item`` keeping the table in id order.
+
+        Ids are generated before the call, so concurrent creates can arrive
+        out of order; ``query()`` pages with ``bisect`` and relies on it.
+        """
+        with self._lock:
+            table = self.table
+            if not len(table) or list.__getitem__(table, -1)['id'] <= item['id']:
+                table.append(item)
+            else:
+                table.insort(item)
+        return item
+
+    def swap(self, item_id, data, replace=False, expected=None):
+        """
+        Apply ``data`` if the record is still at version ``expected``.
+
+        ``expected=None`` writes unconditionally. Returns ``(item, version)``
+        with the new version, ``(None, None)`` for an unknown id, and raises
+        ``VersionConflict`` when the record moved on.
+        """
+        with self._lock:
+            item = self.table.get(item_id)
+            if item is None:
+                return None, None
+            if expected is not None and self.table.version(item_id) != expected:
+                raise VersionConflict(self.table.version(item_id))
+            if replace:
+                # Reemplazo completo: se conserva únicamente el id
+                item.clear()
+                item['id'] = item_id
+            item.update(data)
+            self.table.mark_active(item_id, item.get('is_active', False))
+            return item, self.table.bump(item_id)
+
+    def _sweep(self, predicate, batch=1000, dry_run=False, before_remove=None):
+        """
+        Yield batches of users matching ``predicate``, removing them from the table.
+
+        Works through the list in batches of ``batch`` positions and takes
+        the store lock for one batch at a time, so requests interleave with
+        a long sweep. ``before_remove`` runs with the lock held, before the
+        batch leaves the table; the consumer gets each batch outside it.
+        """
+        table = self.table
+        start = 0
+        while True:
+            with self._lock:
+                end = min(start + batch, len(table))
+                if start >= end:
+                    return
+                chunk = [item for item in list.__getitem__(table, slice(start, end)) if predicate(item)]
+                if chunk and not dry_run:
+                    if before_remove is not None:
+                        before_remove(chunk)
+                    selected = {id(item) for item in chunk}
+                    table.purge_range(start, end, lambda item: id(item) in selected)
+                    start = end - len(chunk)
+                else:
+                    start = end
+            if chunk:
+                yield chunk
+
+    def compact(self, cutoff, sink=None, now=None, batch=1000, dry_run=False):
+        """
+        Remove users deactivated at or before ``cutoff``; returns how many.
+
+        Each batch of removed users is passed to ``sink`` outside the lock.
+        Inactive users with no recorded deactivation time (loaded directly
+        into the list) start their retention now.
+        """
+        now = time.time() if now is None else now
+        table = self.table
+
+        def expired(item):
+            if item.get('is_active', False):
+                return False
+            table.mark_active(item['id'], False, now)
+            return table.deactivated_at(item['id']) <= cutoff
+
+        total = 0
+        for chunk in self._sweep(expired, batch, dry_run):
+            total += len(chunk)
+            if sink is not None and not dry_run:
+                sink(chunk)
+        return total
+
+    def replace(self, item_id, data):
+        return self.swap(item_id, data, replace=True)[0]
+
+    def update(self, item_id, data):
+        return self.swap(item_id, data)[0]
+
+    def deactivate(self, item_id):
+        return self.update(item_id, {'is_active': False})
+
+    def query(self, term=None, after=None, limit=None):
+        """Active users in id order, optionally filtered by ``term`` and paged after an id."""
+        table = self.table
+        start = 0 if after is None else bisect.bisect_right(table, after, key=itemgetter('id'))
+        term = term.lower() if term else None
+        result = []
+        for index in range(start, len(table)):
+            item = table[index]
+            if item.get('is_active', False) and (term is None or matches(item, term)):
+                result.append(item)
+                if len(result) == limit:
+                    break
+        return result
+
+    def active(self):
+        return self.query()
+
+    def search(self, term):
+        return self.query(term)
+
+    def __len__(self):
+        return len(self.table)
+
+    def warm_up(self):
+        return {'indexed': self.table.build_index()}
+
+    def readiness(self):
+        return {'ok': self.table.indexed, 'indexed': self.table.indexed}
+
+    def stats(self):
+        return {
+            'backend': 'local',
+            'users': len(self.table),
+            'active_users': sum(1 for item in self.table if item.get('is_active', False)),
+            'index_size': self.table.index_size(),
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def build_store():
+    from django.conf import settings
+
+    backend = getattr(settings, 'DEMO_STORE', 'local')
+    if backend == 'local':
+        return LocalStore(data_list)
+    if backend == 'sharded':
+        from .shards import ShardedStore
+
+        store = ShardedStore(shards=getattr(settings, 'DEMO_SHARDS', 2))
+        store.load(data_list)
+        return store
+    if backend == 'tiered':
+        from .tiers import TieredStore
+
+        return TieredStore(
+            data_list,
+            path=getattr(settings, 'DEMO_COLD_PATH', None) or '',
+            cold_after=getattr(settings, 'DEMO_COLD_AFTER', 300),
+            cache_size=getattr(settings, 'DEMO_COLD_CACHE', 1024),
+        )
+    raise ValueError(f"Unknown DEMO_STORE '{backend}'; expected 'local', 'sharded' or 'tiered'")
+
+
+def get_store():
+    """Configured store, created on first use (the sharded one starts its processes here)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = build_store()
+    return _store
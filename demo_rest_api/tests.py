@@ -1,7 +1,8 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
+import asyncio
 import json
 import uuid
 
@@ -808,4 +809,668 @@ class DemoRestApiValidationTestCase(APITestCase):
         # Check that whitespace was trimmed
         user_data = response.data['data']
         self.assertEqual(user_data['name'], 'Updated User')
-        self.assertEqual(user_data['email'], 'updated@example.com')
\ No newline at end of file
+        self.assertEqual(user_data['email'], 'updated@example.com')
+    
+    def test_post_with_invalid_email(self):
+        """Test POST method with a malformed email address"""
+        url = '/demo/rest/api/index/'
+        data = {
+            'name': 'Test User',
+            'email': 'not-an-email'
+        }
+        
+        response = self.client.post(url, data, format='json')
+        
+        # Should return HTTP 400
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', response.data['errors'])
+    
+    def test_post_with_unknown_field(self):
+        """Test POST method rejects keys outside the schema"""
+        url = '/demo/rest/api/index/'
+        data = {
+            'name': 'Test User',
+            'email': 'test@example.com',
+            'role': 'admin'
+        }
+        
+        response = self.client.post(url, data, format='json')
+        
+        # Should return HTTP 400 and store nothing
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('role', response.data['errors'])
+        from demo_rest_api.views import data_list
+        self.assertEqual(len(data_list), 1)
+
+
+class UserSchemaTestCase(TestCase):
+    
+    def test_validate_many_reports_errors_per_item(self):
+        """Test batch validation cleans valid items and indexes the invalid ones"""
+        from demo_rest_api.schemas import USER_SCHEMA
+        
+        cleaned, errors = USER_SCHEMA.validate_many([
+            {'name': ' A ', 'email': 'a@example.com'},
+            {'name': 'B'},
+        ])
+        
+        self.assertEqual(cleaned, [{'name': 'A', 'email': 'a@example.com', 'is_active': True}])
+        self.assertEqual(list(errors), [1])
+        self.assertIn('email', errors[1])
+
+
+class DemoRestApiChangesTestCase(APITestCase):
+    
+    def setUp(self):
+        # Clear data_list and the change feed before each test
+        from demo_rest_api.views import data_list
+        from demo_rest_api.feed import change_feed
+        data_list.clear()
+        change_feed.clear()
+        self.since = change_feed.last_seq
+    
+    def test_mutations_are_recorded_in_order(self):
+        """Test create, update and deactivate appear in the feed with increasing seq"""
+        create_response = self.client.post('/demo/rest/api/index/', {
+            'name': 'Feed User',
+            'email': 'feed@example.com'
+        }, format='json')
+        user_id = create_response.data['data']['id']
+        self.client.patch(f'/demo/rest/api/index/{user_id}/', {'name': 'Renamed'}, format='json')
+        self.client.delete(f'/demo/rest/api/index/{user_id}/')
+        
+        response = self.client.get('/demo/rest/api/changes/', {'since': self.since})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['reset'])
+        self.assertEqual([e['op'] for e in response.data['data']], ['create', 'update', 'deactivate'])
+        self.assertEqual(response.data['data'][1]['data']['name'], 'Renamed')
+        seqs = [e['seq'] for e in response.data['data']]
+        self.assertEqual(seqs, sorted(seqs))
+        self.assertEqual(response.data['last_seq'], seqs[-1])
+    
+    def test_since_last_seq_returns_nothing(self):
+        """Test a caught-up client receives an empty batch"""
+        self.client.post('/demo/rest/api/index/', {
+            'name': 'Feed User',
+            'email': 'feed@example.com'
+        }, format='json')
+        last_seq = self.client.get('/demo/rest/api/changes/', {'since': self.since}).data['last_seq']
+        
+        response = self.client.get('/demo/rest/api/changes/', {'since': last_seq, 'timeout': 0.01})
+        
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(response.data['last_seq'], last_seq)
+    
+    def test_evicted_events_request_a_reset(self):
+        """Test a client behind the ring buffer is told to reload the snapshot"""
+        from demo_rest_api.feed import ChangeFeed
+        feed = ChangeFeed(max_events=2)
+        for i in range(4):
+            feed.publish('create', {'id': str(i)})
+        
+        events, reset = feed.since(0)
+        
+        self.assertTrue(reset)
+        self.assertEqual([e['seq'] for e in events], [3, 4])
+    
+    def test_since_ahead_of_the_feed_requests_a_reset(self):
+        """Test a client resuming from a seq the feed never reached (e.g. after a restart) is reset at once"""
+        from demo_rest_api.feed import change_feed
+        change_feed.publish('create', {'id': 'a'})
+        ahead = change_feed.last_seq + 10
+        
+        polled = self.client.get('/demo/rest/api/changes/', {'since': ahead, 'timeout': 5})
+        response = self.client.get(
+            '/demo/rest/api/changes/', HTTP_ACCEPT='text/event-stream', HTTP_LAST_EVENT_ID=str(ahead)
+        )
+        stream = iter(response.streaming_content)
+        next(stream)
+        frame = next(stream).decode()
+        response.close()
+        
+        self.assertTrue(polled.data['reset'])
+        self.assertEqual(polled.data['count'], 0)
+        self.assertIn('event: reset', frame)
+        data = next(line for line in frame.splitlines() if line.startswith('data: '))
+        self.assertEqual(json.loads(data[len('data: '):]), {'last_seq': change_feed.last_seq})
+    
+    def test_invalid_since_parameter(self):
+        """Test a non-numeric since returns HTTP 400"""
+        response = self.client.get('/demo/rest/api/changes/', {'since': 'abc'})
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('since', response.data['errors'])
+    
+    def test_event_stream_resumes_from_last_event_id(self):
+        """Test SSE clients receive events after Last-Event-ID"""
+        from demo_rest_api.feed import change_feed
+        change_feed.publish('create', {'id': 'a'})
+        resume_from = change_feed.last_seq
+        change_feed.publish('create', {'id': 'b'})
+        
+        response = self.client.get(
+            '/demo/rest/api/changes/',
+            HTTP_ACCEPT='text/event-stream',
+            HTTP_LAST_EVENT_ID=str(resume_from)
+        )
+        
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = iter(response.streaming_content)
+        self.assertEqual(next(stream), b'retry: 3000\n\n')
+        frame = next(stream).decode()
+        self.assertIn(f'id: {resume_from + 1}', frame)
+        self.assertIn('"id":"b"', frame)
+        response.close()
+    
+    def test_async_event_stream_is_woken_by_publish(self):
+        """Test the ASGI stream sends an event published from another thread without waiting out the heartbeat"""
+        from demo_rest_api.feed import ChangeFeed, astream_events
+        feed = ChangeFeed()
+        
+        async def scenario():
+            stream = astream_events(feed, 0, heartbeat=5, duration=5)
+            self.assertEqual(await stream.__anext__(), b'retry: 3000\n\n')
+            pending = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0.01)
+            await asyncio.get_running_loop().run_in_executor(None, feed.publish, 'create', {'id': 'a'})
+            frame = await asyncio.wait_for(pending, 1)
+            await stream.aclose()
+            return frame
+        
+        frame = asyncio.run(scenario()).decode()
+        
+        self.assertIn('event: create', frame)
+        self.assertIn('id: 1', frame)
+
+
+class UserTableTestCase(TestCase):
+
+    def test_index_is_built_on_first_lookup_and_kept_on_append(self):
+        """Test lookups by id use the index and see users appended later"""
+        from demo_rest_api.store import UserTable
+
+        table = UserTable([{'id': 'a', 'name': 'A'}])
+        self.assertFalse(table.indexed)
+        self.assertEqual(table.get('a')['name'], 'A')
+        self.assertTrue(table.indexed)
+
+        table.append({'id': 'b', 'name': 'B'})
+        self.assertEqual(table.get('b')['name'], 'B')
+        self.assertEqual(table.index_size(), 2)
+
+    def test_removals_rebuild_the_index(self):
+        """Test clear and slice deletion do not leave stale index entries"""
+        from demo_rest_api.store import UserTable
+
+        table = UserTable([{'id': 'a'}, {'id': 'b'}])
+        table.build_index()
+        del table[1:]
+        self.assertIsNone(table.get('b'))
+        table.clear()
+        self.assertIsNone(table.get('a'))
+
+
+class DemoRestApiSearchTestCase(APITestCase):
+
+    def setUp(self):
+        from demo_rest_api.views import data_list
+        data_list.clear()
+        data_list.append({'id': 'a', 'name': 'Ana Pérez', 'email': 'ana@example.com', 'is_active': True})
+        data_list.append({'id': 'b', 'name': 'Bruno', 'email': 'bruno@ana.org', 'is_active': True})
+        data_list.append({'id': 'c', 'name': 'Ana Inactiva', 'email': 'c@example.com', 'is_active': False})
+
+    def test_search_filters_active_users_by_name_or_email(self):
+        """Test ?search= matches name or email case-insensitively among active users"""
+        response = self.client.get('/demo/rest/api/index/', {'search': 'ANA'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['data']], ['a', 'b'])
+        self.assertEqual(response.data['count'], 2)
+
+
+class ShardedStoreTestCase(APITestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from demo_rest_api.shards import ShardedStore
+        cls.store = ShardedStore(shards=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.store.close()
+        super().tearDownClass()
+
+    def setUp(self):
+        from unittest import mock
+        self.store.clear()
+        self.store.load([
+            {'id': f'user-{i}', 'name': f'User {i}', 'email': f'user{i}@example.com', 'is_active': i % 4 != 0}
+            for i in range(20)
+        ])
+        patcher = mock.patch('demo_rest_api.store._store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_compaction_purges_inactive_users_on_every_shard(self):
+        """Test a compaction pass removes the deactivated users from all shards"""
+        import time
+        from demo_rest_api.compaction import compact
+
+        self.assertEqual(compact(retention=0, dry_run=True)['purged'], 5)
+        self.assertEqual(len(self.store), 20)
+        self.assertEqual(compact(retention=0, now=time.time() + 1)['purged'], 5)
+        self.assertEqual(len(self.store), 15)
+        self.assertIsNone(self.store.get('user-4'))
+        self.assertEqual(self.store.get('user-5')['name'], 'User 5')
+
+    def test_pages_follow_id_order_when_creates_race(self):
+        """Test a user created after one with a newer id is not skipped by the page cursor"""
+        self.store.clear()
+        for item_id in ('id-a', 'id-c', 'id-b', 'id-d'):
+            self.store.create({'id': item_id, 'name': 'User', 'email': 'user@example.com', 'is_active': True})
+
+        first = self.store.query(limit=2)
+        second = self.store.query(after=first[-1]['id'], limit=2)
+
+        self.assertEqual([item['id'] for item in first], ['id-a', 'id-b'])
+        self.assertEqual([item['id'] for item in second], ['id-c', 'id-d'])
+        self.assertEqual([item['id'] for item in self.store.active()], ['id-a', 'id-c', 'id-b', 'id-d'])
+
+    def test_records_are_spread_across_shards(self):
+        """Test ids are hash-partitioned and point reads go to the owning shard"""
+        counts = self.store.counts()
+        self.assertEqual(sum(total for total, _ in counts), 20)
+        self.assertTrue(all(total > 0 for total, _ in counts))
+        self.assertEqual(self.store.get('user-7')['name'], 'User 7')
+        self.assertIsNone(self.store.get('missing'))
+
+    def test_list_merges_shards_in_creation_order(self):
+        """Test the fan-out listing keeps the global insertion order"""
+        response = self.client.get('/demo/rest/api/index/')
+
+        expected = [f'user-{i}' for i in range(20) if i % 4 != 0]
+        self.assertEqual([item['id'] for item in response.data['data']], expected)
+        self.assertEqual(response.data['count'], 15)
+
+    def test_crud_through_the_api(self):
+        """Test create, patch, search and delete are routed to the owning shard"""
+        created = self.client.post(
+            '/demo/rest/api/index/', {'name': 'Sharded', 'email': 'sharded@example.com'}, format='json'
+        ).data['data']
+        url = f"/demo/rest/api/index/{created['id']}/"
+
+        response = self.client.patch(url, {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.data['data']['name'], 'Renamed')
+        self.assertEqual(self.store.get(created['id'])['email'], 'sharded@example.com')
+
+        search = self.client.get('/demo/rest/api/index/', {'search': 'renamed'})
+        self.assertEqual([item['id'] for item in search.data['data']], [created['id']])
+        # Las páginas van en orden de id, como el cursor: el id UUIDv7 nuevo va antes que 'user-1'
+        page = self.client.get('/demo/rest/api/index/', {'limit': 2})
+        self.assertEqual([item['id'] for item in page.data['data']], [created['id'], 'user-1'])
+        self.assertEqual(page.data['next'], 'user-1')
+
+        self.assertEqual(self.client.delete(url, HTTP_IF_MATCH='"1"').status_code, 412)
+        self.assertEqual(self.client.delete(url, HTTP_IF_MATCH='"2"').status_code, status.HTTP_200_OK)
+        self.assertFalse(self.store.get(created['id'])['is_active'])
+        self.assertEqual(self.client.put('/demo/rest/api/index/missing/', {}, format='json').status_code, 404)
+
+
+class DemoRestApiConcurrencyTestCase(APITestCase):
+
+    def setUp(self):
+        from demo_rest_api.views import data_list
+        data_list.clear()
+        data_list.append({'id': 'user-1', 'name': 'Original', 'email': 'original@example.com', 'is_active': True})
+        self.url = '/demo/rest/api/index/user-1/'
+
+    def test_get_returns_the_current_version_as_etag(self):
+        """Test item GET exposes the version and every write bumps it"""
+        self.assertEqual(self.client.get(self.url)['ETag'], '"1"')
+
+        response = self.client.patch(self.url, {'name': 'Changed'}, format='json')
+        self.assertEqual(response['ETag'], '"2"')
+        self.assertEqual(self.client.get(self.url)['ETag'], '"2"')
+
+    def test_stale_if_match_is_rejected_with_412(self):
+        """Test a write based on an old version is refused and leaves the record untouched"""
+        from demo_rest_api.views import data_list
+
+        self.client.patch(self.url, {'name': 'First editor'}, format='json', HTTP_IF_MATCH='"1"')
+        response = self.client.put(
+            self.url, {'name': 'Second editor', 'email': 'second@example.com'},
+            format='json', HTTP_IF_MATCH='"1"'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(response['ETag'], '"2"')
+        self.assertEqual(data_list[0]['name'], 'First editor')
+
+    def test_matching_if_match_allows_delete(self):
+        """Test DELETE with the current ETag succeeds and a weak or bogus tag does not"""
+        self.assertEqual(
+            self.client.delete(self.url, HTTP_IF_MATCH='W/"1"').status_code,
+            status.HTTP_412_PRECONDITION_FAILED
+        )
+        self.assertEqual(self.client.delete(self.url, HTTP_IF_MATCH='"1"').status_code, status.HTTP_200_OK)
+
+    def test_compare_and_swap_checks_the_expected_version(self):
+        """Test the store primitive applies a change only at the expected version"""
+        from demo_rest_api.store import VersionConflict, get_store
+
+        store = get_store()
+        item, version = store.swap('user-1', {'name': 'CAS'}, expected=1)
+        self.assertEqual((item['name'], version), ('CAS', 2))
+        with self.assertRaises(VersionConflict) as conflict:
+            store.swap('user-1', {'name': 'Lost'}, expected=1)
+        self.assertEqual(conflict.exception.current, 2)
+        self.assertEqual(store.swap('missing', {}, expected=1), (None, None))
+
+
+class TimeOrderedIdTestCase(TestCase):
+
+    def test_ids_are_valid_uuid7_and_strictly_increasing(self):
+        """Test generated ids parse as version 7 UUIDs and sort by creation"""
+        from demo_rest_api.ids import new_id
+
+        ids = [new_id() for _ in range(5000)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(uuid.UUID(ids[0]).version, 7)
+        self.assertEqual(str(uuid.UUID(ids[0])), ids[0])
+
+    def test_pack_round_trips_canonical_and_legacy_ids(self):
+        """Test the 16-byte form is used only for canonical ids"""
+        from demo_rest_api.ids import new_id, pack, unpack
+
+        item_id = new_id()
+        self.assertEqual(len(pack(item_id)), 16)
+        self.assertEqual(unpack(pack(item_id)), item_id)
+        self.assertEqual(pack('user-1'), 'user-1')
+        self.assertEqual(unpack(pack(item_id.upper())), item_id.upper())
+
+
+class DemoRestApiPaginationTestCase(APITestCase):
+
+    def setUp(self):
+        from demo_rest_api.ids import new_id
+        from demo_rest_api.views import data_list
+        data_list.clear()
+        for i in range(7):
+            data_list.append({
+                'id': new_id(), 'name': f'User {i}', 'email': f'user{i}@example.com', 'is_active': i != 3
+            })
+        self.active_ids = [item['id'] for item in data_list if item['is_active']]
+
+    def test_keyset_pages_cover_active_users_once(self):
+        """Test following 'next' cursors returns every active user in order"""
+        seen, after = [], None
+        while True:
+            params = {'limit': 4} if after is None else {'limit': 4, 'after': after}
+            body = self.client.get('/demo/rest/api/index/', params).data
+            seen += [item['id'] for item in body['data']]
+            after = body['next']
+            if after is None:
+                break
+
+        self.assertEqual(seen, self.active_ids)
+
+    def test_ids_created_out_of_order_are_still_paged(self):
+        """Test a create with an older id than the last one keeps the table sorted"""
+        from demo_rest_api.ids import new_id
+        from demo_rest_api.store import get_store
+        from demo_rest_api.views import data_list
+        data_list.clear()
+        a, b, c = sorted(new_id() for _ in range(3))
+        for item_id in (a, c, b):
+            get_store().create({'id': item_id, 'name': 'User', 'email': 'user@example.com', 'is_active': True})
+
+        first = self.client.get('/demo/rest/api/index/', {'limit': 2}).data
+        second = self.client.get('/demo/rest/api/index/', {'limit': 2, 'after': first['next']}).data
+
+        self.assertEqual([item['id'] for item in first['data']], [a, b])
+        self.assertEqual([item['id'] for item in second['data']], [c])
+        self.assertEqual(get_store().get(b)['id'], b)
+
+    def test_invalid_limit_is_rejected(self):
+        """Test a non-positive limit returns a validation error"""
+        response = self.client.get('/demo/rest/api/index/', {'limit': '0'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('limit', response.data['errors'])
+
+
+class CompactionTestCase(APITestCase):
+
+    def setUp(self):
+        from demo_rest_api.feed import change_feed
+        from demo_rest_api.ids import new_id
+        from demo_rest_api.views import data_list
+        change_feed.clear()
+        data_list.clear()
+        for i in range(10):
+            data_list.append({'id': new_id(), 'name': f'User {i}', 'email': f'u{i}@example.com', 'is_active': True})
+        self.ids = [item['id'] for item in data_list]
+
+    def test_only_users_past_retention_are_purged(self):
+        """Test compaction keeps active and recently deactivated users and the index stays usable"""
+        import time
+        from demo_rest_api.compaction import compact
+        from demo_rest_api.store import get_store
+        from demo_rest_api.views import data_list
+
+        store = get_store()
+        for item_id in self.ids[:4]:
+            store.deactivate(item_id)
+        store.table.mark_active(self.ids[0], True)
+        store.table.mark_active(self.ids[0], False, now=time.time() - 100)
+
+        summary = compact(retention=50, dry_run=True)
+        self.assertEqual(summary['purged'], 1)
+        self.assertEqual(len(data_list), 10)
+
+        summary = compact(retention=50)
+        self.assertEqual(summary['purged'], 1)
+        self.assertIsNone(store.get(self.ids[0]))
+        self.assertEqual(store.get(self.ids[1])['is_active'], False)
+        self.assertEqual([item['id'] for item in data_list], self.ids[1:])
+
+        self.assertEqual(compact(retention=0, now=time.time() + 1)['purged'], 3)
+        self.assertEqual(len(data_list), 6)
+        self.assertEqual(store.get(self.ids[5])['name'], 'User 5')
+
+    def test_archive_receives_purged_users_and_feed_reports_them(self):
+        """Test archived users are written as JSON lines and published as purge events"""
+        import json
+        import os
+        import tempfile
+        from demo_rest_api.compaction import compact
+        from demo_rest_api.feed import change_feed
+
+        self.client.delete(f'/demo/rest/api/index/{self.ids[2]}/')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'archive.jsonl')
+            summary = compact(retention=0, archive_path=path)
+            with open(path) as archive:
+                lines = [json.loads(line) for line in archive]
+
+        self.assertTrue(summary['archived'])
+        self.assertEqual([line['id'] for line in lines], [self.ids[2]])
+        events, _ = change_feed.since(0)
+        self.assertEqual([event['op'] for event in events], ['deactivate', 'purge'])
+
+    def test_compact_users_command_runs_a_pass_in_process(self):
+        """Test manage.py compact_users compacts the store directly and there is no HTTP route for it"""
+        import io
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        from demo_rest_api.store import get_store
+
+        self.client.delete(f'/demo/rest/api/index/{self.ids[0]}/')
+
+        output = io.StringIO()
+        call_command('compact_users', '--retention-days', '0', '--dry-run', stdout=output)
+        self.assertIn('Se eliminarían 1 ', output.getvalue())
+        self.assertIsNotNone(get_store().get(self.ids[0]))
+
+        call_command('compact_users', '--retention-days', '0', stdout=io.StringIO())
+        self.assertIsNone(get_store().get(self.ids[0]))
+        with self.assertRaises(CommandError):
+            call_command('compact_users', '--retention-days', '-1')
+        self.assertEqual(
+            self.client.post('/demo/rest/api/compact/', {'retention': 0}, format='json').status_code,
+            status.HTTP_404_NOT_FOUND
+        )
+
+
+class TieredStoreTestCase(APITestCase):
+
+    def setUp(self):
+        from unittest import mock
+        from demo_rest_api.ids import new_id
+        from demo_rest_api.store import UserTable
+        from demo_rest_api.tiers import TieredStore
+
+        self.table = UserTable(
+            {'id': new_id(), 'name': f'User {i}', 'email': f'u{i}@example.com', 'is_active': i % 3 != 0}
+            for i in range(9)
+        )
+        self.ids = [item['id'] for item in self.table]
+        self.store = TieredStore(self.table, cold_after=0, cache_size=2)
+        self.addCleanup(self.store.close)
+        self.assertEqual(self.store.spill(), 3)
+        patcher = mock.patch('demo_rest_api.store._store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cold_file_is_per_process(self):
+        """Test another worker opening the same DEMO_COLD_PATH does not wipe this one's spilled users"""
+        import os
+        import tempfile
+        from unittest import mock
+        from demo_rest_api.store import UserTable
+        from demo_rest_api.tiers import ColdTier, TieredStore
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cold.sqlite3')
+            table = UserTable({'id': item_id, 'name': 'User', 'is_active': False} for item_id in self.ids[:2])
+            store = TieredStore(table, path=path, cold_after=0)
+            self.addCleanup(store.close)
+            self.assertEqual(store.spill(), 2)
+            self.assertEqual(store.cold.path, os.path.join(directory, f'cold-{os.getpid()}.sqlite3'))
+
+            with mock.patch('demo_rest_api.tiers.os.getpid', return_value=os.getpid() + 1):
+                other = ColdTier(path)
+            other.close()
+
+            self.assertEqual(len(store.cold), 2)
+            self.assertEqual(store.get(self.ids[1])['name'], 'User')
+            store.close()
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_inactive_users_leave_memory_but_stay_reachable_by_id(self):
+        """Test spilled users are on disk only and a read by id faults them back"""
+        self.assertEqual(len(self.table), 6)
+        self.assertEqual(len(self.store), 9)
+        self.assertEqual(self.store.stats()['cold_users'], 3)
+
+        response = self.client.get(f'/demo/rest/api/index/{self.ids[3]}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['name'], 'User 3')
+        self.assertFalse(response.data['data']['is_active'])
+        self.assertEqual(self.store.faults, 1)
+        self.client.get(f'/demo/rest/api/index/{self.ids[3]}/')
+        self.assertEqual(self.store.faults, 1)
+
+        listing = self.client.get('/demo/rest/api/index/')
+        self.assertEqual([item['id'] for item in listing.data['data']], [self.ids[i] for i in range(9) if i % 3])
+
+    def test_reactivated_user_returns_to_its_place_in_memory(self):
+        """Test writes keep versions across tiers and reactivation reinserts in id order"""
+        response = self.client.patch(f'/demo/rest/api/index/{self.ids[0]}/', {'name': 'Still inactive'}, format='json')
+        self.assertEqual(response['ETag'], '"2"')
+        self.assertEqual(len(self.table), 6)
+        self.assertEqual(self.store.cold.get(self.ids[0])[0]['name'], 'Still inactive')
+
+        response = self.client.patch(
+            f'/demo/rest/api/index/{self.ids[0]}/', {'is_active': True}, format='json', HTTP_IF_MATCH='"2"'
+        )
+        self.assertEqual(response['ETag'], '"3"')
+        self.assertEqual(self.table[0]['id'], self.ids[0])
+        self.assertEqual(self.store.get_versioned(self.ids[0])[1], 3)
+        self.assertIsNone(self.store.cold.get(self.ids[0]))
+
+        stale = self.client.patch(
+            f'/demo/rest/api/index/{self.ids[3]}/', {'name': 'x'}, format='json', HTTP_IF_MATCH='"5"'
+        )
+        self.assertEqual(stale.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_compaction_purges_the_cold_tier(self):
+        """Test retention applies to spilled users and clears them from the fault cache"""
+        import time
+        from demo_rest_api.compaction import compact
+
+        self.store.get(self.ids[6])
+        self.assertEqual(compact(retention=0, now=time.time() + 1)['purged'], 3)
+        self.assertEqual(len(self.store), 6)
+        self.assertIsNone(self.store.get(self.ids[6]))
+
+
+class DemoRestApiImportTestCase(APITestCase):
+
+    def setUp(self):
+        from demo_rest_api.views import data_list
+        data_list.clear()
+
+    def test_import_creates_every_user(self):
+        """Test a JSON array of users is created in order with generated ids"""
+        from demo_rest_api.views import data_list
+        users = [{'name': f'User {i}', 'email': f'user{i}@example.com'} for i in range(3)]
+
+        response = self.client.post('/demo/rest/api/import/', users, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual([item['id'] for item in data_list], response.data['data'])
+        self.assertEqual(data_list[2]['name'], 'User 2')
+
+    def test_invalid_item_rejects_the_whole_import(self):
+        """Test errors are reported by position and nothing is created"""
+        from demo_rest_api.views import data_list
+        users = [
+            {'name': 'Ok', 'email': 'ok@example.com'},
+            {'name': 'Bad', 'email': 'not-an-email', 'role': 'admin'},
+        ]
+
+        response = self.client.post('/demo/rest/api/import/', users, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.json()['errors']['1']), {'email', 'role'})
+        self.assertEqual(len(data_list), 0)
+
+    @override_settings(DEMO_IMPORT_MAX=2)
+    def test_import_stops_reading_past_the_limit(self):
+        response = self.client.post(
+            '/demo/rest/api/import/', [{'name': 'A', 'email': 'a@example.com'}] * 3, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('non_field_errors', response.data['errors'])
+
+
+class StoreBenchmarkTestCase(TestCase):
+
+    def test_every_operation_is_measured_per_backend(self):
+        """Test the store micro-benchmark reports timings and memory for each operation"""
+        from benchmarks.store_ops import BULK_OPS, POINT_OPS, run
+
+        for backend in ('local', 'tiered'):
+            result = run(backend, 200, shards=1, ops=20, repeat=1, memory=True, seed=0)
+
+            self.assertEqual(set(result['ops']), set(POINT_OPS + BULK_OPS), backend)
+            self.assertGreater(result['store_bytes'], 0)
+            self.assertGreater(result['ops']['insert']['retained_bytes'], 0)
+            self.assertGreater(result['ops']['export']['peak_bytes'], 0)
+            self.assertTrue(all(result['ops'][op]['mean_us'] > 0 for op in POINT_OPS))
@@ -0,0 +1,259 @@
+"""
+Almacén por niveles de demo_rest_api: activos en memoria, inactivos en disco.
+
+Con ``DEMO_STORE = 'tiered'`` la lista en memoria (``data_list``) conserva los
+usuarios activos y los recién desactivados. Una pasada periódica (cada
+``DEMO_SPILL_INTERVAL`` segundos, arrancada al calentar el worker) mueve a un
+nivel frío en SQLite los desactivados hace más de ``DEMO_COLD_AFTER``
+segundos, así que la memoria residente es proporcional al conjunto activo.
+
+Los listados y búsquedas sólo devuelven activos y no tocan el disco. Las
+operaciones por id (``DemoRestApiItem``) buscan primero en memoria y, si no
+está, traen el registro del nivel frío a una caché LRU de ``DEMO_COLD_CACHE``
+entradas. Los cambios sobre un registro frío se escriben en disco; si vuelve a
+estar activo, sale del nivel frío y se reinserta en su posición de la lista.
+La versión y el momento de la desactivación viajan con el registro, así que
+``ETag`` e ``If-Match`` y la retención de ``compaction.py`` no cambian.
+
+El nivel frío es espacio de desbordamiento, no persistencia: por defecto es
+una base de datos temporal de SQLite (``DEMO_COLD_PATH`` vacío) que se borra
+al cerrar. Con ``DEMO_COLD_PATH`` cada proceso usa su propio fichero, con su
+pid añadido al nombre (``cold.sqlite3`` -> ``cold-<pid>.sqlite3``), que se
+vacía al abrirlo y se borra al cerrar; así los workers no se pisan.
+Las claves son los 16 bytes del UUID (``ids.pack``).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from backend_data_server.periodic import PeriodicTask
+from .ids import pack
+from .store import LocalStore, VersionConflict, get_store
+
+
+class ColdTier:
+    """SQLite table of spilled users: ``id -> (version, deactivated_at, data)``."""
+
+    def __init__(self, path=''):
+        self.path = str(path)
+        if self.path:
+            # Un fichero por proceso: el de otro worker con la misma ruta no se toca al vaciar este
+            root, ext = os.path.splitext(self.path)
+            self.path = f'{root}-{os.getpid()}{ext}'
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        # Se recrea en cada arranque: no hace falta diario ni fsync
+        self.conn.execute('PRAGMA journal_mode=OFF')
+        self.conn.execute('PRAGMA synchronous=OFF')
+        self.conn.execute('DROP TABLE IF EXISTS users')
+        self.conn.execute(
+            'CREATE TABLE users (id PRIMARY KEY, version INTEGER NOT NULL, '
+            'deactivated_at REAL NOT NULL, data TEXT NOT NULL) WITHOUT ROWID'
+        )
+
+    def get(self, item_id):
+        """Return ``[item, version, deactivated_at]`` or ``None``."""
+        row = self.conn.execute(
+            'SELECT data, version, deactivated_at FROM users WHERE id = ?', (pack(item_id),)
+        ).fetchone()
+        return None if row is None else [json.loads(row[0]), row[1], row[2]]
+
+    def put_many(self, records):
+        """Store ``(item, version, deactivated_at)`` records in one transaction."""
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?)',
+                [(pack(item['id']), version, deactivated_at, json.dumps(item))
+                 for item, version, deactivated_at in records],
+            )
+
+    def delete(self, item_id):
+        with self.conn:
+            self.conn.execute('DELETE FROM users WHERE id = ?', (pack(item_id),))
+
+    def expired(self, cutoff):
+        return self.conn.execute('SELECT COUNT(*) FROM users WHERE deactivated_at <= ?', (cutoff,)).fetchone()[0]
+
+    def purge(self, cutoff):
+        """Delete the users deactivated at or before ``cutoff`` and return them."""
+        with self.conn:
+            rows = self.conn.execute('DELETE FROM users WHERE deactivated_at <= ? RETURNING data', (cutoff,))
+            return [json.loads(data) for data, in rows]
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute('DELETE FROM users')
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+
+    def size(self):
+        """Bytes used by the database file."""
+        page_count = self.conn.execute('PRAGMA page_count').fetchone()[0]
+        return page_count * self.conn.execute('PRAGMA page_size').fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+        if self.path:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+class TieredStore(LocalStore):
+    """``LocalStore`` that spills inactive users to a ``ColdTier`` and faults them back by id."""
+
+    def __init__(self, table, path='', cold_after=300, cache_size=1024):
+        super().__init__(table)
+        # Reentrante: el camino frío de swap() vuelve a intentar el caliente con el lock tomado
+        self._lock = threading.RLock()
+        self.cold = ColdTier(path)
+        self.cold_after = cold_after
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # id -> [item, version, deactivated_at] de registros fríos
+        self.faults = 0
+        self.spilled = 0
+
+    def _fault(self, item_id):
+        """Cold record for ``item_id`` (cached or read from disk), or ``None``. Lock held."""
+        record = self._cache.get(item_id)
+        if record is not None:
+            self._cache.move_to_end(item_id)
+            return record
+        record = self.cold.get(item_id)
+        if record is not None:
+            self.faults += 1
+            self._cache[item_id] = record
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return record
+
+    def get(self, item_id):
+        return self.get_versioned(item_id)[0]
+
+    def get_versioned(self, item_id):
+        item = self.table.get(item_id)
+        if item is not None:
+            return item, self.table.version(item_id)
+        with self._lock:
+            item = self.table.get(item_id)
+            if item is not None:
+                return item, self.table.version(item_id)
+            record = self._fault(item_id)
+            return (None, None) if record is None else (record[0], record[1])
+
+    def swap(self, item_id, data, replace=False, expected=None):
+        item, version = super().swap(item_id, data, replace=replace, expected=expected)
+        if item is not None:
+            return item, version
+        with self._lock:
+            # Con el lock tomado: pudo reinsertarse en memoria desde la primera comprobación
+            item, version = super().swap(item_id, data, replace=replace, expected=expected)
+            if item is not None:
+                return item, version
+            record = self._fault(item_id)
+            if record is None:
+                return None, None
+            item, version, deactivated_at = record
+            if expected is not None and version != expected:
+                raise VersionConflict(version)
+            if replace:
+                item.clear()
+                item['id'] = item_id
+            item.update(data)
+            version += 1
+            if item.get('is_active', False):
+                # Vuelve a estar activo: sale del nivel frío y recupera su sitio en la lista
+                self.cold.delete(item_id)
+                self._cache.pop(item_id, None)
+                self.table.insort(item, version)
+            else:
+                record[1] = version
+                self.cold.put_many([record])
+            return item, version
+
+    def spill(self, now=None, batch=1000):
+        """Move users inactive for ``cold_after`` seconds to the cold tier; returns how many."""
+        now = time.time() if now is None else now
+        table = self.table
+        cutoff = now - self.cold_after
+
+        def cold(item):
+            if item.get('is_active', False):
+                return False
+            table.mark_active(item['id'], False, now)
+            return table.deactivated_at(item['id']) <= cutoff
+
+        def write(chunk):
+            # Se escriben antes de salir de la lista: el registro siempre está en algún nivel
+            self.cold.put_many(
+                (item, table.version(item['id']), table.deactivated_at(item['id'])) for item in chunk
+            )
+
+        total = sum(len(chunk) for chunk in self._sweep(cold, batch, before_remove=write))
+        self.spilled += total
+        return total
+
+    def compact(self, cutoff, sink=None, now=None, batch=1000, dry_run=False):
+        total = super().compact(cutoff, sink=sink, now=now, batch=batch, dry_run=dry_run)
+        with self._lock:
+            if dry_run:
+                return total + self.cold.expired(cutoff)
+            removed = self.cold.purge(cutoff)
+            for item in removed:
+                self._cache.pop(item['id'], None)
+        if removed and sink is not None:
+            sink(removed)
+        return total + len(removed)
+
+    def clear(self):
+        with self._lock:
+            self.table.clear()
+            self.cold.clear()
+            self._cache.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self.table) + len(self.cold)
+
+    def warm_up(self):
+        return dict(super().warm_up(), spilled=self.spill())
+
+    def stats(self):
+        with self._lock:
+            cold_users = len(self.cold)
+            cold_bytes = self.cold.size()
+        hot = super().stats()
+        return dict(
+            hot,
+            backend='tiered',
+            users=hot['users'] + cold_users,
+            hot_users=hot['users'],
+            cold_users=cold_users,
+            cold_bytes=cold_bytes,
+            cold_cache=len(self._cache),
+            faults=self.faults,
+            spilled=self.spilled,
+        )
+
+    def close(self):
+        with self._lock:
+            self.cold.close()
+
+
+def spill():
+    """Background pass for ``DEMO_STORE = 'tiered'``; ``None`` with other backends."""
+    store = get_store()
+    if not isinstance(store, TieredStore):
+        return None
+    started = time.perf_counter()
+    spilled = store.spill(batch=getattr(settings, 'DEMO_COMPACTION_BATCH', 1000))
+    return {'spilled': spilled, 'ms': round((time.perf_counter() - started) * 1000, 1)}
+
+
+spiller = PeriodicTask(getattr(settings, 'DEMO_SPILL_INTERVAL', 60), spill, 'demo-spiller')
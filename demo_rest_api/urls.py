@@ -2,6 +2,8 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    path("", views.DemoRestApi.as_view(), name="demo_rest_api_resources"),
-    path("<str:item_id>/", views.DemoRestApiItem.as_view(), name="demo_rest_api_item"),
-]
\ No newline at end of file
+    path("index/", views.DemoRestApi.as_view(), name="demo_rest_api_resources"),
+    path("import/", views.DemoRestApiImport.as_view(), name="demo_rest_api_import"),
+    path("changes/", views.DemoRestApiChanges.as_view(), name="demo_rest_api_changes"),
+    path("index/<str:item_id>/", views.DemoRestApiItem.as_view(), name="demo_rest_api_item"),
+]
@@ -1,73 +1,278 @@
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-import uuid
+from rest_framework.exceptions import ParseError
+from django.utils.http import parse_etags
+
+from backend_data_server.streamjson import JSONArrayStreamParser
+from backend_data_server.sse import EventStreamRenderer, stream_headers
+
+from .feed import astream_events, change_feed, stream_events
+from .ids import new_id
+from .schemas import USER_SCHEMA
+from .store import VersionConflict, data_list, get_store  # noqa: F401 - data_list se usa en los tests
+
+
+def validation_error(errors):
+    return Response(
+        {'status': 'error', 'message': 'Validation failed', 'errors': errors},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
+def not_found(item_id):
+    return Response(
+        {'status': 'error', 'message': f'User with id {item_id} not found'},
+        status=status.HTTP_404_NOT_FOUND
+    )
+
+
+def with_etag(response, version):
+    response['ETag'] = f'"{version}"'
+    return response
+
+
+def precondition_failed(item_id, current):
+    return with_etag(Response(
+        {'status': 'error', 'message': f'User {item_id} has been modified since the given version'},
+        status=status.HTTP_412_PRECONDITION_FAILED
+    ), current)
+
+
+def expected_version(request):
+    """
+    Version required by ``If-Match``: ``None`` when absent or ``*``.
+
+    Only a single strong ETag is understood; anything else yields 0, which
+    never matches, so the write is refused with 412.
+    """
+    header = request.headers.get('If-Match')
+    if header is None or header.strip() == '*':
+        return None
+    etags = parse_etags(header)
+    if len(etags) != 1 or not etags[0].startswith('"'):
+        return 0
+    try:
+        return int(etags[0].strip('"'))
+    except ValueError:
+        return 0
 
-# Simulación de base de datos local
-data_list = [
-    {'id': str(uuid.uuid4()), 'name': 'User01', 'email': 'user01@example.com', 'is_active': True},
-    {'id': str(uuid.uuid4()), 'name': 'User02', 'email': 'user02@example.com', 'is_active': True},
-    {'id': str(uuid.uuid4()), 'name': 'User03', 'email': 'user03@example.com', 'is_active': False},
-]
 
 class DemoRestApi(APIView):
     name = "Demo REST API"
 
     def get(self, request):
-        # Filtra la lista para incluir solo los elementos donde 'is_active' es True
-        active_items = [item for item in data_list if item.get('is_active', False)]
-        return Response(active_items, status=status.HTTP_200_OK)
+        # Sólo los elementos activos; ?search= filtra además por nombre o email
+        term = request.query_params.get('search', '').strip() or None
+        limit = request.query_params.get('limit')
+        if limit is None:
+            active_items = get_store().query(term)
+            return Response(
+                {'status': 'success', 'count': len(active_items), 'data': active_items},
+                status=status.HTTP_200_OK
+            )
+
+        # Paginación por cursor: ?limit=N&after=<último id de la página anterior>
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return validation_error({'limit': ['Must be a positive integer.']})
+        limit = min(limit, getattr(settings, 'DEMO_PAGE_MAX_LIMIT', 1000))
+        page = get_store().query(term, after=request.query_params.get('after') or None, limit=limit + 1)
+        has_more = len(page) > limit
+        page = page[:limit]
+        return Response(
+            {
+                'status': 'success',
+                'count': len(page),
+                'next': page[-1]['id'] if has_more else None,
+                'data': page,
+            },
+            status=status.HTTP_200_OK
+        )
 
     def post(self, request):
-        data = request.data
-        # Validación mínima
-        if 'name' not in data or 'email' not in data:
-            return Response({'error': 'Faltan campos requeridos.'}, status=status.HTTP_400_BAD_REQUEST)
+        data, errors = USER_SCHEMA.validate(request.data)
+        if errors:
+            return validation_error(errors)
 
-        data['id'] = str(uuid.uuid4())
+        data['id'] = new_id()
         data['is_active'] = True
-        data_list.append(data)
-        return Response({'message': 'Dato guardado exitosamente.', 'data': data}, status=status.HTTP_201_CREATED)
+        data = get_store().create(data)
+        change_feed.publish('create', data)
+        return with_etag(Response(
+            {'status': 'success', 'message': 'User created successfully', 'data': data},
+            status=status.HTTP_201_CREATED
+        ), 1)
+
 
 class DemoRestApiItem(APIView):
+
+    def _find_user_by_id(self, item_id):
+        return get_store().get(item_id)
+
+    def _write(self, item_id, data, replace=False, expected=None):
+        """Compare-and-swap through the store; returns ``(item, version, error_response)``."""
+        try:
+            item, version = get_store().swap(item_id, data, replace=replace, expected=expected)
+        except VersionConflict as exc:
+            return None, None, precondition_failed(item_id, exc.current)
+        if item is None:
+            return None, None, not_found(item_id)
+        return item, version, None
+
+    def get(self, request, item_id):
+        item, version = get_store().get_versioned(item_id)
+        if item is None:
+            return not_found(item_id)
+        return with_etag(Response({'status': 'success', 'data': item}, status=status.HTTP_200_OK), version)
+
     def put(self, request, item_id):
-        for item in data_list:
-            if item["id"] == item_id:
-                item["name"] = request.data.get("name", "")
-                item["email"] = request.data.get("email", "")
-                item["is_active"] = request.data.get("is_active", False)
-                return Response(
-                    {"message": "Elemento actualizado completamente."},
-                    status=status.HTTP_200_OK
-                )
+        if self._find_user_by_id(item_id) is None:
+            return not_found(item_id)
+
+        data, errors = USER_SCHEMA.validate(request.data)
+        if errors:
+            return validation_error(errors)
+
+        # Reemplazo completo: se conserva únicamente el id
+        item, version, error = self._write(item_id, data, replace=True, expected=expected_version(request))
+        if error is not None:
+            return error
+        change_feed.publish('update', item)
+        return with_etag(Response(
+            {'status': 'success', 'message': 'User updated successfully', 'data': item},
+            status=status.HTTP_200_OK
+        ), version)
+
+    def patch(self, request, item_id):
+        if self._find_user_by_id(item_id) is None:
+            return not_found(item_id)
+
+        data, errors = USER_SCHEMA.validate(request.data, partial=True)
+        if errors:
+            return validation_error(errors)
+
+        item, version, error = self._write(item_id, data, expected=expected_version(request))
+        if error is not None:
+            return error
+        change_feed.publish('update', item)
+        return with_etag(Response(
+            {'status': 'success', 'message': 'User updated successfully', 'data': item},
+            status=status.HTTP_200_OK
+        ), version)
+
+    def delete(self, request, item_id):
+        # Eliminación lógica
+        item, version, error = self._write(item_id, {'is_active': False}, expected=expected_version(request))
+        if error is not None:
+            return error
+        change_feed.publish('deactivate', item)
         return Response(
-            {"message": "Elemento no encontrado."},
-            status=status.HTTP_404_NOT_FOUND
+            {'status': 'success', 'message': f'User {item_id} successfully deleted'},
+            status=status.HTTP_200_OK
         )
 
-    def patch(self, request, item_id):
-        for item in data_list:
-            if item["id"] == item_id:
-                item.update({k: v for k, v in request.data.items() if k in item})
-                return Response(
-                    {"message": "Elemento actualizado parcialmente."},
-                    status=status.HTTP_200_OK
-                )
+
+class DemoRestApiImport(APIView):
+    """
+    Alta masiva de usuarios a partir de un array JSON.
+
+    El cuerpo se lee y valida elemento a elemento (``JSONArrayStreamParser``)
+    y se deja de leer al pasar de ``DEMO_IMPORT_MAX`` elementos. Si algún
+    elemento no es válido no se crea ninguno y los errores se devuelven por
+    posición, como ``Schema.validate_many``.
+    """
+    name = "Demo REST API Import"
+    parser_classes = [JSONArrayStreamParser]
+
+    def post(self, request):
+        limit = getattr(settings, 'DEMO_IMPORT_MAX', 10000)
+        users = []
+        errors = {}
+        try:
+            if isinstance(request.data, dict):
+                raise ParseError('Expected a JSON array.')
+            for index, item in enumerate(request.data):
+                if index >= limit:
+                    return validation_error({'non_field_errors': [f'At most {limit} users per import.']})
+                cleaned, item_errors = USER_SCHEMA.validate(item)
+                if item_errors:
+                    errors[index] = item_errors
+                else:
+                    users.append(cleaned)
+        except ParseError as exc:
+            return validation_error({'non_field_errors': [str(exc.detail)]})
+        if errors:
+            return validation_error(errors)
+
+        store = get_store()
+        ids = []
+        for data in users:
+            data['id'] = new_id()
+            data = store.create(data)
+            change_feed.publish('create', data)
+            ids.append(data['id'])
         return Response(
-            {"message": "Elemento no encontrado."},
-            status=status.HTTP_404_NOT_FOUND
+            {'status': 'success', 'message': f'{len(ids)} users imported', 'count': len(ids), 'data': ids},
+            status=status.HTTP_201_CREATED
         )
 
-    def delete(self, request, item_id):
-        for item in data_list:
-            if item["id"] == item_id:
-                item["is_active"] = False  # Eliminación lógica
-                return Response(
-                    {"message": "Elemento desactivado correctamente."},
-                    status=status.HTTP_200_OK
-                )
+
+class DemoRestApiChanges(APIView):
+    """
+    Feed incremental de mutaciones.
+
+    ``?since=<seq>`` devuelve los eventos posteriores a esa secuencia y, con
+    ``timeout``, espera (long-poll) hasta que llegue alguno. Con
+    ``Accept: text/event-stream`` la respuesta es un stream SSE que reanuda
+    desde ``Last-Event-ID``.
+    """
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [EventStreamRenderer]
+
+    def get(self, request):
+        stream = request.accepted_renderer.format == EventStreamRenderer.format
+        since = request.query_params.get('since')
+        if since is None and stream:
+            since = request.headers.get('Last-Event-ID')
+        try:
+            since = int(since or 0)
+        except ValueError:
+            return validation_error({'since': ['Must be an integer.']})
+        try:
+            timeout = float(request.query_params.get('timeout', 0))
+        except ValueError:
+            return validation_error({'timeout': ['Must be a number.']})
+
+        if stream:
+            heartbeat = getattr(settings, 'DEMO_FEED_HEARTBEAT', 15)
+            duration = getattr(settings, 'DEMO_FEED_STREAM_SECONDS', 300)
+            # Con ASGI un generador síncrono se leería entero antes de enviar nada
+            if isinstance(request._request, ASGIRequest):
+                events = astream_events(change_feed, since, heartbeat, duration)
+            else:
+                events = stream_events(change_feed, since, heartbeat, duration)
+            return stream_headers(StreamingHttpResponse(events, content_type='text/event-stream'))
+
+        timeout = max(0.0, min(timeout, getattr(settings, 'DEMO_FEED_MAX_WAIT', 30)))
+        if timeout:
+            events, reset = change_feed.wait(since, timeout)
+        else:
+            events, reset = change_feed.since(since)
         return Response(
-            {"message": "Elemento no encontrado."},
-            status=status.HTTP_404_NOT_FOUND
-        )
\ No newline at end of file
+            {
+                'status': 'success',
+                'last_seq': events[-1]['seq'] if events else change_feed.last_seq,
+                'reset': reset,
+                'count': len(events),
+                'data': events,
+            },
+            status=status.HTTP_200_OK
+        )
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class HomepageConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "homepage"
+
+    def warm_up(self):
+        from .views import prerender
+
+        body, _ = prerender()
+        return {'bytes': len(body)}
+
+    def stats(self):
+        from .views import _cache
+
+        return {'prerendered': 'index' in _cache}
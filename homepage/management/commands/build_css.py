@@ -0,0 +1,45 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from homepage.views import HOMEPAGE_CSS
+
+
+class Command(BaseCommand):
+    help = (
+        "Compila el CSS de Tailwind de la página de inicio a un fichero estático "
+        "minificado, para no depender del compilador JIT del navegador."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cli",
+            default=getattr(settings, "TAILWIND_CLI", "tailwindcss"),
+            help="Ejecutable de Tailwind (CLI standalone o el de npm).",
+        )
+
+    def handle(self, *args, **options):
+        cli = shutil.which(options["cli"])
+        if cli is None:
+            raise CommandError(
+                f"No se encontró '{options['cli']}'. Instale el CLI standalone de Tailwind v4 "
+                "o indique su ruta con --cli / TAILWIND_CLI."
+            )
+
+        source = Path(__file__).resolve().parents[2] / "tailwind.css"
+        output = Path(settings.STATICFILES_DIRS[0]) / HOMEPAGE_CSS
+        output.parent.mkdir(parents=True, exist_ok=True)
+
+        result = subprocess.run(
+            [cli, "-i", str(source), "-o", str(output), "--minify"],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(result.stderr.strip() or "Tailwind terminó con error.")
+
+        self.stdout.write(self.style.SUCCESS(f"CSS generado en {output}"))
+        self.stdout.write("Ejecute 'python manage.py collectstatic' para publicar la versión con hash.")
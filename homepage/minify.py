@@ -0,0 +1,23 @@
+"""
+Minificador HTML conservador para las páginas pre-renderizadas.
+
+Elimina comentarios y colapsa los espacios en blanco, sin tocar el contenido
+de ``<pre>``, ``<textarea>``, ``<script>`` ni ``<style>``.
+"""
+import re
+
+PRESERVE_RE = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.IGNORECASE | re.DOTALL)
+COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def minify_html(html):
+    parts = PRESERVE_RE.split(html)
+    out = []
+    # split() devuelve [texto, bloque, nombre_tag, texto, bloque, nombre_tag, ...]
+    for index in range(0, len(parts), 3):
+        text = COMMENT_RE.sub("", parts[index])
+        out.append(WHITESPACE_RE.sub(" ", text))
+        if index + 1 < len(parts):
+            out.append(parts[index + 1])
+    return "".join(out).strip()
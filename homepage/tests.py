@@ -1,3 +1,73 @@
-from django.test import TestCase
+from django.template.loader import render_to_string
+from django.test import TestCase, override_settings
+from unittest import mock
 
-# Create your tests here.
+
+class HomepageTestCase(TestCase):
+    
+    def setUp(self):
+        from homepage.views import clear_cache
+        clear_cache()
+    
+    def test_index_is_minified_and_cacheable(self):
+        """Test the homepage is served minified with caching headers"""
+        response = self.client.get('/homepage/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('max-age=', response['Cache-Control'])
+        self.assertTrue(response.has_header('ETag'))
+        self.assertNotIn(b'\n  ', response.content)
+        self.assertIn(b'Demo REST API', response.content)
+    
+    @override_settings(DEBUG=True)
+    def test_index_is_rendered_once(self):
+        """Test repeated hits reuse the pre-rendered body, also with the shipped DEBUG = True"""
+        with mock.patch('homepage.views.render_to_string', wraps=render_to_string) as rendered:
+            first = self.client.get('/homepage/')
+            second = self.client.get('/homepage/index/')
+        
+        self.assertEqual(rendered.call_count, 1)
+        self.assertEqual(first.content, second.content)
+    
+    @override_settings(HOMEPAGE_PRERENDER=False)
+    def test_prerender_can_be_disabled(self):
+        """Test HOMEPAGE_PRERENDER = False renders the template on every request"""
+        with mock.patch('homepage.views.render_to_string', wraps=render_to_string) as rendered:
+            self.client.get('/homepage/')
+            self.client.get('/homepage/')
+        
+        self.assertEqual(rendered.call_count, 2)
+    
+    def test_conditional_get_returns_304(self):
+        """Test a client holding the current ETag gets 304"""
+        etag = self.client.get('/homepage/')['ETag']
+        
+        response = self.client.get('/homepage/', HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, 304)
+    
+    def test_prebuilt_css_replaces_browser_compiler(self):
+        """Test the CDN Tailwind compiler is only used when no built CSS exists"""
+        with mock.patch('homepage.views.has_prebuilt_css', return_value=False):
+            fallback = self.client.get('/homepage/').content
+        from homepage.views import clear_cache
+        clear_cache()
+        with mock.patch('homepage.views.has_prebuilt_css', return_value=True):
+            built = self.client.get('/homepage/').content
+        
+        self.assertIn(b'@tailwindcss/browser', fallback)
+        self.assertNotIn(b'@tailwindcss/browser', built)
+        self.assertIn(b'css/homepage.css', built)
+
+
+class MinifyHtmlTestCase(TestCase):
+    
+    def test_preserves_pre_and_script_blocks(self):
+        from homepage.minify import minify_html
+        
+        html = '<div>\n   a  <!-- x -->  b\n</div><pre>  keep\n  this</pre><script>\n var a;\n</script>'
+        
+        self.assertEqual(
+            minify_html(html),
+            '<div> a b </div><pre>  keep\n  this</pre><script>\n var a;\n</script>'
+        )
@@ -1,4 +1,49 @@
-from django.shortcuts import render
+import hashlib
+import threading
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+from .minify import minify_html
+
+HOMEPAGE_CSS = 'css/homepage.css'
+
+# Página pre-renderizada: (cuerpo minificado, etag)
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def has_prebuilt_css():
+    """True when ``manage.py build_css`` output is available to the static storage."""
+    return bool(finders.find(HOMEPAGE_CSS)) or staticfiles_storage.exists(HOMEPAGE_CSS)
+
+
+def prerender():
+    """Render, minify and cache the homepage; returns ``(body, etag)``."""
+    html = render_to_string('homepage/index.html', {'prebuilt_css': has_prebuilt_css()})
+    body = minify_html(html).encode('utf-8')
+    entry = (body, '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest())
+    with _cache_lock:
+        _cache['index'] = entry
+    return entry
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
 
 def index(request):
-    return render(request, 'homepage/index.html')
\ No newline at end of file
+    # Con HOMEPAGE_PRERENDER desactivado se vuelve a renderizar para ver los cambios de la plantilla
+    entry = _cache.get('index') if getattr(settings, 'HOMEPAGE_PRERENDER', True) else None
+    if entry is None:
+        entry = prerender()
+    body, etag = entry
+
+    response = HttpResponse(body, content_type='text/html; charset=utf-8')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=%d' % getattr(settings, 'HOMEPAGE_MAX_AGE', 300)
+    return response
@@ -0,0 +1,139 @@
+"""
+Agregados de los envíos de landing_data mantenidos en el servidor.
+
+``SubmissionAggregates`` lleva contadores por día, por hora y por valor de
+cada campo y se actualiza con cada registro que entra en la copia local
+(``SnapshotCache``): al aceptar un ``POST`` se suma el envío y al recargar la
+colección completa se recalculan una vez, en el hilo que la recarga. La ruta
+de agregados devuelve esos contadores sin recorrer los registros.
+
+El momento de cada envío sale de su clave push (los 8 primeros caracteres
+son milisegundos Unix), no del campo ``timestamp``, que es texto localizado.
+Los tramos se calculan en ``TIME_ZONE``. Los registros con claves que no son
+push se cuentan en ``undated``.
+
+Por campo sólo se cuentan valores escalares y, para acotar la memoria, como
+mucho ``LANDING_AGGREGATE_MAX_FIELDS`` campos y
+``LANDING_AGGREGATE_MAX_VALUES`` valores distintos por campo; el resto se
+suma en ``other``.
+"""
+import threading
+from collections import Counter
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+
+from .pushid import push_key_time
+
+EXCLUDED_FIELDS = frozenset(('timestamp',))
+
+
+class FieldCounter:
+    """Counts per value of one field, bounded to ``max_values`` distinct values."""
+
+    def __init__(self, max_values):
+        self.max_values = max_values
+        self.values = Counter()
+        self.other = 0
+
+    def add(self, value, delta=1):
+        if value in self.values or len(self.values) < self.max_values:
+            self.values[value] += delta
+            if self.values[value] <= 0:
+                del self.values[value]
+        else:
+            self.other += delta
+
+    def as_dict(self):
+        return {'values': dict(self.values.most_common()), 'other': self.other}
+
+
+class SubmissionAggregates:
+    """Incrementally maintained counts over landing submissions."""
+
+    def __init__(self, time_zone='UTC', max_fields=50, max_values=1000):
+        self.tz = ZoneInfo(time_zone)
+        self.max_fields = max_fields
+        self.max_values = max_values
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.total = 0
+        self.undated = 0
+        self.by_day = Counter()
+        self.by_hour = Counter()
+        self.fields = {}
+
+    def _buckets(self, key):
+        ms = push_key_time(key)
+        if ms is None:
+            return None, None
+        moment = datetime.fromtimestamp(ms / 1000, self.tz)
+        return moment.strftime('%Y-%m-%d'), moment.strftime('%Y-%m-%dT%H:00')
+
+    def _apply(self, key, record, delta):
+        self.total += delta
+        day, hour = self._buckets(key)
+        if day is None:
+            self.undated += delta
+        else:
+            self.by_day[day] += delta
+            self.by_hour[hour] += delta
+        if not isinstance(record, dict):
+            return
+        for field, value in record.items():
+            if field in EXCLUDED_FIELDS or not isinstance(value, (str, int, float, bool)):
+                continue
+            counter = self.fields.get(field)
+            if counter is None:
+                if len(self.fields) >= self.max_fields:
+                    continue
+                counter = self.fields[field] = FieldCounter(self.max_values)
+            counter.add(value, delta)
+
+    def add(self, key, record):
+        with self._lock:
+            self._apply(key, record, 1)
+
+    def remove(self, key, record):
+        with self._lock:
+            self._apply(key, record, -1)
+
+    def rebuild(self, data):
+        """Recount from a full copy of the collection."""
+        with self._lock:
+            self._reset()
+            if isinstance(data, dict):
+                for key, record in data.items():
+                    self._apply(key, record, 1)
+
+    def summary(self, bucket='day', fields=(), since=None, until=None):
+        """
+        Counts per ``bucket`` (``'day'`` or ``'hour'``) between ``since`` and
+        ``until`` (inclusive label prefixes) and value counts of ``fields``.
+        """
+        with self._lock:
+            series = self.by_day if bucket == 'day' else self.by_hour
+            counts = {
+                label: count for label, count in sorted(series.items())
+                if count and (since is None or label >= since) and (until is None or label[:len(until)] <= until)
+            }
+            return {
+                'total': self.total,
+                'undated': self.undated,
+                'bucket': bucket,
+                'counts': counts,
+                'fields': {
+                    field: self.fields[field].as_dict() if field in self.fields else {'values': {}, 'other': 0}
+                    for field in fields
+                },
+            }
+
+
+aggregates = SubmissionAggregates(
+    time_zone=settings.TIME_ZONE,
+    max_fields=getattr(settings, 'LANDING_AGGREGATE_MAX_FIELDS', 50),
+    max_values=getattr(settings, 'LANDING_AGGREGATE_MAX_VALUES', 1000),
+)
@@ -3,4 +3,49 @@ from django.apps import AppConfig
 
 class LandingApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "landing_api"
\ No newline at end of file
+    name = "landing_api"
+
+    def warm_up(self):
+        from .gateway import firebase
+        from .resilience import snapshot, syncer
+
+        # Sin réplica cada sincronización descargaría landing_data entera: sólo bajo demanda
+        syncing = snapshot.mirror is not None and (syncer.start() or syncer.running)
+        # La réplica en disco se sirve aunque Firebase no responda durante el arranque
+        if snapshot.mirror is not None:
+            snapshot.load_local()
+        # Conexión y token listos, y la copia de landing_data en caché
+        firebase.open()
+        data = snapshot.refresh()
+        return {'records': len(data) if isinstance(data, dict) else 0, 'syncer': syncing}
+
+    def readiness(self):
+        from .resilience import OPEN, breaker, outbox
+
+        state = breaker.state
+        return {'ok': True, 'degraded': state == OPEN, 'circuit': state, 'outbox': len(outbox)}
+
+    def stats(self):
+        from backend_data_server.probes import ratio
+        from .analytics import aggregates
+        from .broker import submission_broker
+        from .gateway import firebase
+        from .resilience import breaker, mirror, outbox, snapshot, syncer
+
+        lookups = snapshot.hits + snapshot.stale_hits + snapshot.misses
+        return {
+            'circuit': breaker.state,
+            'snapshot': {
+                'hits': snapshot.hits,
+                'stale_hits': snapshot.stale_hits,
+                'misses': snapshot.misses,
+                'hit_rate': ratio(snapshot.hits + snapshot.stale_hits, lookups),
+                'age': snapshot.age,
+            },
+            'outbox': len(outbox),
+            'aggregated': aggregates.total,
+            'mirror': mirror.stats() if mirror is not None else None,
+            'last_sync': syncer.last_run,
+            'stream_last_id': submission_broker.last_id,
+            'gateway': firebase.stats(),
+        }
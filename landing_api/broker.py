@@ -0,0 +1,148 @@
+"""
+Broker en proceso para las nuevas entradas de landing_data.
+
+``LandingAPI.post`` publica cada envío aceptado y el broker lo reparte a todos
+los clientes conectados por SSE. Los suscriptores síncronos (WSGI) esperan en
+una ``threading.Condition``; los asíncronos (ASGI) registran un
+``asyncio.Event`` que se activa desde el hilo que publica, así que un cliente
+conectado no ocupa ningún hilo mientras espera.
+
+Los ids de evento son las claves push de Firebase, que se ordenan
+cronológicamente, por lo que reanudar desde ``Last-Event-ID`` es una
+comparación de cadenas.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+from backend_data_server.sse import KEEP_ALIVE_FRAME, RETRY_FRAME, format_sse
+
+
+class SubmissionBroker:
+    """Fan-out of new landing submissions to sync and async subscribers."""
+
+    def __init__(self, max_events=500):
+        self._events = deque(maxlen=max_events)
+        self._cond = threading.Condition()
+        self._async_waiters = set()
+        self._version = 0
+        self._dropped = False
+
+    def publish(self, key, data):
+        event = {'id': key, 'data': data}
+        with self._cond:
+            if len(self._events) == self._events.maxlen:
+                self._dropped = True
+            self._events.append(event)
+            self._version += 1
+            self._cond.notify_all()
+            waiters = list(self._async_waiters)
+        for loop, flag in waiters:
+            loop.call_soon_threadsafe(flag.set)
+        return event
+
+    def after(self, last_id):
+        """
+        Return ``(events, missed)`` for buffered events newer than ``last_id``.
+
+        ``missed`` is True when ``last_id`` predates the buffer, i.e. some
+        submissions between it and the oldest buffered one are not available.
+        """
+        with self._cond:
+            return self._after(last_id)
+
+    def _after(self, last_id):
+        if last_id is None:
+            return [], False
+        events = []
+        for event in reversed(self._events):
+            if event['id'] <= last_id:
+                break
+            events.append(event)
+        events.reverse()
+        missed = self._dropped and bool(events) and events[0] is self._events[0]
+        return events, missed
+
+    def wait(self, last_id, timeout):
+        with self._cond:
+            version = self._version
+            events, missed = self._after(last_id)
+            if events:
+                return events, missed
+            self._cond.wait_for(lambda: self._version != version, timeout=timeout)
+            return self._after(last_id)
+
+    async def wait_async(self, last_id, timeout):
+        flag = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), flag)
+        with self._cond:
+            events, missed = self._after(last_id)
+            if events:
+                return events, missed
+            self._async_waiters.add(waiter)
+        try:
+            await asyncio.wait_for(flag.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._async_waiters.discard(waiter)
+        return self.after(last_id)
+
+    @property
+    def last_id(self):
+        with self._cond:
+            return self._events[-1]['id'] if self._events else ''
+
+    def clear(self):
+        with self._cond:
+            self._events.clear()
+            self._dropped = False
+
+
+submission_broker = SubmissionBroker(getattr(settings, 'LANDING_STREAM_BUFFER', 500))
+
+
+def _frames(events, missed):
+    if missed:
+        yield format_sse({}, event='gap')
+    for event in events:
+        yield format_sse(event['data'], event='submission', event_id=event['id'])
+
+
+def stream_submissions(broker, last_id, heartbeat=15, duration=300):
+    """Synchronous SSE generator for WSGI servers."""
+    deadline = time.monotonic() + duration
+    last_id = broker.last_id if last_id is None else last_id
+    yield RETRY_FRAME
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        events, missed = broker.wait(last_id, min(heartbeat, remaining))
+        if not events:
+            yield KEEP_ALIVE_FRAME
+            continue
+        yield from _frames(events, missed)
+        last_id = events[-1]['id']
+
+
+async def astream_submissions(broker, last_id, heartbeat=15, duration=300):
+    """Asynchronous SSE generator for ASGI servers."""
+    deadline = time.monotonic() + duration
+    last_id = broker.last_id if last_id is None else last_id
+    yield RETRY_FRAME
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        events, missed = await broker.wait_async(last_id, min(heartbeat, remaining))
+        if not events:
+            yield KEEP_ALIVE_FRAME
+            continue
+        for frame in _frames(events, missed):
+            yield frame
+        last_id = events[-1]['id']
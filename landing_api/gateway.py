@@ -0,0 +1,232 @@
+"""
+Pasarela a Firebase Realtime Database para landing_api.
+
+En lugar de ``firebase_admin.db.reference(...)`` por petición, las llamadas
+pasan por un único cliente ``httpx`` por proceso contra la API REST de la
+base de datos: conexiones keep-alive (HTTP/2 si ``h2`` está instalado), pool
+acotado, timeouts por llamada y reintentos con backoff exponencial con
+jitter. El token OAuth se obtiene de la credencial de ``firebase_admin`` y se
+reutiliza hasta poco antes de caducar.
+
+``httpx`` y ``firebase_admin`` se importan en la primera llamada y no al
+cargar el módulo, para que el arranque del worker no pague por ellos.
+"""
+import importlib.util
+import random
+import threading
+import time
+
+from django.conf import settings
+
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+RETRY_STATUS = frozenset((429, 500, 502, 503, 504))
+
+_app_lock = threading.Lock()
+
+
+class GatewayError(Exception):
+    """Firebase could not be reached or answered with an error."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class GatewayTimeout(GatewayError):
+    pass
+
+
+def firebase_app():
+    """Return the default firebase_admin app, initializing it on first use."""
+    import firebase_admin
+
+    with _app_lock:
+        try:
+            return firebase_admin.get_app()
+        except ValueError:
+            from firebase_admin import credentials
+
+            return firebase_admin.initialize_app(
+                credentials.Certificate(str(settings.FIREBASE_CREDENTIALS_PATH)),
+                {'databaseURL': settings.FIREBASE_DATABASE_URL},
+            )
+
+
+def firebase_access_token():
+    """Return ``(token, expiry_timestamp)`` from the default firebase_admin app."""
+    info = firebase_app().credential.get_access_token()
+    expiry = info.expiry.timestamp() if info.expiry else time.time() + 3000
+    return info.access_token, expiry
+
+
+class FirebaseGateway:
+    """Pooled, retrying HTTP client for the Realtime Database REST API."""
+
+    def __init__(self, database_url, pool_size=10, timeout=5.0, connect_timeout=2.0,
+                 retries=2, backoff=0.1, backoff_cap=2.0, http2=True,
+                 transport=None, token_provider=firebase_access_token):
+        self.database_url = database_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_cap = backoff_cap
+        self.http2 = http2 and HTTP2_AVAILABLE and transport is None
+        self.transport = transport
+        self.token_provider = token_provider
+
+        self._client = None
+        self._lock = threading.Lock()
+        self._token = None
+        self._token_expiry = 0.0
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.retried = 0
+        self.errors = 0
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            settings.FIREBASE_DATABASE_URL,
+            pool_size=getattr(settings, 'FIREBASE_POOL_SIZE', 10),
+            timeout=getattr(settings, 'FIREBASE_TIMEOUT', 5.0),
+            connect_timeout=getattr(settings, 'FIREBASE_CONNECT_TIMEOUT', 2.0),
+            retries=getattr(settings, 'FIREBASE_RETRIES', 2),
+            backoff=getattr(settings, 'FIREBASE_BACKOFF', 0.1),
+            http2=getattr(settings, 'FIREBASE_HTTP2', True),
+        )
+
+    @property
+    def client(self):
+        if self._client is None:
+            import httpx
+
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        base_url=self.database_url,
+                        http2=self.http2,
+                        transport=self.transport,
+                        limits=httpx.Limits(
+                            max_connections=self.pool_size,
+                            max_keepalive_connections=self.pool_size,
+                            keepalive_expiry=60.0,
+                        ),
+                        timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout, pool=self.connect_timeout),
+                    )
+        return self._client
+
+    def open(self):
+        """Create the client and fetch a token ahead of the first request."""
+        self.client
+        self._auth_header()
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def _auth_header(self):
+        if self.token_provider is None:
+            return {}
+        now = time.time()
+        if self._token is None or now > self._token_expiry - 60:
+            with self._lock:
+                if self._token is None or now > self._token_expiry - 60:
+                    try:
+                        self._token, self._token_expiry = self.token_provider()
+                    except Exception as exc:
+                        # Sin token no hay llamada posible: para quien llama es Firebase no disponible
+                        raise GatewayError(f'Firebase token unavailable: {exc}') from exc
+        return {'Authorization': f'Bearer {self._token}'}
+
+    def _sleep_before_retry(self, attempt):
+        # Full jitter: evita que todos los workers reintenten a la vez
+        time.sleep(random.uniform(0, min(self.backoff_cap, self.backoff * (2 ** attempt))))
+
+    def request(self, method, path, json=None, params=None, timeout=None, idempotent=True):
+        import httpx
+
+        # Errores en los que la petición no llegó a enviarse: seguros incluso para POST
+        not_sent = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+        url = '/' + path.strip('/') + '.json'
+        timeout = self.timeout if timeout is None else timeout
+
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            attempt = 0
+            while True:
+                try:
+                    response = self.client.request(
+                        method, url, json=json, params=params,
+                        headers=self._auth_header(),
+                        timeout=httpx.Timeout(timeout, connect=min(timeout, self.connect_timeout)),
+                    )
+                except httpx.TransportError as exc:
+                    retryable = idempotent or isinstance(exc, not_sent)
+                    if retryable and attempt < self.retries:
+                        attempt += 1
+                        self.retried += 1
+                        self._sleep_before_retry(attempt)
+                        continue
+                    self.errors += 1
+                    if isinstance(exc, httpx.TimeoutException):
+                        raise GatewayTimeout(f'Firebase timed out: {exc}') from exc
+                    raise GatewayError(f'Firebase unreachable: {exc}') from exc
+
+                if response.status_code in RETRY_STATUS and idempotent and attempt < self.retries:
+                    attempt += 1
+                    self.retried += 1
+                    self._sleep_before_retry(attempt)
+                    continue
+                if response.status_code >= 400:
+                    self.errors += 1
+                    raise GatewayError(
+                        f'Firebase answered {response.status_code}', status_code=response.status_code
+                    )
+                return response.json()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def get(self, path, params=None, timeout=None):
+        return self.request('GET', path, params=params, timeout=timeout)
+
+    def push(self, path, data, timeout=None):
+        """Append ``data`` under ``path`` and return the generated push key."""
+        return self.request('POST', path, json=data, timeout=timeout, idempotent=False)['name']
+
+    def set(self, path, data, timeout=None):
+        """Write ``data`` at ``path``; idempotent, so it is retried like a read."""
+        return self.request('PUT', path, json=data, timeout=timeout)
+
+    def update(self, path, data, timeout=None):
+        return self.request('PATCH', path, json=data, timeout=timeout)
+
+    def stats(self):
+        connections = None
+        pool = getattr(getattr(self._client, '_transport', None), '_pool', None)
+        if pool is not None:
+            connections = len(getattr(pool, 'connections', ()))
+        return {
+            'pool_size': self.pool_size,
+            'http2': self.http2,
+            'in_flight': self.in_flight,
+            'peak_in_flight': self.peak_in_flight,
+            'utilization': self.in_flight / self.pool_size if self.pool_size else 0.0,
+            'open_connections': connections,
+            'requests': self.requests,
+            'retries': self.retried,
+            'errors': self.errors,
+        }
+
+
+firebase = FirebaseGateway.from_settings()
@@ -0,0 +1,168 @@
+"""
+Réplica local de landing_data en SQLite con sincronización incremental.
+
+La copia que sirve ``LandingAPI.get`` se guarda en ``LANDING_MIRROR_PATH``, así
+que un worker nuevo la carga del disco sin ir a Firebase. Cada sincronización
+pide sólo las claves posteriores a la última vista
+(``orderBy="$key"&startAt=...``), en páginas de ``LANDING_SYNC_PAGE``
+registros: lo transferido es proporcional a los envíos nuevos y no al
+histórico.
+
+Las claves push llevan el instante de creación, pero un envío aceptado
+mientras Firebase estaba caído se escribe más tarde con su clave original
+(ver ``Outbox``). Por eso la sincronización retrocede ``LANDING_SYNC_LOOKBACK``
+segundos respecto a la última clave, y cada ``LANDING_FULL_SYNC_INTERVAL``
+segundos se hace una copia completa (también paginada) que recoge lo que
+quedara fuera y las bajas.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+from .pushid import push_key_prefix, push_key_time
+
+
+class LandingMirror:
+    """On-disk copy of a collection, synced by push key ranges."""
+
+    def __init__(self, path, fetch, page_size=1000, lookback=300.0, full_sync_every=86400.0, clock=time.time):
+        self.path = str(path)
+        # fetch(params) devuelve el objeto JSON de la consulta REST (o None si está vacío)
+        self.fetch = fetch
+        self.page_size = max(2, page_size)
+        self.lookback = lookback
+        self.full_sync_every = full_sync_every
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._conn = None
+        self.synced_records = 0
+        self.last_transfer = 0
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            with self._open_lock:
+                if self._conn is None:
+                    conn = sqlite3.connect(self.path, check_same_thread=False)
+                    conn.execute('PRAGMA journal_mode=WAL')
+                    conn.execute('PRAGMA synchronous=NORMAL')
+                    conn.execute('CREATE TABLE IF NOT EXISTS records (key TEXT PRIMARY KEY, data TEXT NOT NULL) WITHOUT ROWID')
+                    conn.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value) WITHOUT ROWID')
+                    self._conn = conn
+        return self._conn
+
+    def _meta(self, name):
+        row = self.conn.execute('SELECT value FROM meta WHERE name = ?', (name,)).fetchone()
+        return None if row is None else row[0]
+
+    @property
+    def last_key(self):
+        with self._lock:
+            return self._meta('last_key')
+
+    @property
+    def last_sync(self):
+        with self._lock:
+            return self._meta('last_sync')
+
+    @property
+    def last_full_sync(self):
+        with self._lock:
+            return self._meta('last_full_sync')
+
+    def load(self):
+        """Every stored record, without touching the network."""
+        with self._lock:
+            rows = self.conn.execute('SELECT key, data FROM records').fetchall()
+        return {key: json.loads(data) for key, data in rows}
+
+    def put_many(self, records):
+        """Store records written locally; the next sync confirms them."""
+        conn = self.conn
+        with self._lock, conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO records VALUES (?, ?)',
+                [(key, json.dumps(value)) for key, value in records.items()],
+            )
+
+    def resume_key(self):
+        """Key to start the next delta sync from, ``lookback`` seconds before the last one seen."""
+        last_key = self.last_key
+        ms = push_key_time(last_key)
+        if ms is None:
+            return last_key
+        return min(last_key, push_key_prefix(max(0, ms - int(self.lookback * 1000))))
+
+    def _fetch_from(self, start):
+        records = {}
+        while True:
+            params = {'orderBy': '"$key"', 'limitToFirst': self.page_size}
+            if start is not None:
+                params['startAt'] = json.dumps(start)
+            page = self.fetch(params) or {}
+            records.update(page)
+            if len(page) < self.page_size:
+                return records
+            # startAt es inclusivo: la siguiente página repite esta clave
+            start = max(page)
+
+    def sync(self, full=None):
+        """
+        Fetch what changed upstream and store it; returns ``(records, full)``.
+
+        ``records`` holds every record fetched (all of them on a full sync).
+        A full sync replaces the stored copy, so upstream deletions apply.
+        """
+        now = self.clock()
+        if full is None:
+            last_full = self.last_full_sync
+            full = last_full is None or now - last_full >= self.full_sync_every
+        records = self._fetch_from(None if full else self.resume_key())
+
+        conn = self.conn
+        with self._lock, conn:
+            if full:
+                conn.execute('DELETE FROM records')
+            conn.executemany(
+                'INSERT OR REPLACE INTO records VALUES (?, ?)',
+                [(key, json.dumps(value)) for key, value in records.items()],
+            )
+            meta = {'last_sync': now}
+            newest = max(records, default=None)
+            last_key = self._meta('last_key')
+            if newest is not None and (full or last_key is None or newest > last_key):
+                meta['last_key'] = newest
+            elif full:
+                conn.execute("DELETE FROM meta WHERE name = 'last_key'")
+            if full:
+                meta['last_full_sync'] = now
+            conn.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', meta.items())
+        self.synced_records += len(records)
+        self.last_transfer = len(records)
+        return records, full
+
+    def clear(self):
+        conn = self.conn
+        with self._lock, conn:
+            conn.execute('DELETE FROM records')
+            conn.execute('DELETE FROM meta')
+
+    def stats(self):
+        with self._lock:
+            count = self.conn.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+        return {
+            'records': count,
+            'last_key': self.last_key,
+            'last_sync': self.last_sync,
+            'last_full_sync': self.last_full_sync,
+            'last_transfer': self.last_transfer,
+            'synced_records': self.synced_records,
+        }
+
+    def close(self):
+        with self._open_lock, self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,62 @@
+"""
+Generador local de claves push con el mismo formato que Firebase.
+
+Las claves tienen 20 caracteres: 8 codifican el instante en milisegundos y 12
+son aleatorios, incrementados si se generan varias en el mismo milisegundo,
+por lo que se ordenan lexicográficamente por momento de creación. Generarlas
+aquí permite escribir con ``PUT`` en ``<colección>/<clave>``, que es
+idempotente y se puede reintentar sin duplicar el registro.
+"""
+import random
+import threading
+import time
+
+PUSH_CHARS = '-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz'
+
+_lock = threading.Lock()
+_last_time = 0
+_last_random = [0] * 12
+_rng = random.SystemRandom()
+
+
+def new_push_key(now_ms=None):
+    global _last_time
+    now = int(time.time() * 1000) if now_ms is None else now_ms
+
+    with _lock:
+        if now == _last_time:
+            # Mismo milisegundo: incrementa la parte aleatoria para mantener el orden
+            for i in range(11, -1, -1):
+                if _last_random[i] != 63:
+                    _last_random[i] += 1
+                    break
+                _last_random[i] = 0
+        else:
+            for i in range(12):
+                _last_random[i] = _rng.randrange(64)
+            _last_time = now
+        suffix = ''.join(PUSH_CHARS[n] for n in _last_random)
+
+    return push_key_prefix(now) + suffix
+
+
+def push_key_prefix(now_ms):
+    """The 8 time characters of a push key; every key created at or after ``now_ms`` sorts after it."""
+    prefix = []
+    for _ in range(8):
+        prefix.append(PUSH_CHARS[now_ms % 64])
+        now_ms //= 64
+    return ''.join(reversed(prefix))
+
+
+def push_key_time(key):
+    """Creation time in Unix milliseconds encoded in a push key, or ``None``."""
+    if not isinstance(key, str) or len(key) != 20:
+        return None
+    now = 0
+    for char in key[:8]:
+        index = PUSH_CHARS.find(char)
+        if index < 0:
+            return None
+        now = now * 64 + index
+    return now
@@ -0,0 +1,364 @@
+"""
+Protección de landing_api frente a caídas o lentitud de Firebase.
+
+- ``CircuitBreaker``: se abre tras ``failure_threshold`` fallos consecutivos
+  (las llamadas más lentas que ``latency_threshold`` cuentan como fallo) y
+  rechaza al instante hasta ``reset_timeout``; después deja pasar una sonda.
+- ``SnapshotCache``: última copia buena de ``landing_data``. Se sirve al
+  instante aunque esté vieja y se refresca en segundo plano
+  (stale-while-revalidate); con el circuito abierto es la única fuente.
+  Cada cambio de la copia se notifica a los agregados de ``analytics.py``.
+  Con ``LANDING_MIRROR_PATH`` la copia se guarda en disco y se sincroniza
+  por deltas (``mirror.py``), también cada ``LANDING_SYNC_INTERVAL``
+  segundos en segundo plano.
+- ``Outbox``: envíos aceptados mientras Firebase no responde. Se escriben
+  después con ``PUT`` en su clave push generada localmente, así que los
+  reintentos no duplican registros. La cola vive en memoria del proceso.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from backend_data_server.periodic import PeriodicTask
+
+from .analytics import aggregates
+from .gateway import GatewayError, firebase
+from .mirror import LandingMirror
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpen(GatewayError):
+    """Firebase calls are short-circuited while the breaker is open."""
+
+
+class CircuitBreaker:
+
+    def __init__(self, failure_threshold=5, latency_threshold=2.0, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self):
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._probing:
+                # Una única petición de prueba mientras está medio abierto
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self, latency):
+        if latency > self.latency_threshold:
+            self.record_failure()
+            return
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning('Firebase circuit opened after %d failures', self._failures)
+                self._state = OPEN
+                self._opened_at = self.clock()
+
+    def reset(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def call(self, func, *args, **kwargs):
+        if not self.allow():
+            raise CircuitOpen('Firebase circuit is open')
+        started = self.clock()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            # Cualquier excepción, no sólo GatewayError: si no, una sonda fallida dejaría el circuito sin probar nunca más
+            self.record_failure()
+            raise
+        self.record_success(self.clock() - started)
+        return result
+
+
+class SnapshotCache:
+    """Last good copy of a collection with background revalidation."""
+
+    def __init__(self, fetch, ttl=5.0, clock=time.monotonic, observer=None, mirror=None):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.clock = clock
+        # Recibe rebuild(data) con cada copia completa y add/remove con cada cambio local
+        self.observer = observer
+        # Con réplica en disco (mirror.py) se sincroniza por deltas en lugar de usar fetch
+        self.mirror = mirror
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._data = None
+        self._fetched_at = None
+        self._refreshing = False
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @property
+    def age(self):
+        return None if self._fetched_at is None else self.clock() - self._fetched_at
+
+    def store(self, data):
+        with self._lock:
+            self._data = data
+            self._fetched_at = self.clock()
+            if self.observer is not None:
+                self.observer.rebuild(data)
+
+    def add(self, key, value):
+        """Apply a local write so the cached snapshot stays coherent."""
+        self.add_many({key: value})
+
+    def add_many(self, records):
+        with self._lock:
+            if self._data is not None:
+                if not isinstance(self._data, dict):
+                    self._data = {}
+                for key, value in records.items():
+                    if self.observer is not None:
+                        if key in self._data:
+                            self.observer.remove(key, self._data[key])
+                        self.observer.add(key, value)
+                    self._data[key] = value
+        if self.mirror is not None:
+            self.mirror.put_many(records)
+
+    def merge(self, records):
+        """Apply records fetched by a delta sync."""
+        with self._lock:
+            if not isinstance(self._data, dict):
+                self._data = {}
+            for key, value in records.items():
+                if self.observer is not None:
+                    if key in self._data:
+                        self.observer.remove(key, self._data[key])
+                    self.observer.add(key, value)
+                self._data[key] = value
+            self._fetched_at = self.clock()
+
+    def load_local(self):
+        """Load the on-disk mirror, aged by the time since its last sync."""
+        data = self.mirror.load()
+        last_sync = self.mirror.last_sync
+        with self._lock:
+            self._data = data
+            if last_sync is not None:
+                self._fetched_at = self.clock() - max(0.0, time.time() - last_sync)
+            if self.observer is not None:
+                self.observer.rebuild(data)
+
+    def refresh(self):
+        if self.mirror is None:
+            data = self.fetch()
+            self.store(data)
+            return data
+        with self._sync_lock:
+            if self._data is None:
+                self.load_local()
+            records, full = self.mirror.sync()
+            if full:
+                self.store(records)
+            else:
+                self.merge(records)
+            return self._data
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except GatewayError as exc:
+                logger.info('Background refresh of landing snapshot failed: %s', exc)
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name='landing-snapshot-refresh', daemon=True).start()
+
+    def get(self):
+        """
+        Return ``(data, state)`` where state is ``fresh``, ``stale`` or ``miss``.
+
+        A miss fetches synchronously and propagates ``GatewayError`` unless
+        the on-disk mirror has a previous copy, which is served as stale.
+        """
+        with self._lock:
+            data, fetched_at = self._data, self._fetched_at
+        if fetched_at is None:
+            self.misses += 1
+            try:
+                return self.refresh(), 'miss'
+            except GatewayError:
+                with self._lock:
+                    data, fetched_at = self._data, self._fetched_at
+                if fetched_at is None:
+                    raise
+                return data, 'stale'
+        if self.clock() - fetched_at <= self.ttl:
+            self.hits += 1
+            return data, 'fresh'
+        self.stale_hits += 1
+        self._refresh_in_background()
+        return data, 'stale'
+
+    def clear(self):
+        with self._lock:
+            self._data = None
+            self._fetched_at = None
+            if self.observer is not None:
+                self.observer.rebuild(None)
+        if self.mirror is not None:
+            self.mirror.clear()
+
+
+class Outbox:
+    """Bounded queue of writes replayed once Firebase is reachable again."""
+
+    def __init__(self, write, breaker, max_items=1000, retry_interval=5.0):
+        self.write = write
+        self.breaker = breaker
+        self.max_items = max_items
+        self.retry_interval = retry_interval
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._draining = False
+
+    def __len__(self):
+        return len(self._items)
+
+    def enqueue(self, key, data):
+        """Queue ``data`` under ``key``; returns False when the outbox is full."""
+        return self.enqueue_many({key: data})
+
+    def enqueue_many(self, items):
+        """Queue every item or none of them; returns False when they do not fit."""
+        with self._lock:
+            if len(self._items) + len(items) > self.max_items:
+                return False
+            self._items.update(items)
+        self._start_drain()
+        return True
+
+    def drain(self):
+        """Write queued items in order until the queue empties or a write fails."""
+        while True:
+            with self._lock:
+                if not self._items:
+                    return True
+                key, data = next(iter(self._items.items()))
+            try:
+                self.breaker.call(self.write, key, data)
+            except GatewayError:
+                return False
+            except Exception:
+                # Cualquier otro error también espera a retry_interval: el hilo no debe morir y relanzarse sin pausa
+                logger.exception('Outbox write for %s failed', key)
+                return False
+            with self._lock:
+                self._items.pop(key, None)
+
+    def _start_drain(self):
+        with self._lock:
+            if self._draining:
+                return
+            self._draining = True
+
+        def run():
+            try:
+                while not self.drain():
+                    time.sleep(self.retry_interval)
+            finally:
+                with self._lock:
+                    self._draining = False
+                if self._items:
+                    self._start_drain()
+
+        threading.Thread(target=run, name='landing-outbox-drain', daemon=True).start()
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+COLLECTION = 'landing_data'
+
+breaker = CircuitBreaker(
+    failure_threshold=getattr(settings, 'LANDING_BREAKER_FAILURES', 5),
+    latency_threshold=getattr(settings, 'LANDING_BREAKER_LATENCY', 2.0),
+    reset_timeout=getattr(settings, 'LANDING_BREAKER_RESET', 30.0),
+)
+mirror = LandingMirror(
+    settings.LANDING_MIRROR_PATH,
+    lambda params: breaker.call(firebase.get, COLLECTION, params=params),
+    page_size=getattr(settings, 'LANDING_SYNC_PAGE', 1000),
+    lookback=getattr(settings, 'LANDING_SYNC_LOOKBACK', 300.0),
+    full_sync_every=getattr(settings, 'LANDING_FULL_SYNC_INTERVAL', 86400.0),
+) if getattr(settings, 'LANDING_MIRROR_PATH', None) else None
+snapshot = SnapshotCache(
+    lambda: breaker.call(firebase.get, COLLECTION),
+    ttl=getattr(settings, 'LANDING_CACHE_TTL', 5.0),
+    observer=aggregates,
+    mirror=mirror,
+)
+outbox = Outbox(
+    lambda key, data: firebase.set(f'{COLLECTION}/{key}', data),
+    breaker,
+    max_items=getattr(settings, 'LANDING_OUTBOX_SIZE', 1000),
+)
+
+
+def sync_snapshot():
+    """Background sync of the landing copy; a Firebase failure is reported, not raised."""
+    started = time.perf_counter()
+    try:
+        snapshot.refresh()
+    except GatewayError as exc:
+        return {'ok': False, 'error': str(exc)}
+    return {
+        'ok': True,
+        'fetched': mirror.last_transfer if mirror is not None else None,
+        'ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+syncer = PeriodicTask(getattr(settings, 'LANDING_SYNC_INTERVAL', 30), sync_snapshot, 'landing-sync')
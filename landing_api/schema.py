@@ -0,0 +1,44 @@
+"""
+Validación de los envíos de landing_api antes de escribirlos en Firebase.
+
+Un envío es un objeto plano: como mucho ``LANDING_MAX_FIELDS`` campos, con
+nombres válidos como clave de Firebase y valores escalares (los textos de
+hasta ``LANDING_MAX_VALUE_LENGTH`` caracteres). Sólo se admiten los campos de
+``LANDING_ALLOWED_FIELDS`` (nombre, email, etc. por defecto); con ``None`` vale
+cualquier nombre. ``timestamp`` lo pone el servidor.
+"""
+import re
+
+from django.conf import settings
+
+FIELD_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_-]{0,63}$')
+SERVER_FIELDS = frozenset(('timestamp',))
+
+UNKNOWN = 'Unknown field.'
+NOT_OBJECT = 'Expected a JSON object.'
+
+
+def clean_submission(data):
+    """Return ``(cleaned, errors)``; ``errors`` is an empty dict on success."""
+    if not hasattr(data, 'items'):
+        return None, {'non_field_errors': [NOT_OBJECT]}
+    allowed = getattr(settings, 'LANDING_ALLOWED_FIELDS', None)
+    max_fields = getattr(settings, 'LANDING_MAX_FIELDS', 30)
+    max_length = getattr(settings, 'LANDING_MAX_VALUE_LENGTH', 2000)
+
+    if len(data) > max_fields:
+        return None, {'non_field_errors': [f'At most {max_fields} fields per submission.']}
+    cleaned = {}
+    errors = {}
+    for key, value in data.items():
+        if key in SERVER_FIELDS:
+            continue
+        if not FIELD_NAME.match(key) or (allowed is not None and key not in allowed):
+            errors[key] = [UNKNOWN]
+        elif value is not None and not isinstance(value, (str, int, float, bool)):
+            errors[key] = ['Must be a string, number or boolean.']
+        elif isinstance(value, str) and len(value) > max_length:
+            errors[key] = [f'Ensure this field has no more than {max_length} characters.']
+        else:
+            cleaned[key] = value
+    return cleaned, errors
@@ -1,3 +1,630 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from unittest import mock
+import asyncio
+import os
+import tempfile
 
-# Create your tests here.
\ No newline at end of file
+
+def isolate_mirror():
+    """
+    Point the shared snapshot at a throwaway mirror while tests run.
+
+    With ``LANDING_MIRROR_PATH`` set, the tests' ``snapshot.clear()`` and
+    POSTs would otherwise empty or write the configured file. Returns the
+    function that restores it.
+    """
+    from landing_api import resilience
+    from landing_api.mirror import LandingMirror
+
+    original = resilience.snapshot.mirror
+    if original is None:
+        return lambda: None
+    directory = tempfile.TemporaryDirectory()
+    temporary = LandingMirror(
+        os.path.join(directory.name, 'mirror.sqlite3'), original.fetch, page_size=original.page_size,
+        lookback=original.lookback, full_sync_every=original.full_sync_every,
+    )
+    resilience.mirror = resilience.snapshot.mirror = temporary
+
+    def restore():
+        temporary.close()
+        resilience.mirror = resilience.snapshot.mirror = original
+        directory.cleanup()
+
+    return restore
+
+
+def stub_credentials():
+    """
+    Give the shared gateway a fixed token instead of the service-account key.
+
+    The key in ``FIREBASE_CREDENTIALS_PATH`` is not part of the repository, so
+    the tests must never load it. Returns the function that restores it.
+    """
+    from landing_api.gateway import firebase
+
+    original = firebase.token_provider
+    firebase.token_provider = lambda: ('test-token', 4102444800)
+
+    def restore():
+        firebase.token_provider = original
+
+    return restore
+
+
+def setUpModule():
+    global restore_mirror, restore_credentials
+    restore_credentials = stub_credentials()
+    restore_mirror = isolate_mirror()
+
+
+def tearDownModule():
+    restore_mirror()
+    restore_credentials()
+
+
+class SubmissionBrokerTestCase(TestCase):
+    
+    def setUp(self):
+        from landing_api.broker import SubmissionBroker
+        self.broker = SubmissionBroker(max_events=3)
+    
+    def test_after_returns_events_newer_than_last_id(self):
+        """Test resuming from a push key returns only later submissions"""
+        for key in ('-A', '-B', '-C'):
+            self.broker.publish(key, {'key': key})
+        
+        events, missed = self.broker.after('-A')
+        
+        self.assertEqual([e['id'] for e in events], ['-B', '-C'])
+        self.assertFalse(missed)
+    
+    def test_after_flags_evicted_submissions(self):
+        """Test a last id older than the buffer reports a gap"""
+        for key in ('-A', '-B', '-C', '-D', '-E'):
+            self.broker.publish(key, {})
+        
+        events, missed = self.broker.after('-A')
+        
+        self.assertEqual([e['id'] for e in events], ['-C', '-D', '-E'])
+        self.assertTrue(missed)
+    
+    def test_async_subscriber_is_woken_by_publish(self):
+        """Test an ASGI subscriber receives a submission published from another thread"""
+        async def scenario():
+            waiter = asyncio.ensure_future(self.broker.wait_async('', timeout=1))
+            await asyncio.sleep(0)
+            await asyncio.get_running_loop().run_in_executor(None, self.broker.publish, '-A', {'n': 1})
+            return await waiter
+        
+        events, _ = asyncio.run(scenario())
+        
+        self.assertEqual(events[0]['data'], {'n': 1})
+
+
+class LandingStreamTestCase(APITestCase):
+    
+    def setUp(self):
+        from landing_api.broker import submission_broker
+        submission_broker.clear()
+    
+    @mock.patch('landing_api.views.new_push_key', return_value='-NewKey')
+    @mock.patch('landing_api.views.firebase')
+    def test_post_publishes_to_stream(self, mock_firebase, mock_key):
+        """Test an accepted submission is pushed to SSE clients resuming from Last-Event-ID"""
+        
+        response = self.client.post('/landing/api/index/', {'email': 'lead@example.com'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        stream = self.client.get('/landing/api/index/stream/', HTTP_LAST_EVENT_ID='-0')
+        
+        self.assertEqual(stream['Content-Type'], 'text/event-stream')
+        frames = iter(stream.streaming_content)
+        next(frames)  # retry
+        frame = next(frames).decode()
+        self.assertIn('id: -NewKey', frame)
+        self.assertIn('event: submission', frame)
+        self.assertIn('lead@example.com', frame)
+        stream.close()
+
+
+class FirebaseGatewayTestCase(TestCase):
+    
+    def make_gateway(self, handler, **kwargs):
+        import httpx
+        from landing_api.gateway import FirebaseGateway
+        kwargs.setdefault('backoff', 0)
+        gateway = FirebaseGateway(
+            'https://example.firebaseio.com/',
+            transport=httpx.MockTransport(handler),
+            token_provider=lambda: ('token', 4102444800),
+            **kwargs
+        )
+        self.addCleanup(gateway.close)
+        return gateway
+    
+    def test_push_returns_generated_key(self):
+        """Test push posts JSON with the bearer token and returns the key"""
+        import httpx
+        seen = {}
+        
+        def handler(request):
+            seen['request'] = request
+            return httpx.Response(200, json={'name': '-Key1'})
+        
+        gateway = self.make_gateway(handler)
+        
+        self.assertEqual(gateway.push('landing_data', {'email': 'a@example.com'}), '-Key1')
+        self.assertEqual(seen['request'].url.path, '/landing_data.json')
+        self.assertEqual(seen['request'].headers['Authorization'], 'Bearer token')
+    
+    def test_get_retries_server_errors(self):
+        """Test idempotent reads are retried on 5xx"""
+        import httpx
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            if len(calls) < 3:
+                return httpx.Response(503)
+            return httpx.Response(200, json={'-A': {}})
+        
+        gateway = self.make_gateway(handler, retries=2)
+        
+        self.assertEqual(gateway.get('landing_data'), {'-A': {}})
+        self.assertEqual(gateway.stats()['retries'], 2)
+    
+    def test_push_is_not_retried_after_send(self):
+        """Test a POST that may have reached Firebase is not repeated"""
+        import httpx
+        from landing_api.gateway import GatewayTimeout
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            raise httpx.ReadTimeout('slow', request=request)
+        
+        gateway = self.make_gateway(handler, retries=3)
+        
+        with self.assertRaises(GatewayTimeout):
+            gateway.push('landing_data', {})
+        self.assertEqual(len(calls), 1)
+    
+    def test_stats_report_pool_usage(self):
+        import httpx
+        gateway = self.make_gateway(lambda request: httpx.Response(200, content=b'null'), pool_size=4)
+        gateway.get('landing_data')
+        
+        stats = gateway.stats()
+        
+        self.assertEqual(stats['pool_size'], 4)
+        self.assertEqual(stats['in_flight'], 0)
+        self.assertEqual(stats['peak_in_flight'], 1)
+        self.assertEqual(stats['requests'], 1)
+
+
+class LandingApiTestCase(APITestCase):
+    
+    def setUp(self):
+        from landing_api.resilience import breaker, outbox, snapshot
+        for component in (snapshot, outbox):
+            component.clear()
+            self.addCleanup(component.clear)
+        breaker.reset()
+        self.addCleanup(breaker.reset)
+    
+    @mock.patch('landing_api.resilience.firebase')
+    def test_get_upstream_timeout_returns_504(self, mock_firebase):
+        """Test a Firebase timeout is reported as 504 instead of hanging the worker"""
+        from landing_api.gateway import GatewayTimeout
+        mock_firebase.get.side_effect = GatewayTimeout('Firebase timed out')
+        
+        response = self.client.get('/landing/api/index/')
+        
+        self.assertEqual(response.status_code, status.HTTP_504_GATEWAY_TIMEOUT)
+        self.assertEqual(response.data['status'], 'error')
+    
+    @mock.patch('landing_api.resilience.firebase')
+    def test_get_serves_stale_snapshot_while_circuit_is_open(self, mock_firebase):
+        """Test the last good landing_data is served when Firebase is short-circuited"""
+        from landing_api.resilience import breaker, snapshot
+        snapshot.store({'-A': {'email': 'a@example.com'}})
+        snapshot._fetched_at -= 3600
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        
+        response = self.client.get('/landing/api/index/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Cache'], 'stale')
+        self.assertEqual(response.data, {'-A': {'email': 'a@example.com'}})
+    
+    @mock.patch('landing_api.resilience.Outbox._start_drain')
+    @mock.patch('landing_api.views.firebase')
+    def test_post_is_queued_while_circuit_is_open(self, mock_firebase, mock_drain):
+        """Test submissions are accepted locally and not sent while the circuit is open"""
+        from landing_api.resilience import breaker, outbox
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        
+        response = self.client.post('/landing/api/index/', {'email': 'lead@example.com'}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(response.data['queued'])
+        self.assertEqual(len(outbox), 1)
+        mock_firebase.set.assert_not_called()
+
+
+class CircuitBreakerTestCase(TestCase):
+    
+    def setUp(self):
+        from landing_api.resilience import CircuitBreaker
+        self.now = 0.0
+        self.breaker = CircuitBreaker(failure_threshold=2, latency_threshold=1.0, reset_timeout=10, clock=lambda: self.now)
+    
+    def test_opens_after_threshold_and_probes_after_timeout(self):
+        from landing_api.resilience import OPEN, HALF_OPEN, CLOSED
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+        
+        self.now = 10
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())  # only one probe at a time
+        
+        self.breaker.record_success(0.1)
+        self.assertEqual(self.breaker.state, CLOSED)
+    
+    def test_probe_raising_another_exception_reopens_the_circuit(self):
+        """Test a half-open probe that fails with a non-gateway error does not leave the breaker stuck"""
+        from landing_api.resilience import OPEN, CLOSED
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.now = 10
+        
+        def broken():
+            raise ValueError('Expecting value: line 1 column 1')
+        
+        with self.assertRaises(ValueError):
+            self.breaker.call(broken)
+        self.assertEqual(self.breaker.state, OPEN)
+        
+        self.now = 20
+        self.assertEqual(self.breaker.call(lambda: 'ok'), 'ok')
+        self.assertEqual(self.breaker.state, CLOSED)
+    
+    def test_slow_calls_count_as_failures(self):
+        from landing_api.resilience import OPEN
+        self.breaker.record_success(5.0)
+        self.breaker.record_success(5.0)
+        
+        self.assertEqual(self.breaker.state, OPEN)
+
+
+class OutboxTestCase(TestCase):
+    
+    def test_drain_writes_in_order_and_stops_on_failure(self):
+        from landing_api.gateway import GatewayError
+        from landing_api.resilience import CircuitBreaker, Outbox
+        written = []
+        fail = {'on': '-B'}
+        
+        def write(key, data):
+            if key == fail['on']:
+                raise GatewayError('down')
+            written.append(key)
+        
+        outbox = Outbox(write, CircuitBreaker(failure_threshold=100))
+        with mock.patch.object(Outbox, '_start_drain'):
+            for key in ('-A', '-B', '-C'):
+                outbox.enqueue(key, {})
+        
+        self.assertFalse(outbox.drain())
+        self.assertEqual(written, ['-A'])
+        fail['on'] = None
+        self.assertTrue(outbox.drain())
+        self.assertEqual(written, ['-A', '-B', '-C'])
+        self.assertEqual(len(outbox), 0)
+    
+    def test_unexpected_write_error_waits_for_the_retry_interval(self):
+        """Test a non-gateway error keeps the item queued and the drain thread backs off instead of respawning"""
+        import threading
+        import time
+        from landing_api.resilience import CircuitBreaker, Outbox
+        attempts = []
+        done = threading.Event()
+        
+        def write(key, data):
+            attempts.append(key)
+            if len(attempts) == 1:
+                raise TypeError('bad data')
+            done.set()
+        
+        outbox = Outbox(write, CircuitBreaker(failure_threshold=100), retry_interval=0.05)
+        with self.assertLogs('landing_api.resilience', 'ERROR'):
+            outbox.enqueue('-A', {})
+            self.assertTrue(done.wait(2))
+        
+        deadline = time.monotonic() + 2
+        while len(outbox) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(attempts, ['-A', '-A'])
+        self.assertEqual(len(outbox), 0)
+
+
+class PushKeyTestCase(TestCase):
+    
+    def test_keys_sort_by_creation(self):
+        from landing_api.pushid import new_push_key
+        keys = [new_push_key(now_ms=1700000000000) for _ in range(50)] + [new_push_key(now_ms=1700000000001)]
+        
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(set(keys)), len(keys))
+        self.assertTrue(all(len(key) == 20 for key in keys))
+
+
+class LandingAggregateTestCase(APITestCase):
+    
+    def setUp(self):
+        from landing_api.resilience import snapshot
+        snapshot.clear()
+        self.addCleanup(snapshot.clear)
+    
+    def test_counts_per_bucket_and_field_value(self):
+        """Test day/hour buckets come from the push key and field values are counted"""
+        from landing_api.pushid import new_push_key
+        from landing_api.resilience import snapshot
+        day_one = 1700000000000  # 2023-11-14T22:13 UTC
+        snapshot.store({
+            new_push_key(now_ms=day_one): {'source': 'ads', 'timestamp': 'x'},
+            new_push_key(now_ms=day_one + 60000): {'source': 'mail'},
+            new_push_key(now_ms=day_one + 7200000): {'source': 'ads'},
+            '-legacy': {'source': 'ads'},
+        })
+        
+        response = self.client.get('/landing/api/index/aggregate/', {'field': ['source', 'missing']})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Cache'], 'fresh')
+        self.assertEqual(response.data['total'], 4)
+        self.assertEqual(response.data['undated'], 1)
+        self.assertEqual(response.data['counts'], {'2023-11-14': 2, '2023-11-15': 1})
+        self.assertEqual(response.data['fields']['source'], {'values': {'ads': 3, 'mail': 1}, 'other': 0})
+        self.assertEqual(response.data['fields']['missing'], {'values': {}, 'other': 0})
+        
+        hourly = self.client.get('/landing/api/index/aggregate/', {'bucket': 'hour', 'since': '2023-11-15'})
+        self.assertEqual(hourly.data['counts'], {'2023-11-15T00:00': 1})
+        self.assertEqual(
+            self.client.get('/landing/api/index/aggregate/', {'bucket': 'week'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+    
+    @mock.patch('landing_api.views.new_push_key', return_value='-NewKey')
+    @mock.patch('landing_api.views.firebase')
+    def test_post_updates_aggregates_without_refetching(self, mock_firebase, mock_key):
+        """Test an accepted submission is counted from the local copy"""
+        from landing_api.resilience import snapshot
+        snapshot.store({})
+        
+        self.client.post('/landing/api/index/', {'source': 'ads'}, format='json')
+        response = self.client.get('/landing/api/index/aggregate/', {'field': 'source'})
+        
+        self.assertEqual(response.data['total'], 1)
+        self.assertEqual(response.data['fields']['source']['values'], {'ads': 1})
+        mock_firebase.get.assert_not_called()
+    
+    def test_distinct_values_are_bounded(self):
+        from landing_api.analytics import SubmissionAggregates
+        aggregates = SubmissionAggregates(max_fields=1, max_values=2)
+        aggregates.rebuild({f'-{i}': {'email': f'{i}@example.com', 'other_field': 1} for i in range(5)})
+        
+        summary = aggregates.summary(fields=['email', 'other_field'])
+        
+        self.assertEqual(len(summary['fields']['email']['values']), 2)
+        self.assertEqual(summary['fields']['email']['other'], 3)
+        self.assertEqual(summary['fields']['other_field']['values'], {})
+
+
+class LandingMirrorTestCase(TestCase):
+    
+    def setUp(self):
+        import json
+        import os
+        import tempfile
+        from landing_api.mirror import LandingMirror
+        from landing_api.pushid import new_push_key
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'mirror.sqlite3')
+        self.remote = {new_push_key(now_ms=1700000000000 + i * 1000): {'n': i} for i in range(5)}
+        self.queries = []
+        
+        def fetch(params):
+            # Consulta REST de Firebase: orderBy="$key", startAt inclusivo, limitToFirst
+            self.queries.append(params)
+            keys = sorted(self.remote)
+            if 'startAt' in params:
+                keys = [key for key in keys if key >= json.loads(params['startAt'])]
+            return {key: self.remote[key] for key in keys[:params['limitToFirst']]} or None
+        
+        self.now = 1700000100.0
+        self.make_mirror = lambda: LandingMirror(
+            self.path, fetch, page_size=3, lookback=1.5, full_sync_every=3600, clock=lambda: self.now
+        )
+        self.mirror = self.make_mirror()
+        self.addCleanup(self.mirror.close)
+    
+    def test_first_sync_pages_through_the_collection(self):
+        """Test a full sync fetches every record in key pages and persists them"""
+        records, full = self.mirror.sync()
+        
+        self.assertTrue(full)
+        self.assertEqual(records, self.remote)
+        self.assertEqual(len(self.queries), 3)
+        self.assertEqual(self.mirror.last_key, max(self.remote))
+        
+        reopened = self.make_mirror()
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.load(), self.remote)
+    
+    def test_delta_sync_only_fetches_recent_keys(self):
+        """Test later syncs start shortly before the last key instead of downloading everything"""
+        import json
+        from landing_api.pushid import new_push_key, push_key_prefix
+        self.mirror.sync()
+        self.queries.clear()
+        new_key = new_push_key(now_ms=1700000010000)
+        self.remote[new_key] = {'n': 10}
+        self.now += 60
+        
+        records, full = self.mirror.sync()
+        
+        self.assertFalse(full)
+        self.assertEqual(len(self.queries), 2)
+        self.assertEqual(json.loads(self.queries[0]['startAt']), push_key_prefix(1700000002500))
+        self.assertEqual(set(records), set(sorted(self.remote)[-3:]))
+        self.assertEqual(self.mirror.last_key, new_key)
+        self.assertEqual(self.mirror.load(), self.remote)
+    
+    def test_periodic_full_sync_applies_deletions(self):
+        self.mirror.sync()
+        del self.remote[min(self.remote)]
+        self.now += 3600
+        
+        _, full = self.mirror.sync()
+        
+        self.assertTrue(full)
+        self.assertEqual(self.mirror.load(), self.remote)
+    
+    def test_snapshot_serves_mirror_when_firebase_is_down(self):
+        """Test a new worker answers from the on-disk copy if the first sync fails"""
+        from landing_api.gateway import GatewayError
+        from landing_api.resilience import SnapshotCache
+        self.mirror.sync()
+        self.remote = None
+        
+        def down(params):
+            raise GatewayError('down')
+        
+        self.mirror.fetch = down
+        snapshot = SnapshotCache(None, ttl=5, mirror=self.mirror)
+        
+        data, state = snapshot.get()
+        
+        self.assertEqual(state, 'stale')
+        self.assertEqual(len(data), 5)
+
+
+class LandingBatchTestCase(APITestCase):
+    
+    def setUp(self):
+        from landing_api.broker import submission_broker
+        from landing_api.resilience import breaker, outbox, snapshot
+        for component in (snapshot, outbox, submission_broker):
+            component.clear()
+            self.addCleanup(component.clear)
+        breaker.reset()
+        self.addCleanup(breaker.reset)
+    
+    @mock.patch('landing_api.views.firebase')
+    def test_batch_is_written_with_one_multi_path_update(self, mock_firebase):
+        """Test every submission gets a local key and one timestamp in a single PATCH"""
+        from landing_api.broker import submission_broker
+        from landing_api.resilience import snapshot
+        snapshot.store({})
+        leads = [{'email': f'lead{i}@example.com'} for i in range(3)]
+        
+        response = self.client.post('/landing/api/index/batch/', leads, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        ids = response.data['ids']
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(ids, sorted(ids))
+        mock_firebase.update.assert_called_once()
+        path, records = mock_firebase.update.call_args.args
+        self.assertEqual(path, 'landing_data')
+        self.assertEqual(list(records), ids)
+        self.assertEqual(len({record['timestamp'] for record in records.values()}), 1)
+        self.assertEqual(records[ids[1]]['email'], 'lead1@example.com')
+        self.assertEqual(set(snapshot.get()[0]), set(ids))
+        self.assertEqual(submission_broker.last_id, ids[-1])
+    
+    @mock.patch('landing_api.resilience.Outbox._start_drain')
+    @mock.patch('landing_api.views.firebase')
+    def test_batch_is_queued_as_a_whole_while_circuit_is_open(self, mock_firebase, mock_drain):
+        from landing_api.resilience import breaker, outbox
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        
+        response = self.client.post('/landing/api/index/batch/', [{'name': 'A'}, {'name': 'B'}], format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(response.data['queued'])
+        self.assertEqual(len(outbox), 2)
+        mock_firebase.update.assert_not_called()
+    
+    @mock.patch('landing_api.views.firebase')
+    def test_invalid_batches_are_rejected(self, mock_firebase):
+        for body in ({'email': 'a@example.com'}, [], [{'n': 1}, 'x'], [{}] * 501):
+            response = self.client.post('/landing/api/index/batch/', body, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_firebase.update.assert_not_called()
+
+
+class LandingSubmissionValidationTestCase(APITestCase):
+    
+    def setUp(self):
+        from landing_api.resilience import snapshot
+        snapshot.clear()
+        self.addCleanup(snapshot.clear)
+    
+    @mock.patch('landing_api.views.firebase')
+    def test_only_flat_bounded_fields_are_written(self, mock_firebase):
+        """Test nested values, bad field names and long strings are rejected before Firebase"""
+        body = {'email': 'a@example.com', 'meta': {'x': 1}, 'bad.key': 1, 'note': 'x' * 3000}
+        
+        response = self.client.post('/landing/api/index/', body, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data['errors']), {'meta', 'bad.key', 'note'})
+        mock_firebase.set.assert_not_called()
+    
+    @mock.patch('landing_api.views.firebase')
+    def test_unlisted_fields_are_rejected_by_default(self, mock_firebase):
+        """Test the shipped whitelist keeps arbitrary client keys out of Firebase"""
+        response = self.client.post(
+            '/landing/api/index/batch/', [{'email': 'a@example.com', 'source': 'ads'}, {'is_admin': True}], format='json'
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['errors'], {'1': {'is_admin': ['Unknown field.']}})
+        mock_firebase.update.assert_not_called()
+    
+    @override_settings(LANDING_ALLOWED_FIELDS=('email', 'name'))
+    @mock.patch('landing_api.views.firebase')
+    def test_allowed_fields_whitelist(self, mock_firebase):
+        rejected = self.client.post('/landing/api/index/', {'email': 'a@example.com', 'admin': True}, format='json')
+        accepted = self.client.post(
+            '/landing/api/index/', {'email': 'a@example.com', 'timestamp': 'client'}, format='json'
+        )
+        
+        self.assertEqual(rejected.data['errors'], {'admin': ['Unknown field.']})
+        self.assertEqual(accepted.status_code, status.HTTP_201_CREATED)
+        payload = mock_firebase.set.call_args.args[1]
+        self.assertEqual(set(payload), {'email', 'timestamp'})
+        self.assertNotEqual(payload['timestamp'], 'client')
+    
+    @mock.patch('landing_api.views.firebase')
+    def test_batch_errors_are_reported_by_position(self, mock_firebase):
+        response = self.client.post(
+            '/landing/api/index/batch/', [{'email': 'a@example.com'}, {'nested': [1]}], format='json'
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.json()['errors']), ['1'])
+        mock_firebase.update.assert_not_called()
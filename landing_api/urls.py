@@ -1,6 +1,9 @@
 from django.urls import path
-from .views import LandingAPI
+from .views import LandingAggregate, LandingAPI, LandingBatchAPI, LandingStream
 
 urlpatterns = [
     path('index/', LandingAPI.as_view(), name='landing-api-index'),
-]
\ No newline at end of file
+    path('index/batch/', LandingBatchAPI.as_view(), name='landing-api-batch'),
+    path('index/aggregate/', LandingAggregate.as_view(), name='landing-api-aggregate'),
+    path('index/stream/', LandingStream.as_view(), name='landing-api-stream'),
+]
@@ -1,31 +1,216 @@
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from firebase_admin import db
+from rest_framework.exceptions import ParseError
 from datetime import datetime
+import re
+
+from backend_data_server.streamjson import JSONArrayStreamParser
+from backend_data_server.sse import EventStreamRenderer, stream_headers
+
+from .analytics import aggregates
+from .broker import astream_submissions, stream_submissions, submission_broker
+from .gateway import GatewayError, GatewayTimeout, firebase
+from .pushid import new_push_key
+from .resilience import COLLECTION, CircuitOpen, breaker, outbox, snapshot
+from .schema import clean_submission
+
+
+# Prefijo de una etiqueta de tramo: 2024, 2024-05, 2024-05-17 o 2024-05-17T09
+BUCKET_LABEL = re.compile(r'^\d{4}(-\d{2}(-\d{2}(T\d{2}(:00)?)?)?)?$')
+
+
+def submission_timestamp():
+    current_time  = datetime.now()
+    return current_time.strftime("%d/%m/%Y, %I:%M:%S %p").lower().replace('am', 'a. m.').replace('pm', 'p. m.')
+
+
+def bad_request(message):
+    return Response({'status': 'error', 'message': message}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def validation_error(errors):
+    return Response(
+        {'status': 'error', 'message': 'Validation failed', 'errors': errors},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
+def upstream_error(exc):
+    if isinstance(exc, CircuitOpen):
+        code = status.HTTP_503_SERVICE_UNAVAILABLE
+    elif isinstance(exc, GatewayTimeout):
+        code = status.HTTP_504_GATEWAY_TIMEOUT
+    else:
+        code = status.HTTP_502_BAD_GATEWAY
+    return Response({'status': 'error', 'message': str(exc)}, status=code)
+
 
 class LandingAPI(APIView):
     name = "Landing API"
-    collection_name = "landing_data"  # Puedes cambiar el nombre según tu necesidad
+    collection_name = COLLECTION  # Puedes cambiar el nombre en landing_api/resilience.py
 
     def get(self, request):
-        ref = db.reference(self.collection_name)
-        data = ref.get()
-        return Response(data, status=status.HTTP_200_OK)
+        # Copia local: se sirve al instante y se revalida en segundo plano
+        try:
+            data, cache_state = snapshot.get()
+        except GatewayError as exc:
+            return upstream_error(exc)
+        response = Response(data, status=status.HTTP_200_OK)
+        response['X-Cache'] = cache_state
+        if snapshot.age is not None:
+            response['Age'] = str(int(snapshot.age))
+        return response
 
     def post(self, request):
 
-        data = request.data
+        # Sólo campos admitidos y valores escalares acotados (ver landing_api/schema.py)
+        data, errors = clean_submission(request.data)
+        if errors:
+            return validation_error(errors)
 
-        # Referencia a la colección
-        ref = db.reference(f'{self.collection_name}')
+        data.update({"timestamp": submission_timestamp()})
 
-        current_time  = datetime.now()
-        custom_format = current_time.strftime("%d/%m/%Y, %I:%M:%S %p").lower().replace('am', 'a. m.').replace('pm', 'p. m.')
-        data.update({"timestamp": custom_format })
+        # Clave push generada localmente: el PUT es idempotente y se puede reintentar
+        key = new_push_key()
+        payload = dict(data)
+        try:
+            breaker.call(firebase.set, f'{self.collection_name}/{key}', payload)
+            body, code = {"id": key}, status.HTTP_201_CREATED
+        except GatewayError as exc:
+            # Firebase no disponible: se guarda en la cola local y se escribe después
+            if not outbox.enqueue(key, payload):
+                return upstream_error(exc)
+            body, code = {"id": key, "queued": True}, status.HTTP_202_ACCEPTED
 
-        # push: Guarda el objeto en la colección
-        new_resource = ref.push(data)
+        snapshot.add(key, payload)
+
+        # Notifica a los clientes conectados al stream
+        submission_broker.publish(key, payload)
 
         # Devuelve el id del objeto guardado
-        return Response({"id": new_resource.key}, status=status.HTTP_201_CREATED)
\ No newline at end of file
+        return Response(body, status=code)
+
+
+class LandingBatchAPI(APIView):
+    """
+    Alta de varios envíos en una sola petición.
+
+    Recibe una lista de objetos (como mucho ``LANDING_BATCH_MAX``), genera sus
+    claves push en local, les pone la misma marca de tiempo y los escribe en
+    Firebase con una única actualización multi-ruta (``PATCH`` sobre la
+    colección). Devuelve las claves en el orden recibido. Si Firebase no
+    responde, el lote entero pasa a la cola local o se rechaza entero.
+
+    El cuerpo se lee elemento a elemento y se deja de leer en cuanto sobra
+    uno o hay un JSON mal formado. Los errores de validación se devuelven por
+    posición y no se escribe ningún envío.
+    """
+    name = "Landing Batch API"
+    collection_name = COLLECTION
+    parser_classes = [JSONArrayStreamParser]
+
+    def post(self, request):
+        limit = getattr(settings, 'LANDING_BATCH_MAX', 500)
+        submissions = []
+        errors = {}
+        try:
+            if isinstance(request.data, dict):
+                raise ParseError('Expected a JSON array.')
+            for index, item in enumerate(request.data):
+                if index >= limit:
+                    return bad_request(f'At most {limit} submissions per batch')
+                cleaned, item_errors = clean_submission(item)
+                if item_errors:
+                    errors[index] = item_errors
+                else:
+                    submissions.append(cleaned)
+        except ParseError as exc:
+            return bad_request(str(exc.detail))
+        if errors:
+            return validation_error(errors)
+        if not submissions:
+            return bad_request('Expected a non-empty JSON array of submissions')
+
+        timestamp = submission_timestamp()
+        records = {new_push_key(): dict(item, timestamp=timestamp) for item in submissions}
+        try:
+            # Una sola ida y vuelta: PATCH con cada clave como ruta hija
+            breaker.call(firebase.update, self.collection_name, records)
+            body, code = {'ids': list(records), 'count': len(records)}, status.HTTP_201_CREATED
+        except GatewayError as exc:
+            if not outbox.enqueue_many(records):
+                return upstream_error(exc)
+            body, code = {'ids': list(records), 'count': len(records), 'queued': True}, status.HTTP_202_ACCEPTED
+
+        snapshot.add_many(records)
+        for key, payload in records.items():
+            submission_broker.publish(key, payload)
+        return Response(body, status=code)
+
+
+class LandingAggregate(APIView):
+    """
+    Conteos de envíos precalculados en el servidor.
+
+    ``?bucket=day|hour`` elige el tramo, ``?since=`` y ``?until=`` lo
+    acotan (prefijos de la etiqueta, inclusivos) y cada ``?field=`` añade los
+    conteos por valor de ese campo sobre toda la colección. La copia local se
+    revalida igual que en ``LandingAPI.get``.
+    """
+    name = "Landing Aggregate"
+
+    def get(self, request):
+        bucket = request.query_params.get('bucket', 'day')
+        if bucket not in ('day', 'hour'):
+            return Response(
+                {'status': 'error', 'message': "bucket must be 'day' or 'hour'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        bounds = {}
+        for param in ('since', 'until'):
+            value = request.query_params.get(param) or None
+            if value is not None and not BUCKET_LABEL.match(value):
+                return Response(
+                    {'status': 'error', 'message': f'{param} must look like YYYY-MM-DD or YYYY-MM-DDTHH'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            bounds[param] = value
+
+        try:
+            _, cache_state = snapshot.get()
+        except GatewayError as exc:
+            return upstream_error(exc)
+        data = aggregates.summary(bucket, request.query_params.getlist('field'), **bounds)
+        response = Response(data, status=status.HTTP_200_OK)
+        response['X-Cache'] = cache_state
+        if snapshot.age is not None:
+            response['Age'] = str(int(snapshot.age))
+        return response
+
+
+class LandingStream(APIView):
+    """
+    Stream SSE de nuevos envíos.
+
+    Bajo ASGI el stream es asíncrono y no ocupa un hilo por cliente; bajo WSGI
+    se usa un generador síncrono. ``Last-Event-ID`` (o ``?last_id=``) reanuda
+    desde la última clave push recibida.
+    """
+    name = "Landing Stream"
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [EventStreamRenderer]
+
+    def get(self, request):
+        last_id = request.query_params.get('last_id') or request.headers.get('Last-Event-ID') or None
+        heartbeat = getattr(settings, 'LANDING_STREAM_HEARTBEAT', 15)
+        duration = getattr(settings, 'LANDING_STREAM_SECONDS', 300)
+
+        if isinstance(request._request, ASGIRequest):
+            stream = astream_submissions(submission_broker, last_id, heartbeat, duration)
+        else:
+            stream = stream_submissions(submission_broker, last_id, heartbeat, duration)
+        return stream_headers(StreamingHttpResponse(stream, content_type='text/event-stream'))